@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Performance benchmarks for the GERTY interaction pipeline
+Built on the mock fixtures in the project conftest.py so they run without
+audio hardware, a display or network access
+
+Run with:
+    python -m pytest benchmarks/bench_pipeline.py --bench-json bench.json
+"""
+
+import struct
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+LONG_TEXT = ("Good morning Sam. The harvester in sector three reported a minor fault overnight, "
+             "but I have already scheduled a repair crew and everything is under control.")
+
+
+@pytest.fixture
+def emotion_image(gertycon_path):
+    """Path of the first emotion image"""
+    images = sorted((gertycon_path / "emotion").glob("*.jpg"))
+    if not images:
+        pytest.skip("No emotion images available")
+    return images[0]
+
+
+@pytest.fixture
+def pcm_frame(audio_test_data):
+    """One 512-sample 16-bit PCM frame as raw bytes"""
+    samples = [int(s) for s in audio_test_data['pcm_data'][:512]]
+    return struct.pack("<512h", *samples)
+
+
+@pytest.mark.usefixtures("requires_pyaudio")
+def test_image_load_and_scale(bench, gerty_instance, emotion_image, skip_if_no_opencv):
+    """imread + resize of a full-screen emotion image"""
+    stats = bench(lambda: gerty_instance.load_and_scale_image(emotion_image))
+    assert stats["median"] > 0
+
+
+@pytest.mark.usefixtures("requires_pyaudio")
+def test_overlay_render(bench, gerty_instance, emotion_image, skip_if_no_opencv):
+    """Load, draw the text overlay and hand the frame to imshow (no waiting)"""
+    stats = bench(lambda: gerty_instance.display_image(emotion_image, duration=0, show_text=LONG_TEXT))
+    assert stats["median"] > 0
+
+
+@pytest.mark.usefixtures("requires_pyaudio")
+def test_emotion_lookup(bench, gerty_instance):
+    """Emotion name -> image path resolution, excluding the draw itself"""
+    with patch.object(gerty_instance, "display_image", return_value=True):
+        stats = bench(lambda: gerty_instance.display_emotion("thinking", 0), rounds=200)
+    assert stats["median"] > 0
+
+
+def test_intent_match(bench):
+    """Local intent lookup for a mix of command and AI-bound questions"""
+    from gerty_intents import default_registry
+    registry = default_registry()
+    questions = ["What time is it?", "Hey GERTY, show me your happy face", "please stop",
+                 "What is the weather like on the far side of the moon?", LONG_TEXT]
+
+    def match_all():
+        for question in questions:
+            registry.match(question)
+    stats = bench(match_all, rounds=200)
+    assert stats["median"] < 0.001
+
+
+def test_emotion_classify(bench):
+    """Lexicon emotion pick for a full answer"""
+    from gerty_emotion import EmotionClassifier
+    classifier = EmotionClassifier()
+    stats = bench(lambda: classifier.classify(LONG_TEXT), rounds=200)
+    assert stats["median"] < 0.001
+
+
+def test_frontend_frame(bench, pcm_frame):
+    """High-pass + noise suppression + AGC on one 512-sample frame, within the configured budget"""
+    pytest.importorskip("numpy")
+    from gerty_config import FrontEndConfig
+    from gerty_dsp import AudioFrontEnd
+    settings = FrontEndConfig()
+    frontend = AudioFrontEnd(noise_suppression=True, budget_ms=settings.budget_ms)
+    stats = bench(lambda: frontend.process(pcm_frame), rounds=500, warmup=50)
+    assert stats["median"] < settings.budget_ms / 1000
+    assert frontend.noise_suppression  # not dropped by the budget guard
+
+
+@pytest.mark.usefixtures("requires_pyaudio")
+def test_pcm_frame_handling(bench, gerty_with_porcupine, pcm_frame):
+    """Capture callback -> ring buffer -> unpack -> Porcupine for 100 frames"""
+    gerty = gerty_with_porcupine
+    frame_length = gerty.porcupine.frame_length
+
+    def handle_frames():
+        for _ in range(100):
+            gerty._audio_callback(pcm_frame, frame_length, {}, 0)
+            gerty.feed_audio(gerty.audio_buffer.get(timeout=0))
+
+    stats = bench(handle_frames)
+    assert gerty.get_audio_stats()["overflows"] == 0
+    assert stats["median"] > 0
+
+
+@pytest.mark.usefixtures("requires_pyaudio")
+def test_wake_to_answer_cycle(bench, mock_pyaudio, mock_porcupine, skip_if_no_opencv):
+    """Full simulated session: boot, one wake -> question -> answer, shutdown"""
+    from gerty_sim import Simulation
+
+    script = {
+        "interactions": [{"at": 9.0, "wake": True, "say": "how is the harvester",
+                          "ai": "Running smoothly, Sam.", "ai_latency": 0.5}],
+        "end_after": 6.0,
+    }
+    reports = []
+
+    def run_session():
+        with patch("signal.signal"):
+            reports.append(Simulation(script).run())
+
+    stats = bench(run_session, rounds=3, warmup=1)
+    assert reports[-1]["interactions"][0].get("answer") == "Running smoothly, Sam."
+    assert stats["median"] > 0
+
+
+@pytest.mark.usefixtures("requires_pyaudio")
+def test_speculative_cycle(bench, mock_pyaudio, mock_porcupine, skip_if_no_opencv):
+    """Simulated session with streaming partials: a speculative hit, a revised partial and a failed early request"""
+    from gerty_sim import Simulation
+
+    script = {
+        "partials": True,
+        "interactions": [
+            {"at": 9.0, "say": "tell me about the moon", "speech_duration": 2.0,
+             "ai": "It is very far away, Sam.", "ai_latency": 0.6},
+            {"at": 25.0, "say": "what is the weather like", "speech_duration": 2.2,
+             "partials": ["what", "what is", "what is the whether", "what is the whether", "what is the whether like"],
+             "ai": "Dusty, Sam.", "ai_latency": 0.6},
+            {"at": 40.0, "say": "how far is earth", "speech_duration": 1.7,
+             "ai": "Very far, Sam.", "ai_latency": 0.6, "ai_failures": 1},
+        ],
+        "end_after": 6.0,
+    }
+    reports = []
+
+    def run_session():
+        with patch("signal.signal"):
+            reports.append(Simulation(script).run())
+
+    stats = bench(run_session, rounds=3, warmup=1)
+    report = reports[-1]
+    assert [i.get("answer") for i in report["interactions"]] == [
+        "It is very far away, Sam.", "Dusty, Sam.", "Very far, Sam."]
+    assert report["speculation"]["hits"] == 2  # the moon, and earth (whose early request failed)
+    assert report["speculation"]["wasted"] >= 1  # the "whether" hypotheses
+    # A hit skips the thinking screen and answers as soon as the stub does
+    hit = report["interactions"][0]
+    assert hit["wake_to_answer"] - hit["wake_to_question"] == pytest.approx(0.6, abs=0.05)
+    assert stats["median"] > 0
+
+
+@pytest.mark.usefixtures("requires_pyaudio")
+def test_startup_construct(bench, mock_all_external_deps):
+    """GERTYSimpleVoice() construction with dependencies mocked"""
+    from gerty_simple_voice import GERTYSimpleVoice
+
+    with patch("signal.signal"):
+        stats = bench(GERTYSimpleVoice, rounds=10)
+    assert stats["median"] > 0
+
+
+def test_startup_import(bench, skip_if_no_audio):
+    """Cold import of the voice assistant module in a fresh interpreter"""
+    def cold_import():
+        subprocess.run([sys.executable, "-c", "import gerty_simple_voice"],
+                       cwd=PROJECT_ROOT, check=True, capture_output=True)
+
+    stats = bench(cold_import, rounds=5, warmup=1)
+    assert stats["median"] > 0
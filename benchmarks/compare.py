@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Compare two GERTY benchmark result files and flag regressions
+
+Usage:
+    python benchmarks/compare.py baseline.json current.json [--threshold 0.15] [--metric median]
+
+Exits with status 1 when any benchmark is slower than the baseline by more
+than the threshold (a fraction, 0.15 = 15%).
+"""
+
+import argparse
+import json
+import sys
+
+
+def load_results(path):
+    """Load the benchmarks section of a results file"""
+    with open(path) as f:
+        return json.load(f).get("benchmarks", {})
+
+
+def compare(baseline, current, threshold=0.15, metric="median"):
+    """Return rows of (name, baseline, current, change, status)"""
+    rows = []
+    for name in sorted(set(baseline) | set(current)):
+        if name not in current:
+            rows.append((name, baseline[name][metric], None, None, "missing"))
+            continue
+        if name not in baseline:
+            rows.append((name, None, current[name][metric], None, "new"))
+            continue
+        old = baseline[name][metric]
+        new = current[name][metric]
+        change = (new - old) / old if old else 0.0
+        if change > threshold:
+            status = "REGRESSION"
+        elif change < -threshold:
+            status = "faster"
+        else:
+            status = "ok"
+        rows.append((name, old, new, change, status))
+    return rows
+
+
+def _ms(value):
+    return "-" if value is None else f"{value * 1000:.3f}"
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Compare GERTY benchmark results against a baseline")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="Allowed slowdown as a fraction (default 0.15)")
+    parser.add_argument("--metric", choices=["min", "median", "mean"], default="median")
+    args = parser.parse_args(argv)
+
+    rows = compare(load_results(args.baseline), load_results(args.current), args.threshold, args.metric)
+    width = max([len(row[0]) for row in rows] + [9])
+    print(f"{'benchmark':<{width}} {'base ms':>10} {'now ms':>10} {'change':>8}  status")
+    for name, old, new, change, status in rows:
+        change_text = "-" if change is None else f"{change:+.1%}"
+        print(f"{name:<{width}} {_ms(old):>10} {_ms(new):>10} {change_text:>8}  {status}")
+
+    regressions = [row for row in rows if row[4] == "REGRESSION"]
+    if regressions:
+        print(f"\n<BENCH> {len(regressions)} regression(s) beyond {args.threshold:.0%}")
+        return 1
+    print("\n<BENCH> No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+pytest configuration for GERTY performance benchmarks
+Provides the ``bench`` fixture which times a callable over several rounds and
+collects the results into a JSON file for comparison against a baseline
+
+Usage:
+    python -m pytest benchmarks/bench_pipeline.py --bench-json bench.json
+    python benchmarks/compare.py baseline.json bench.json
+"""
+
+import json
+import platform
+import statistics
+import sys
+import time
+
+import pytest
+
+
+def pytest_addoption(parser):
+    """Add benchmark command line options"""
+    parser.addoption("--bench-json", action="store", default=None,
+                     help="Write benchmark results to this JSON file")
+    parser.addoption("--bench-rounds", action="store", type=int, default=None,
+                     help="Override the number of timed rounds per benchmark")
+
+
+@pytest.fixture
+def requires_pyaudio():
+    """
+    Skip when PyAudio or Porcupine is missing. Use through
+    @pytest.mark.usefixtures so it runs before mock_pyaudio/mock_porcupine
+    try to patch modules that cannot be imported
+    """
+    pytest.importorskip("pyaudio")
+    pytest.importorskip("pvporcupine")
+
+
+@pytest.fixture(scope="session")
+def bench_results(request):
+    """Session-wide store of benchmark results, written out at the end of the run"""
+    results = {}
+    yield results
+
+    path = request.config.getoption("--bench-json", default=None)
+    if path and results:
+        with open(path, "w") as f:
+            json.dump({
+                "meta": {
+                    "python": sys.version.split()[0],
+                    "platform": platform.platform(),
+                    "machine": platform.machine(),
+                    "timestamp": time.time(),
+                },
+                "benchmarks": results,
+            }, f, indent=2, sort_keys=True)
+        print(f"\n<BENCH> Results written to {path}")
+
+
+@pytest.fixture
+def bench(bench_results, request):
+    """Time ``func`` and record min/median/mean in seconds under the test name"""
+    rounds_override = request.config.getoption("--bench-rounds", default=None)
+
+    def run(func, rounds=20, warmup=2, name=None):
+        rounds = rounds_override or rounds
+        for _ in range(warmup):
+            func()
+        timings = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        stats = {
+            "rounds": rounds,
+            "min": min(timings),
+            "median": statistics.median(timings),
+            "mean": statistics.mean(timings),
+            "stdev": statistics.stdev(timings) if rounds > 1 else 0.0,
+        }
+        bench_results[name or request.node.name] = stats
+        return stats
+
+    return run
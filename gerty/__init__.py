@@ -0,0 +1,16 @@
+"""
+GERTY core library
+Display, asset, sequence and timeline code shared by the display-only entry point
+(gerty_windowed.py) and the voice assistant (gerty_simple_voice.py).
+
+Importing this package only needs OpenCV; audio, wake word and speech
+recognition modules are never pulled in from here.
+"""
+
+from .assets import IMAGE_EXTENSIONS, AssetLibrary, sorted_images
+from .display import GertyScreen
+from .sequence import play_images
+from .timeline import Schedule, TimelineError, TimelinePlayer, compile_timeline, load_timeline
+
+__all__ = ["IMAGE_EXTENSIONS", "AssetLibrary", "sorted_images", "GertyScreen", "play_images",
+           "Schedule", "TimelineError", "TimelinePlayer", "compile_timeline", "load_timeline"]
@@ -0,0 +1,64 @@
+"""
+GERTY image assets
+Finds the boot, emotion and shutdown images under gertycon/ and maps emotion
+names to emotion images. Folder listings are cached after the first lookup.
+"""
+
+import os
+from pathlib import Path
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+DEFAULT_ASSET_PATH = Path(__file__).parent.parent / "gertycon"
+
+# Emotion name -> position in the sorted emotion folder (g01a ... g08a)
+EMOTION_INDEX = {
+    "neutral": 0,
+    "content": 0,       # smile
+    "happy": 1,         # grin
+    "thinking": 2,      # flat mouth
+    "listening": 3,
+    "surprised": 3,
+    "sad": 4,
+    "confused": 5,
+    "disappointed": 5,  # heavy brows
+    "crying": 6,
+    "skeptical": 7,
+    "unsure": 8,
+    "worried": 9,
+}
+
+
+def sorted_images(folder):
+    """Sorted paths of every supported image in a folder (empty if it does not exist)"""
+    try:
+        names = os.listdir(folder)
+    except OSError:
+        return []
+    return sorted(str(Path(folder) / name) for name in names
+                  if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS)
+
+
+class AssetLibrary:
+    """Cached access to the image folders of an asset directory"""
+
+    def __init__(self, base_path=None):
+        self.base_path = Path(base_path or DEFAULT_ASSET_PATH)
+        self._listings = {}
+
+    def images(self, folder):
+        """Sorted image paths in a sub folder such as "boot" or "emotion" """
+        if folder not in self._listings:
+            self._listings[folder] = sorted_images(self.base_path / folder)
+        return self._listings[folder]
+
+    def emotion_image(self, emotion_type="neutral"):
+        """Image path for an emotion name (unknown names fall back to neutral), or None"""
+        images = self.images("emotion")
+        if not images:
+            return None
+        index = min(EMOTION_INDEX.get(emotion_type, 0), len(images) - 1)
+        return images[index]
+
+    def refresh(self):
+        """Forget cached listings (after adding or removing images)"""
+        self._listings.clear()
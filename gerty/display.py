@@ -0,0 +1,214 @@
+"""
+GERTY screen
+Window setup, image scaling (with a small cache of scaled frames), text
+overlay and the timed display loop shared by every entry point. Window calls go through a cv2-style ``ui`` object and
+waiting through a ``clock`` so simulations can swap both out.
+"""
+
+import threading
+from collections import OrderedDict
+
+from gerty_clock import SystemClock
+
+from .assets import AssetLibrary
+from .sequence import play_images
+from .startup import STARTUP, LazyModule
+
+cv2 = LazyModule("cv2")
+np = LazyModule("numpy")
+
+
+class GertyScreen:
+    """Base class for anything that draws GERTY's face"""
+
+    window_name = "GERTY"
+    display_time = 2.0   # default seconds per image
+    boot_duration = 3.0
+    poll_ms = 50         # key poll interval while an image is shown
+    status_text = None   # short badge drawn top right on every frame (e.g. "OFFLINE")
+    frame_cache_size = 16  # scaled frames kept in memory (all shipped images fit)
+    overlay_chars = 50   # text overlay capacity: characters per line ...
+    overlay_lines = 3    # ... and lines per page
+
+    def __init__(self, width=1024, height=600, ui=None, clock=None, asset_path=None):
+        self.ui = ui or cv2
+        self.clock = clock or SystemClock()
+        self.assets = AssetLibrary(asset_path)
+        self.base_path = self.assets.base_path
+
+        # Screen resolution for GERTY (1024x600 by default)
+        self.target_width = width
+        self.target_height = height
+        
+        self._frames = OrderedDict()  # image path -> scaled frame, least recently used first
+        self._frames_lock = threading.Lock()
+
+    def setup_display(self):
+        """Initialize the display window"""
+        self.ui.namedWindow(self.window_name, self.ui.WINDOW_NORMAL)
+        self.ui.resizeWindow(self.window_name, self.target_width, self.target_height)
+
+    def load_and_scale_image(self, image_path):
+        """Load image and scale it to fit the target resolution"""
+        img = cv2.imread(str(image_path))
+        if img is None:
+            print(f"Error loading image: {image_path}")
+            return None
+
+        if img.shape[:2] != (self.target_height, self.target_width):
+            img = cv2.resize(img, (self.target_width, self.target_height), interpolation=cv2.INTER_LANCZOS4)
+        return img
+
+    def frame(self, image_path):
+        """Scaled frame for an image, decoded once and then served from memory"""
+        key = str(image_path)
+        with self._frames_lock:
+            img = self._frames.get(key)
+            if img is not None:
+                self._frames.move_to_end(key)
+                return img
+        img = self.load_and_scale_image(image_path)
+        if img is not None and self.frame_cache_size:
+            with self._frames_lock:
+                self._frames[key] = img
+                while len(self._frames) > self.frame_cache_size:
+                    self._frames.popitem(last=False)
+        return img
+
+    def prefetch(self, image_path):
+        """Decode and scale an image ahead of time (safe to call from worker threads)"""
+        if image_path is not None:
+            self.frame(image_path)
+
+    def wrap_text(self, text, max_chars=None):
+        """Overlay lines for text, word-wrapped at max_chars (default overlay_chars)"""
+        max_chars = max_chars or self.overlay_chars
+        lines = []
+        current_line = ""
+        for word in text.split(' '):
+            if len(current_line + word) < max_chars:
+                current_line += word + " "
+            else:
+                if current_line:
+                    lines.append(current_line.strip())
+                current_line = word + " "
+        if current_line:
+            lines.append(current_line.strip())
+        return lines
+
+    def text_pages(self, text):
+        """Text split into chunks that each fit on one overlay"""
+        lines = self.wrap_text(text)
+        return [" ".join(lines[i:i + self.overlay_lines]) for i in range(0, len(lines), self.overlay_lines)] or [""]
+
+    def draw_text_overlay(self, img, text, max_chars=None, max_lines=None):
+        """Return a copy of img with text word-wrapped on a dark band along the bottom"""
+        max_lines = max_lines or self.overlay_lines
+        img_with_text = img.copy()
+
+        # Semi-transparent black background for the text
+        overlay = img_with_text.copy()
+        cv2.rectangle(overlay, (50, self.target_height - 150),
+                      (self.target_width - 50, self.target_height - 50), (0, 0, 0), -1)
+        cv2.addWeighted(overlay, 0.7, img_with_text, 0.3, 0, img_with_text)
+
+        y_start = self.target_height - 120
+        line_height = 30
+        for i, line in enumerate(self.wrap_text(text, max_chars)[:max_lines]):
+            cv2.putText(img_with_text, line, (70, y_start + i * line_height),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+        return img_with_text
+
+    def dimmed(self, img, level):
+        """Return a copy of img at level (0..1) brightness"""
+        return cv2.convertScaleAbs(img, alpha=level)
+
+    def draw_status(self, img, text):
+        """Return a copy of img with a small status badge in the top-right corner"""
+        img = img.copy()
+        right = self.target_width - 20
+        width = 30 + 16 * len(text)
+        cv2.rectangle(img, (right - width, 20), (right, 60), (0, 0, 170), -1)
+        cv2.putText(img, text, (right - width + 15, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+        return img
+
+    def show_frame(self, img):
+        """Hand a finished frame to the window"""
+        self.ui.imshow(self.window_name, img)
+        self.ui.waitKey(1)  # Force window refresh
+        STARTUP.mark("first_frame")
+
+    def show_blank(self):
+        """Black frame (screen asleep)"""
+        self.show_frame(np.zeros((self.target_height, self.target_width, 3), dtype=np.uint8))
+
+    def show_splash(self):
+        """Put the first boot image up straight away, before slower subsystems start"""
+        images = self.assets.images("boot")
+        img = self.load_and_scale_image(images[0]) if images else None
+        if img is not None:
+            self.show_frame(img)
+
+    def display_image(self, image_path, duration=None, show_text=None, on_key=None):
+        """
+        Display an image for duration seconds with an optional text overlay.
+        Returns False on ESC/Q or a failed load, True when the time is up, or
+        whatever non-None value on_key(key) returns (checked every poll).
+        """
+        if duration is None:
+            duration = self.display_time
+
+        img = self.compose(image_path, show_text)
+        if img is None:
+            return False
+        self.show_frame(img)
+        return self.wait(duration, on_key)
+
+    def compose(self, image_path, show_text=None):
+        """Finished frame for an image: scaled, text overlay and status badge (None if it fails to load)"""
+        img = self.frame(image_path) if image_path is not None else None
+        if img is None:
+            return None
+        if show_text:
+            img = self.draw_text_overlay(img, show_text)
+        if self.status_text:
+            img = self.draw_status(img, self.status_text)
+        return img
+
+    def wait(self, duration, on_key=None, poll_ms=None):
+        """Poll the keyboard for duration seconds (see display_image for the result)"""
+        poll_ms = poll_ms or self.poll_ms
+        start_time = self.clock.time()
+        while self.clock.time() - start_time < duration:
+            key = self.ui.waitKey(poll_ms) & 0xFF
+            if key == 27 or key == ord('q'):  # ESC or Q
+                return False
+            if on_key is not None:
+                result = on_key(key)
+                if result is not None:
+                    return result
+        return True
+
+    def wait_until(self, deadline, on_key=None, poll_ms=None):
+        """
+        Like wait, but until an absolute clock time, never polling past it.
+        Polls at least once even when the deadline has passed, so keys (and
+        the window) are still serviced when playback is running late
+        """
+        poll_ms = poll_ms or self.poll_ms
+        while True:
+            remaining = deadline - self.clock.time()
+            key = self.ui.waitKey(max(1, min(poll_ms, int(remaining * 1000)))) & 0xFF
+            if key == 27 or key == ord('q'):  # ESC or Q
+                return False
+            if on_key is not None:
+                result = on_key(key)
+                if result is not None:
+                    return result
+            if self.clock.time() >= deadline:
+                return True
+
+    def boot_sequence(self):
+        """Display boot sequence"""
+        print("<SYSTEM> GERTY boot sequence initiated...")
+        return play_images(self, self.assets.images("boot"), self.boot_duration)
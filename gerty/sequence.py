@@ -0,0 +1,15 @@
+"""
+GERTY image sequences
+Plays a list of images one after another on a GertyScreen
+"""
+
+import os
+
+
+def play_images(screen, image_paths, duration):
+    """Show each image for duration seconds; returns False as soon as one is aborted"""
+    for image_path in image_paths:
+        print(f"   -> {os.path.basename(image_path)}")
+        if not screen.display_image(image_path, duration):
+            return False
+    return True
@@ -0,0 +1,101 @@
+"""
+GERTY startup timing and lazy imports
+Heavy third-party modules (OpenCV, PyAudio, Porcupine, speech_recognition,
+requests, numpy) are bound as LazyModule proxies and only imported the first
+time one of their attributes is used, i.e. when their subsystem is set up.
+Every lazy import and every phase wrapped in STARTUP.phase() is timed so
+--startup-profile can print where time-to-first-frame goes.
+"""
+
+import importlib
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+
+def _process_age():
+    """Seconds since this process was created (Linux /proc), or None"""
+    try:
+        with open("/proc/self/stat") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class StartupTimeline:
+    """Import and init timings from process start to the first frame on screen"""
+
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.before_t0 = _process_age()  # interpreter start + stdlib imports
+        self.imports = []   # (module, seconds, phase it happened in)
+        self.phases = []    # (name, start offset, seconds)
+        self.marks = {}     # name -> offset from t0
+        self._phase = None
+
+    def now(self):
+        return time.perf_counter() - self.t0
+
+    @contextmanager
+    def phase(self, name):
+        """Time an init step; lazy imports inside it are attributed to it"""
+        outer, self._phase = self._phase, name
+        start = self.now()
+        try:
+            yield
+        finally:
+            self.phases.append((name, start, self.now() - start))
+            self._phase = outer
+
+    def mark(self, name):
+        """Record the first time a milestone (e.g. "first_frame") is reached"""
+        self.marks.setdefault(name, self.now())
+
+    def record_import(self, module, seconds):
+        self.imports.append((module, seconds, self._phase))
+
+    def report(self, out=None):
+        """Print the import and init breakdown"""
+        out = out or sys.stdout
+        print("<STARTUP> Startup profile", file=out)
+        if self.before_t0 is not None:
+            print(f"   {'interpreter + early imports':<32} {self.before_t0 * 1000:8.1f} ms", file=out)
+        print("   Lazy imports:", file=out)
+        for module, seconds, phase in self.imports:
+            print(f"     {module:<30} {seconds * 1000:8.1f} ms  ({phase or 'top level'})", file=out)
+        print("   Init phases:", file=out)
+        for name, start, seconds in self.phases:
+            print(f"     {name:<30} {seconds * 1000:8.1f} ms  (at {start * 1000:.0f} ms)", file=out)
+        for name, offset in sorted(self.marks.items(), key=lambda item: item[1]):
+            total = offset + (self.before_t0 or 0.0)
+            print(f"   {name:<32} {offset * 1000:8.1f} ms after imports began, {total * 1000:.0f} ms from exec",
+                  file=out)
+
+
+STARTUP = StartupTimeline()
+
+
+class LazyModule:
+    """Module stand-in that imports the real module on first attribute access"""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            start = time.perf_counter()
+            self._module = importlib.import_module(self._name)
+            STARTUP.record_import(self._name, time.perf_counter() - start)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
@@ -0,0 +1,273 @@
+"""
+GERTY timelines
+Declarative display sequences compiled ahead of time into a flat frame
+schedule. Every frame in the schedule has an offset from the start, and
+playback waits for start + offset rather than sleeping for a duration after
+the previous frame. Late draws therefore never push back the frames after
+them, and a looping exhibition stays on time however long it runs. Every
+referenced frame is decoded, scaled and given its text before the first cue,
+so playback never touches the disk.
+
+A timeline is JSON (or the same structure as a dict):
+
+    {"loop": false, "fps": 20, "steps": [
+        {"folder": "boot", "duration": 3.0},
+        {"hold": 1.0},
+        {"repeat": 2, "steps": [{"folder": "emotion", "duration": 1.5, "fade": 0.3}]},
+        {"emotion": "happy", "duration": 2.0, "text": "Hello, Sam."},
+        {"image": "shutdown/shut.jpg", "duration": 4.0}
+    ]}
+
+folder / image / emotion show frames for duration seconds each, with an
+optional text overlay and an optional fade (seconds of crossfade from the
+previous frame, drawn at fps and counted in the duration). hold keeps the
+current frame up, and repeat unrolls its steps n times. With "loop": true
+the whole schedule repeats until a key stops it.
+"""
+
+import json
+import statistics
+from collections import deque
+from pathlib import Path
+
+from .startup import LazyModule
+
+cv2 = LazyModule("cv2")
+np = LazyModule("numpy")
+
+FRAME_STEPS = ("folder", "image", "emotion")
+
+
+class TimelineError(ValueError):
+    """Invalid timeline, or a frame it needs that cannot be loaded"""
+
+
+class Cue:
+    """One frame of a compiled schedule: show frame (blended over fade_from) at offset seconds"""
+
+    __slots__ = ("at", "frame", "fade_from", "alpha", "label")
+
+    def __init__(self, at, frame, fade_from=None, alpha=1.0, label=None):
+        self.at = at
+        self.frame = frame          # (image path, text)
+        self.fade_from = fade_from  # previous frame while crossfading
+        self.alpha = alpha
+        self.label = label          # printed when the image first comes up
+
+
+class Schedule:
+    """Compiled timeline: cues sorted by offset, total length and the frames to preload"""
+
+    def __init__(self, cues, length, loop=False, name="timeline"):
+        self.cues = cues
+        self.length = length
+        self.loop = loop
+        self.name = name
+
+    @property
+    def frames(self):
+        """Every distinct (image path, text) the schedule shows"""
+        frames = dict.fromkeys(cue.frame for cue in self.cues)
+        frames.update(dict.fromkeys(cue.fade_from for cue in self.cues if cue.fade_from))
+        return list(frames)
+
+
+def load_timeline(path):
+    """Timeline spec from a JSON file"""
+    with open(path) as f:
+        try:
+            return json.load(f)
+        except ValueError as e:
+            raise TimelineError(f"{path}: {e}")
+
+
+def compile_timeline(spec, assets, name="timeline"):
+    """Spec (dict, or a bare list of steps) -> Schedule, with image paths resolved via assets"""
+    if isinstance(spec, list):
+        spec = {"steps": spec}
+    fps = float(spec.get("fps", 20))
+    if fps <= 0:
+        raise TimelineError("fps must be positive")
+    state = {"t": 0.0, "last": None}
+    cues = []
+    _compile_steps(spec.get("steps", []), assets, fps, state, cues, "steps")
+    if not cues:
+        raise TimelineError(f"{name} shows no frames")
+    loop = bool(spec.get("loop", False))
+    if loop and state["t"] <= 0:
+        raise TimelineError(f"{name} loops but has no duration")
+    return Schedule(cues, state["t"], loop, spec.get("name", name))
+
+
+def _compile_steps(steps, assets, fps, state, cues, where):
+    if not isinstance(steps, list):
+        raise TimelineError(f"{where} must be a list")
+    for i, step in enumerate(steps):
+        here = f"{where}[{i}]"
+        if not isinstance(step, dict):
+            raise TimelineError(f"{here} must be an object")
+        if "repeat" in step:
+            for _ in range(_number(step, "repeat", here, int)):
+                _compile_steps(step.get("steps", []), assets, fps, state, cues, here + ".steps")
+        elif "hold" in step:
+            state["t"] += _number(step, "hold", here)
+        elif any(kind in step for kind in FRAME_STEPS):
+            duration = _number(step, "duration", here)
+            fade = _number(step, "fade", here) if "fade" in step else 0.0
+            if fade > duration:
+                raise TimelineError(f"{here}: fade is longer than duration")
+            text = step.get("text")
+            for path in _images(step, assets, here):
+                _add_frame(cues, state, (path, text), duration, fade, fps)
+        else:
+            raise TimelineError(f"{here}: expected one of {', '.join(FRAME_STEPS + ('hold', 'repeat'))}")
+
+
+def _number(step, key, where, kind=float):
+    try:
+        value = kind(step[key])
+    except (KeyError, TypeError, ValueError):
+        raise TimelineError(f"{where}: {key} must be a number")
+    if value < 0:
+        raise TimelineError(f"{where}: {key} must not be negative")
+    return value
+
+
+def _images(step, assets, where):
+    if "folder" in step:
+        images = assets.images(step["folder"])
+    elif "emotion" in step:
+        image = assets.emotion_image(step["emotion"])
+        images = [image] if image else []
+    else:
+        path = Path(step["image"])
+        images = [str(path if path.is_absolute() else assets.base_path / path)]
+    if not images:
+        raise TimelineError(f"{where}: no images for {step}")
+    return images
+
+
+def _add_frame(cues, state, frame, duration, fade, fps):
+    start, previous = state["t"], state["last"]
+    label = Path(frame[0]).name
+    steps = int(round(fade * fps)) if previous and previous != frame else 0
+    for k in range(1, steps):
+        cues.append(Cue(start + (k - 1) / fps, frame, previous, k / steps, label if k == 1 else None))
+        label = None
+    cues.append(Cue(start + max(steps - 1, 0) / fps, frame, label=label))
+    state["t"] = start + duration
+    state["last"] = frame
+
+
+class DriftReport:
+    """How far behind its deadline each frame went up, kept cheap enough to run forever"""
+
+    def __init__(self, late_ms=20.0, window=1000):
+        self.late_ms = late_ms
+        self.recent = deque(maxlen=window)  # lateness (ms) of the latest frames, for p99
+        self.frames = 0
+        self.cycles = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.late_frames = 0
+        self.cycle_start_ms = []  # lateness of the first frame of each cycle (bounded below)
+
+    def frame(self, lateness):
+        ms = lateness * 1000
+        self.frames += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.recent.append(ms)
+        if ms > self.late_ms:
+            self.late_frames += 1
+
+    def cycle(self, lateness):
+        self.cycles += 1
+        if len(self.cycle_start_ms) >= 1000:
+            del self.cycle_start_ms[1::2]  # keep the trend, thin the history
+        self.cycle_start_ms.append(lateness * 1000)
+
+    def snapshot(self):
+        recent = sorted(self.recent)
+        starts = self.cycle_start_ms
+        return {
+            "cycles": self.cycles,
+            "frames": self.frames,
+            "mean_late_ms": round(self.total_ms / self.frames, 2) if self.frames else 0.0,
+            "p99_late_ms": round(recent[int(len(recent) * 0.99)], 2) if recent else 0.0,
+            "max_late_ms": round(self.max_ms, 2),
+            "late_frames": self.late_frames,
+            # Start of the latest cycle vs the first: what the run has gained or lost overall
+            "drift_ms": round(starts[-1] - starts[0], 2) if starts else 0.0,
+            "median_cycle_start_ms": round(statistics.median(starts), 2) if starts else 0.0,
+        }
+
+    def summary(self):
+        s = self.snapshot()
+        return (f"{s['cycles']} cycles, {s['frames']} frames, late by {s['mean_late_ms']} ms mean / "
+                f"{s['p99_late_ms']} ms p99 / {s['max_late_ms']} ms max, {s['late_frames']} over "
+                f"{self.late_ms:.0f} ms, drift {s['drift_ms']:+.2f} ms")
+
+
+class TimelinePlayer:
+    """Plays a Schedule on a GertyScreen against absolute deadlines"""
+
+    def __init__(self, screen, report_every=10, late_ms=20.0):
+        self.screen = screen
+        self.report_every = report_every  # print the drift report every n cycles of a looping timeline
+        self.late_ms = late_ms
+        self.report = DriftReport(late_ms)
+        self._frames = {}
+        self._blend = None
+
+    def preload(self, schedule):
+        """Compose every frame the schedule needs; raises TimelineError for any that fail to load"""
+        self._frames = {}
+        missing = []
+        for frame in schedule.frames:
+            img = self.screen.compose(*frame)
+            if img is None:
+                missing.append(frame[0])
+            self._frames[frame] = img
+        if missing:
+            raise TimelineError(f"cannot load {', '.join(missing)}")
+        return len(self._frames)
+
+    def play(self, schedule, loops=None, on_key=None):
+        """
+        Preload, then play loops times (default: once, or forever for a looping
+        timeline). Returns like GertyScreen.display_image
+        """
+        if loops is None:
+            loops = None if schedule.loop else 1
+        self.preload(schedule)
+        self.report = DriftReport(self.late_ms)
+        clock = self.screen.clock
+        start = clock.time()
+        cycle = 0
+        while loops is None or cycle < loops:
+            base = start + cycle * schedule.length
+            for i, cue in enumerate(schedule.cues):
+                result = self.screen.wait_until(base + cue.at, on_key)
+                if result is not True:
+                    return result
+                if cue.label and cycle == 0:
+                    print(f"   -> {cue.label}")
+                self.screen.show_frame(self._render(cue))
+                lateness = clock.time() - (base + cue.at)
+                self.report.frame(lateness)
+                if i == 0:
+                    self.report.cycle(lateness)
+            cycle += 1
+            if loops is None and self.report_every and cycle % self.report_every == 0:
+                print(f"<TIMELINE> {schedule.name}: {self.report.summary()}")
+        return self.screen.wait_until(start + cycle * schedule.length, on_key)
+
+    def _render(self, cue):
+        img = self._frames[cue.frame]
+        if cue.fade_from is None:
+            return img
+        if self._blend is None or self._blend.shape != img.shape:
+            self._blend = np.empty_like(img)
+        cv2.addWeighted(img, cue.alpha, self._frames[cue.fade_from], 1.0 - cue.alpha, 0, self._blend)
+        return self._blend
@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+"""
+GERTY local control API
+Optional HTTP + WebSocket server (stdlib asyncio, own thread and event loop)
+so other processes can drive the assistant:
+
+    GET  /state              current state (processing, idle state, last question/answer)
+    GET  /stats              audio, intent, speculation, barge-in and supervisor counters
+    POST /ask      {"text"}  ask a question as if it had been heard (no STT)
+    POST /emotion  {"emotion", "seconds", "text"}  show a face
+    POST /sequence {"folder", "seconds"}           play boot / emotion / shutdown images
+    GET  /events             WebSocket stream of timeline events as JSON
+
+Nothing here touches the window: commands are queued and picked up by the
+UI thread between idle polls, and events are handed to the loop with
+call_soon_threadsafe, so neither the render loop nor the wake word thread
+ever waits on a client. Slow event subscribers lose their oldest events.
+
+    python gerty_api.py --load-test   # frame pacing with and without many clients
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+MAX_BODY = 64 * 1024
+EVENT_QUEUE = 256  # per subscriber
+COMMAND_QUEUE = 32  # waiting for the UI thread; more are refused with 503
+COMMANDS = ("ask", "emotion", "sequence")
+
+REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+           405: "Method Not Allowed", 413: "Payload Too Large", 503: "Service Unavailable"}
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def ws_frame(payload, opcode=0x1):
+    """Unmasked server-to-client WebSocket frame"""
+    length = len(payload)
+    if length < 126:
+        header = bytes((0x80 | opcode, length))
+    elif length < 1 << 16:
+        header = bytes((0x80 | opcode, 126)) + length.to_bytes(2, "big")
+    else:
+        header = bytes((0x80 | opcode, 127)) + length.to_bytes(8, "big")
+    return header + payload
+
+
+async def ws_read(reader):
+    """(opcode, payload) of the next client frame (clients always mask)"""
+    head = await reader.readexactly(2)
+    opcode, length = head[0] & 0x0F, head[1] & 0x7F
+    if length == 126:
+        length = int.from_bytes(await reader.readexactly(2), "big")
+    elif length == 127:
+        length = int.from_bytes(await reader.readexactly(8), "big")
+    if length > MAX_BODY:
+        raise ValueError(f"frame of {length} bytes is larger than {MAX_BODY}")
+    mask = await reader.readexactly(4) if head[1] & 0x80 else bytes(4)
+    data = await reader.readexactly(length)
+    return opcode, bytes(b ^ mask[i % 4] for i, b in enumerate(data))
+
+
+class ControlAPI:
+    """Asyncio server thread in front of a GERTYSimpleVoice"""
+
+    def __init__(self, gerty, host="127.0.0.1", port=8765, token="", max_clients=64):
+        self.gerty = gerty
+        self.host = host
+        self.port = port
+        self.token = token
+        self.max_clients = max_clients
+        self.commands = deque()  # drained by the UI thread, at most COMMAND_QUEUE long
+        self.clients = 0
+        self.requests = 0
+        self.events_sent = 0
+        self.events_dropped = 0
+        self._subscribers = set()
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    # UI-thread side
+    def pending(self):
+        return bool(self.commands)
+
+    def next_command(self):
+        try:
+            return self.commands.popleft()
+        except IndexError:
+            return None
+
+    # Any thread
+    def publish(self, event, t, data):
+        """Send a timeline event to every /events subscriber (never blocks the caller)"""
+        loop = self._loop
+        if loop is None or not self._subscribers:
+            return
+        message = json.dumps({"event": event, "t": t, **data}, default=str).encode()
+        try:
+            loop.call_soon_threadsafe(self._fanout, message)
+        except RuntimeError:
+            pass  # loop closing
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="control-api", daemon=True)
+        self._thread.start()
+        self._ready.wait(5)
+        if self._server is None:
+            return False
+        print(f"<API> Control API on http://{self.host}:{self.port}")
+        return True
+
+    def stop(self):
+        loop = self._loop
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def stats(self):
+        return {"clients": self.clients, "subscribers": len(self._subscribers), "requests": self.requests,
+                "events_sent": self.events_sent, "events_dropped": self.events_dropped,
+                "queued_commands": len(self.commands)}
+
+    # Loop thread
+    def _run(self):
+        loop = self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            self._server = loop.run_until_complete(asyncio.start_server(self._client, self.host, self.port))
+            self.port = self._server.sockets[0].getsockname()[1]
+        except OSError as e:
+            print(f"<API> Cannot listen on {self.host}:{self.port}: {e}")
+            self._loop = None
+            return
+        finally:
+            self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            self._server.close()
+            self._loop = None
+            for queue in list(self._subscribers):
+                if queue.full():
+                    queue.get_nowait()  # make room for the end marker
+                queue.put_nowait(None)
+            loop.run_until_complete(asyncio.sleep(0))
+            loop.close()
+
+    def _fanout(self, message):
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+                self.events_dropped += 1
+            queue.put_nowait(message)
+
+    async def _client(self, reader, writer):
+        if self.clients >= self.max_clients:
+            await self._respond(writer, 503, {"error": "too many clients"})
+            writer.close()
+            return
+        self.clients += 1
+        try:
+            method, path, headers, body = await self._read_request(reader)
+            self.requests += 1
+            if self.token and headers.get("authorization") != f"Bearer {self.token}":
+                raise ApiError(401, "missing or wrong token")
+            if path == "/events" and headers.get("upgrade", "").lower() == "websocket":
+                await self._events(reader, writer, headers)
+                return
+            await self._respond(writer, *self._route(method, path, body))
+        except ApiError as e:
+            await self._respond(writer, e.status, {"error": str(e)})
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            self.clients -= 1
+            writer.close()
+
+    async def _read_request(self, reader):
+        request_line = (await reader.readline()).decode("latin-1").split()
+        if len(request_line) < 2:
+            raise ValueError("bad request line")
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", 0))
+        if length > MAX_BODY:
+            raise ApiError(413, "body too large")
+        body = await reader.readexactly(length) if length else b""
+        return request_line[0].upper(), request_line[1].split("?")[0], headers, body
+
+    async def _respond(self, writer, status, payload):
+        body = json.dumps(payload, default=str).encode()
+        writer.write(f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    def _route(self, method, path, body):
+        name = path.strip("/")
+        if method == "GET" and name == "state":
+            return 200, self.gerty.get_state()
+        if method == "GET" and name == "stats":
+            return 200, {**self.gerty.get_stats(), "api": self.stats()}
+        if name in COMMANDS:
+            if method != "POST":
+                raise ApiError(405, f"use POST for /{name}")
+            try:
+                command = json.loads(body or b"{}")
+            except ValueError:
+                raise ApiError(400, "body must be JSON")
+            if not isinstance(command, dict):
+                raise ApiError(400, "body must be a JSON object")
+            if not isinstance(command.get("text", ""), (str, type(None))):
+                raise ApiError(400, "text must be a string")
+            if name == "ask" and not (command.get("text") or "").strip():
+                raise ApiError(400, "ask needs text")
+            if name == "emotion" and not command.get("emotion"):
+                raise ApiError(400, "emotion needs emotion")
+            folder = str(command.get("folder", "boot"))
+            if name == "sequence" and (not folder or folder != Path(folder).name or folder.startswith(".")):
+                raise ApiError(400, "folder must be an asset folder name such as boot")
+            if len(self.commands) >= COMMAND_QUEUE:
+                raise ApiError(503, "command queue full")
+            command["command"] = name
+            self.commands.append(command)
+            return 202, {"queued": name, "position": len(self.commands)}
+        raise ApiError(404, f"no such endpoint {path}")
+
+    async def _events(self, reader, writer, headers):
+        key = headers.get("sec-websocket-key")
+        if not key:
+            raise ApiError(400, "missing Sec-WebSocket-Key")
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+        queue = asyncio.Queue(EVENT_QUEUE)
+        self._subscribers.add(queue)
+        listener = asyncio.ensure_future(self._ws_incoming(reader, writer, queue))
+        try:
+            while True:
+                message = await queue.get()
+                if message is None:
+                    break
+                writer.write(ws_frame(message))
+                self.events_sent += 1
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._subscribers.discard(queue)
+            listener.cancel()
+            try:
+                writer.write(ws_frame(b"", opcode=0x8))
+            except ConnectionError:
+                pass
+
+    async def _ws_incoming(self, reader, writer, queue):
+        """Answer pings and notice the client closing"""
+        try:
+            while True:
+                opcode, payload = await ws_read(reader)
+                if opcode == 0x8:
+                    break
+                if opcode == 0x9:
+                    writer.write(ws_frame(payload, opcode=0xA))
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        if not queue.full():
+            queue.put_nowait(None)
+
+
+# Load test ---------------------------------------------------------------
+
+class _PacedWindow:
+    """cv2-style window recording when each frame is shown"""
+
+    WINDOW_NORMAL = 0
+
+    def __init__(self):
+        self.shown = []
+
+    def namedWindow(self, name, flags=0):
+        pass
+
+    def resizeWindow(self, name, width, height):
+        pass
+
+    def imshow(self, name, img):
+        img.copy()
+        self.shown.append(time.perf_counter())
+
+    def waitKey(self, delay=0):
+        time.sleep(max(delay, 1) / 1000.0)
+        return -1
+
+    def destroyAllWindows(self):
+        pass
+
+
+async def _load_clients(url_host, port, pollers, subscribers, seconds):
+    """Client side of the load test (run in its own process)"""
+    deadline = time.monotonic() + seconds
+    counts = {"requests": 0, "events": 0, "errors": 0}
+
+    async def poll(path):
+        while time.monotonic() < deadline:
+            try:
+                reader, writer = await asyncio.open_connection(url_host, port)
+                writer.write(f"GET {path} HTTP/1.1\r\nHost: x\r\n\r\n".encode())
+                await writer.drain()
+                await reader.read()
+                writer.close()
+                counts["requests"] += 1
+            except OSError:
+                counts["errors"] += 1
+                await asyncio.sleep(0.05)
+
+    async def subscribe():
+        try:
+            reader, writer = await asyncio.open_connection(url_host, port)
+            key = base64.b64encode(b"gerty-load-test!").decode()
+            writer.write(f"GET /events HTTP/1.1\r\nHost: x\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                         f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n".encode())
+            await reader.readuntil(b"\r\n\r\n")
+            while time.monotonic() < deadline:
+                opcode, _payload = await asyncio.wait_for(ws_read(reader), max(deadline - time.monotonic(), 0.01))
+                if opcode == 0x8:
+                    break
+                counts["events"] += 1
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+            pass
+
+    await asyncio.gather(*[poll("/stats" if i % 2 else "/state") for i in range(pollers)],
+                         *[subscribe() for _ in range(subscribers)])
+    return counts
+
+
+def _pacing(shown, period):
+    intervals = [b - a for a, b in zip(shown, shown[1:])]
+    late = [i for i in intervals if i > period * 1.5]
+    return {
+        "frames": len(shown),
+        "mean_ms": round(statistics.mean(intervals) * 1000, 2),
+        "p99_ms": round(sorted(intervals)[int(len(intervals) * 0.99)] * 1000, 2),
+        "max_ms": round(max(intervals) * 1000, 2),
+        "late_frames": len(late),
+    }
+
+
+def load_test(seconds=10.0, pollers=40, subscribers=40, event_rate=200, fps=20):
+    """Frame pacing of a render loop with no API, then with the API under load"""
+    from gerty_config import GertyConfig
+    from gerty_simple_voice import GERTYSimpleVoice
+
+    config = GertyConfig()
+    config.tts.engine = "off"
+    config.offline.enabled = False
+    period = 1.0 / fps
+    results = {}
+    for mode in ("no clients", "loaded"):
+        ui = _PacedWindow()
+        gerty = GERTYSimpleVoice(config=config, ui=ui)
+        image = gerty.assets.emotion_image("neutral")
+        api = clients = None
+        stop = threading.Event()
+        if mode == "loaded":
+            api = gerty.api = ControlAPI(gerty, port=0, max_clients=pollers + subscribers + 8)
+            api.start()
+            clients = subprocess.Popen([sys.executable, __file__, "--load-clients", str(api.port),
+                                        str(pollers), str(subscribers), str(seconds)],
+                                       stdout=subprocess.PIPE, text=True)
+
+            def events():
+                while not stop.is_set():
+                    gerty._mark("load_test", n=api.events_sent)
+                    time.sleep(1.0 / event_rate)
+            threading.Thread(target=events, daemon=True).start()
+            time.sleep(0.5)  # let the clients connect
+
+        # Render loop: a fresh overlay frame every period, like an animated face
+        start = time.perf_counter()
+        next_frame = start
+        while time.perf_counter() - start < seconds - 1.0:
+            gerty.show_frame(gerty.compose(image, f"frame {len(ui.shown)}"))
+            next_frame += period
+            gerty.wait(max(next_frame - time.perf_counter(), 0.0), poll_ms=5)
+        stop.set()
+        results[mode] = _pacing(ui.shown, period)
+        if api:
+            client_counts = json.loads(clients.communicate()[0].strip().splitlines()[-1])
+            api.stop()
+            results[mode].update(api=api.stats(), clients=client_counts)
+    return results
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="GERTY control API tools")
+    parser.add_argument("--load-test", action="store_true", help="Frame pacing with many concurrent clients")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--pollers", type=int, default=40, help="Clients polling /state and /stats")
+    parser.add_argument("--subscribers", type=int, default=40, help="WebSocket /events subscribers")
+    parser.add_argument("--event-rate", type=float, default=200, help="Timeline events per second")
+    parser.add_argument("--load-clients", nargs=4, metavar=("PORT", "POLLERS", "SUBSCRIBERS", "SECONDS"),
+                        help=argparse.SUPPRESS)
+    parser.add_argument("--json", help="Write the results to this JSON file")
+    args = parser.parse_args(argv)
+    if args.load_clients:
+        port, pollers, subscribers, seconds = args.load_clients
+        counts = asyncio.run(_load_clients("127.0.0.1", int(port), int(pollers), int(subscribers), float(seconds)))
+        print(json.dumps(counts))
+        return 0
+    if not args.load_test:
+        parser.print_help()
+        return 0
+
+    print(f"<API> {args.seconds:.0f}s per mode, 20 fps render loop, {args.pollers} pollers, "
+          f"{args.subscribers} WebSocket subscribers, {args.event_rate:.0f} events/s")
+    results = load_test(args.seconds, args.pollers, args.subscribers, args.event_rate)
+    print(f"   {'mode':<11} {'frames':>7} {'mean':>8} {'p99':>8} {'max':>8} {'late':>5}")
+    for mode, stats in results.items():
+        print(f"   {mode:<11} {stats['frames']:>7} {stats['mean_ms']:>6}ms {stats['p99_ms']:>6}ms "
+              f"{stats['max_ms']:>6}ms {stats['late_frames']:>5}")
+    loaded = results["loaded"]
+    print(f"   served {loaded['clients']['requests']} requests and {loaded['api']['events_sent']} events "
+          f"({loaded['api']['events_dropped']} dropped for slow subscribers, "
+          f"{loaded['clients']['errors']} client errors)")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+GERTY audio capture helpers
+Bounded ring buffer that decouples PyAudio capture from wake word inference
+"""
+
+import struct
+import threading
+import time
+from collections import deque
+
+
+def unpack_frame(data, frame_length):
+    """Convert raw 16-bit little-endian PCM bytes into a tuple of samples"""
+    return struct.unpack_from("h" * frame_length, data)
+
+
+class AudioStats:
+    """Counters describing how well the wake word worker keeps up with capture"""
+
+    def __init__(self):
+        self.frames_captured = 0
+        self.frames_processed = 0
+        self.overflows = 0          # frames dropped because the ring buffer was full
+        self.input_overflows = 0    # PortAudio reported input overflow (driver side)
+        self.empty_waits = 0        # worker found no frame waiting (normal when it keeps up)
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+
+    def snapshot(self):
+        """Return a plain dict copy of the counters"""
+        return {
+            "frames_captured": self.frames_captured,
+            "frames_processed": self.frames_processed,
+            "overflows": self.overflows,
+            "input_overflows": self.input_overflows,
+            "empty_waits": self.empty_waits,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+        }
+
+    def __repr__(self):
+        return f"AudioStats({self.snapshot()})"
+
+
+class AudioRingBuffer:
+    """
+    Fixed-capacity FIFO of PCM frames shared by the capture callback and the worker.
+
+    The capture side never blocks: when the buffer is full the oldest frame is
+    dropped and counted as an overflow, so the worker always sees the most
+    recent audio once it catches up.
+    """
+
+    def __init__(self, capacity=32):
+        if capacity < 1:
+            raise ValueError("Ring buffer capacity must be at least 1")
+        self.capacity = capacity
+        self.stats = AudioStats()
+        self._frames = deque()
+        self._cond = threading.Condition()
+
+    def __len__(self):
+        with self._cond:
+            return len(self._frames)
+
+    def put(self, frame, input_overflow=False):
+        """Append a frame from the capture side (never blocks)"""
+        with self._cond:
+            stats = self.stats
+            stats.frames_captured += 1
+            if input_overflow:
+                stats.input_overflows += 1
+            if len(self._frames) >= self.capacity:
+                self._frames.popleft()
+                stats.overflows += 1
+            self._frames.append(frame)
+            depth = len(self._frames)
+            stats.queue_depth = depth
+            if depth > stats.max_queue_depth:
+                stats.max_queue_depth = depth
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Pop the oldest frame, waiting up to ``timeout`` seconds. Returns None on timeout"""
+        with self._cond:
+            if not self._frames:
+                self.stats.empty_waits += 1
+                deadline = None if timeout is None else time.monotonic() + timeout
+                while not self._frames:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return None
+                    self._cond.wait(remaining)
+            frame = self._frames.popleft()
+            self.stats.frames_processed += 1
+            self.stats.queue_depth = len(self._frames)
+            return frame
+
+    def clear(self):
+        """Drop any queued frames (e.g. after pausing the stream)"""
+        with self._cond:
+            self._frames.clear()
+            self.stats.queue_depth = 0
+
+    def reset_stats(self):
+        """Start a fresh set of counters"""
+        with self._cond:
+            self.stats = AudioStats()
+            self.stats.queue_depth = len(self._frames)
@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+"""
+GERTY audio process
+Optional mode that runs microphone capture and wake word detection in a
+child process with its own interpreter (and GIL), so OpenCV rendering,
+text layout and JSON parsing in the main process can never delay the
+16 kHz capture loop into an overflow.
+
+The child writes PCM frames and keyword events into a shared memory block
+(single producer, single consumer rings); the main process only reads them
+for the echo gate, the recorder and keyword dispatch.
+
+Measure overflows under synthetic UI load, in-process vs separate process:
+    python gerty_audio_process.py --measure [--seconds 20] [--ui-stall-ms 80]
+"""
+
+import argparse
+import json
+import multiprocessing
+import struct
+import sys
+import threading
+import time
+from multiprocessing import shared_memory
+
+from gerty_audio import AudioRingBuffer, unpack_frame
+
+# Shared block layout: header | frame slots | event slots
+HEADER = struct.Struct("<QQQQddIIii")
+(H_WRITE_SEQ, H_EVENT_SEQ, H_INPUT_OVERFLOWS, H_FRAMES_PROCESSED,
+ H_DETECT_SECONDS, H_HEARTBEAT, H_SAMPLE_RATE, H_FRAME_LENGTH, H_STATE, H_PAUSED) = range(10)
+EVENT = struct.Struct("<qid")  # frame sequence number, keyword index, monotonic time
+EVENT_SLOTS = 64
+
+STATE_STARTING, STATE_RUNNING, STATE_FAILED, STATE_STOPPED = range(4)
+PA_INPUT_OVERFLOWED = -9981  # PortAudio paInputOverflowed
+
+
+class SharedAudioRing:
+    """
+    View over the shared block. The child is the only writer of frames,
+    events and counters; the parent only writes the pause flag. A frame slot
+    is published by bumping write_seq after it is filled, and a reader that
+    finds it was lapped while copying drops the frame.
+    """
+
+    def __init__(self, shm, capacity, frame_length):
+        self.shm = shm
+        self.buf = shm.buf
+        self.capacity = capacity
+        self.frame_bytes = frame_length * 2
+        self.frames_offset = HEADER.size
+        self.events_offset = self.frames_offset + capacity * self.frame_bytes
+
+    @staticmethod
+    def size(capacity, frame_length):
+        return HEADER.size + capacity * frame_length * 2 + EVENT_SLOTS * EVENT.size
+
+    def header(self):
+        return list(HEADER.unpack_from(self.buf, 0))
+
+    def _set(self, field, value):
+        fmt = HEADER.format[1 + field]
+        struct.pack_into("<" + fmt, self.buf, struct.calcsize(HEADER.format[:1 + field]), value)
+
+    def _get(self, field):
+        fmt = HEADER.format[1 + field]
+        return struct.unpack_from("<" + fmt, self.buf, struct.calcsize(HEADER.format[:1 + field]))[0]
+
+    # Writer side (child)
+    def write_frame(self, seq, frame):
+        start = self.frames_offset + (seq % self.capacity) * self.frame_bytes
+        self.buf[start:start + len(frame)] = frame
+        self._set(H_WRITE_SEQ, seq + 1)
+
+    def write_event(self, event_seq, frame_seq, keyword_index):
+        start = self.events_offset + (event_seq % EVENT_SLOTS) * EVENT.size
+        EVENT.pack_into(self.buf, start, frame_seq, keyword_index, time.monotonic())
+        self._set(H_EVENT_SEQ, event_seq + 1)
+
+    # Reader side (parent)
+    def read_frame(self, seq):
+        """Copy of frame seq, or None if the writer has already overwritten it"""
+        start = self.frames_offset + (seq % self.capacity) * self.frame_bytes
+        frame = bytes(self.buf[start:start + self.frame_bytes])
+        if self._get(H_WRITE_SEQ) - seq >= self.capacity:  # slot reused by seq + capacity
+            return None
+        return frame
+
+    def read_event(self, event_seq):
+        return EVENT.unpack_from(self.buf, self.events_offset + (event_seq % EVENT_SLOTS) * EVENT.size)
+
+
+def _make_detector(spec):
+    kind, kwargs = spec
+    if kind == "porcupine":
+        import pvporcupine
+        return pvporcupine.create(**kwargs)
+    from gerty_wakeword_bench import EnergyStubDetector
+    return EnergyStubDetector(**kwargs)
+
+
+def synthetic_frames(stop, frame_length=512, sample_rate=16000, driver_frames=4):
+    """
+    Real-time stand-in for a microphone: yields (frame, input_overflow) on the
+    frame clock. Like PortAudio it only buffers driver_frames periods, so a
+    consumer woken up later than that loses frames (reported as overflow).
+    """
+    frame_seconds = frame_length / sample_rate
+    frame = struct.pack(f"<{frame_length}h", *([0] * frame_length))
+    next_due = time.perf_counter() + frame_seconds
+    while not stop():
+        delay = next_due - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        late = time.perf_counter() - next_due
+        lost = int(late / frame_seconds) - driver_frames + 1
+        if lost > 0:
+            next_due += lost * frame_seconds
+            yield None, lost
+        next_due += frame_seconds
+        yield frame, 0
+
+
+def _pyaudio_frames(stop, paused, frame_length, sample_rate):
+    """Blocking-read capture; runs alone in the child so nothing competes for its GIL"""
+    import pyaudio
+    pa = pyaudio.PyAudio()
+    stream = pa.open(rate=sample_rate, channels=1, format=pyaudio.paInt16, input=True,
+                     frames_per_buffer=frame_length)
+    try:
+        while not stop():
+            if paused():
+                if stream.is_active():
+                    stream.stop_stream()
+                time.sleep(0.05)
+                continue
+            if not stream.is_active():
+                stream.start_stream()
+            try:
+                yield stream.read(frame_length, exception_on_overflow=True), 0
+            except OSError as e:
+                if getattr(e, "errno", None) != PA_INPUT_OVERFLOWED:
+                    raise
+                yield None, 1
+    finally:
+        stream.close()
+        pa.terminate()
+
+
+def _worker_main(shm_name, capacity, frame_length, sample_rate, detector_spec, source, stop_event, frontend=None):
+    """Child process: capture -> (clean up) -> detect -> publish the raw frame to shared memory"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    ring = SharedAudioRing(shm, capacity, frame_length)
+    detector = None
+    try:
+        detector = _make_detector(detector_spec)
+        if frontend is not None:
+            from gerty_dsp import AudioFrontEnd
+            frontend = AudioFrontEnd(sample_rate, frame_length, **frontend)
+        if detector.frame_length != frame_length:
+            raise ValueError(f"detector frame length {detector.frame_length} != {frame_length}")
+        ring._set(H_SAMPLE_RATE, detector.sample_rate)
+        ring._set(H_FRAME_LENGTH, detector.frame_length)
+        ring._set(H_STATE, STATE_RUNNING)
+
+        stop = stop_event.is_set
+        if source == "synthetic":
+            frames = synthetic_frames(stop, frame_length, sample_rate)
+        else:
+            frames = _pyaudio_frames(stop, lambda: ring._get(H_PAUSED), frame_length, sample_rate)
+
+        seq = event_seq = input_overflows = 0
+        detect_seconds = 0.0
+        for frame, overflow in frames:
+            ring._set(H_HEARTBEAT, time.monotonic())
+            if overflow:
+                input_overflows += overflow
+                ring._set(H_INPUT_OVERFLOWS, input_overflows)
+            if frame is None:
+                continue
+            start = time.perf_counter()
+            if frontend is not None:
+                keyword_index = detector.process(frontend.process(frame).tolist())
+            else:
+                keyword_index = detector.process(unpack_frame(frame, frame_length))
+            detect_seconds += time.perf_counter() - start
+            if keyword_index >= 0:  # event first, so the frame is never seen without it
+                ring.write_event(event_seq, seq, keyword_index)
+                event_seq += 1
+            ring.write_frame(seq, frame)
+            seq += 1
+            ring._set(H_FRAMES_PROCESSED, seq)
+            ring._set(H_DETECT_SECONDS, detect_seconds)
+        ring._set(H_STATE, STATE_STOPPED)
+    except Exception as e:
+        print(f"<AUDIO> Audio process failed: {e}", file=sys.stderr)
+        ring._set(H_STATE, STATE_FAILED)
+    finally:
+        if detector is not None:
+            detector.delete()
+        ring = None  # release its views of shm.buf so close() succeeds
+        shm.close()
+
+
+class AudioProcess:
+    """Parent-side handle: starts the child and reads its frames and keyword events"""
+
+    def __init__(self, detector_spec, source="pyaudio", capacity=64, frame_length=512, sample_rate=16000,
+                 frontend=None):
+        self.detector_spec = detector_spec
+        self.frontend = frontend  # AudioFrontEnd kwargs, run in the child before the detector
+        self.source = source
+        self.capacity = capacity
+        self.frame_length = frame_length
+        self.sample_rate = sample_rate
+        self.process = None
+        self.shm = None
+        self.ring = None
+        self.read_seq = 0
+        self.event_seq = 0
+        self.consumer_overflows = 0  # frames the parent was too slow to copy (detection is unaffected)
+        self._pending_events = {}
+        self._ctx = multiprocessing.get_context("spawn")  # never fork a process with audio/UI threads
+        self._stop = None
+
+    def start(self, timeout=10.0):
+        """Start the child and wait until its detector is ready; returns False if it failed"""
+        self.shm = shared_memory.SharedMemory(
+            create=True, size=SharedAudioRing.size(self.capacity, self.frame_length))
+        self.shm.buf[:HEADER.size] = bytes(HEADER.size)
+        self.ring = SharedAudioRing(self.shm, self.capacity, self.frame_length)
+        self._stop = self._ctx.Event()
+        self.process = self._ctx.Process(
+            target=_worker_main, name="gerty-audio", daemon=True,
+            args=(self.shm.name, self.capacity, self.frame_length, self.sample_rate,
+                  self.detector_spec, self.source, self._stop, self.frontend))
+        self.process.start()
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            state = self.ring._get(H_STATE)
+            if state == STATE_RUNNING:
+                return True
+            if state == STATE_FAILED or not self.process.is_alive():
+                break
+            time.sleep(0.02)
+        self.stop()
+        return False
+
+    @property
+    def alive(self):
+        return self.process is not None and self.process.is_alive() and self.ring._get(H_STATE) == STATE_RUNNING
+
+    @property
+    def frames_captured(self):
+        return self.ring._get(H_WRITE_SEQ) if self.ring else 0
+
+    def heartbeat_age(self):
+        """Seconds since the child last handled a frame"""
+        return time.monotonic() - self.ring._get(H_HEARTBEAT)
+
+    def set_paused(self, paused):
+        """Release (or re-open) the microphone, e.g. while speech recognition needs it"""
+        self.ring._set(H_PAUSED, 1 if paused else 0)
+
+    def read(self):
+        """
+        New [(seq, frame bytes or None, keyword index or -1)] since the last
+        call. A keyword whose frame was overwritten before we copied it still
+        comes through, with frame None.
+        """
+        events = self._pending_events
+        event_end = self.ring._get(H_EVENT_SEQ)
+        for event_seq in range(max(self.event_seq, event_end - EVENT_SLOTS), event_end):
+            frame_seq, keyword_index, _t = self.ring.read_event(event_seq)
+            events[frame_seq] = keyword_index
+        self.event_seq = event_end
+
+        frames = []
+        write_seq = self.ring._get(H_WRITE_SEQ)
+        if write_seq - self.read_seq >= self.capacity:
+            self.consumer_overflows += write_seq - self.capacity + 1 - self.read_seq
+            self.read_seq = write_seq - self.capacity + 1
+        for seq in sorted(s for s in events if s < self.read_seq):
+            frames.append((seq, None, events.pop(seq)))
+        for seq in range(self.read_seq, write_seq):
+            frame = self.ring.read_frame(seq)
+            keyword_index = events.pop(seq, -1)
+            if frame is None:
+                self.consumer_overflows += 1
+                if keyword_index < 0:
+                    continue
+            frames.append((seq, frame, keyword_index))
+        self.read_seq = write_seq
+        return frames
+
+    def stats(self):
+        header = self.ring.header() if self.ring else [0] * 10
+        return {
+            "frames_captured": header[H_WRITE_SEQ],
+            "frames_processed": header[H_FRAMES_PROCESSED],
+            "input_overflows": header[H_INPUT_OVERFLOWS],
+            "overflows": self.consumer_overflows,
+            "detect_seconds": round(header[H_DETECT_SECONDS], 3),
+            "keyword_events": header[H_EVENT_SEQ],
+        }
+
+    def stop(self):
+        if self._stop is not None:
+            self._stop.set()
+        if self.process is not None:
+            self.process.join(timeout=2)
+            if self.process.is_alive():
+                self.process.terminate()
+            self.process = None
+        if self.shm is not None:
+            self.ring = None
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+
+def synthetic_ui_load(stop, stall_ms=80, duty=0.5):
+    """
+    Main-thread stand-in for the UI: word wrapping in Python plus a JSON parse
+    sized to hold the GIL for about stall_ms in one C call, busy for the duty
+    fraction of the time
+    """
+    answer = json.dumps({"choices": [{"message": {"content": "word " * 50}}] * 64})
+    start = time.perf_counter()
+    json.loads(answer)
+    copies = max(1, int(stall_ms / 1000 / max(time.perf_counter() - start, 1e-6)))
+    blob = "[" + ",".join([answer] * copies) + "]"
+    while not stop():
+        busy_start = time.perf_counter()
+        json.loads(blob)
+        lines, line = [], ""
+        for word in ("Good morning Sam, the harvester reported a minor fault " * 20).split():
+            if len(line + word) < 50:
+                line += word + " "
+            else:
+                lines.append(line)
+                line = word + " "
+        busy = time.perf_counter() - busy_start
+        time.sleep(busy * (1 - duty) / duty)
+
+
+def _measure_in_process(seconds, stall_ms, duty, sensitivity):
+    """Capture thread + ring buffer + wake word worker thread, as in the default mode"""
+    from gerty_wakeword_bench import EnergyStubDetector
+
+    detector = EnergyStubDetector(sensitivity)
+    buffer = AudioRingBuffer(capacity=32)
+    done = threading.Event()
+
+    def capture():
+        for frame, overflow in synthetic_frames(done.is_set):
+            if frame is None:
+                buffer.stats.input_overflows += overflow
+            else:
+                buffer.put(frame)
+
+    def worker():
+        while not done.is_set():
+            frame = buffer.get(timeout=0.1)
+            if frame is not None:
+                detector.process(unpack_frame(frame, 512))
+
+    threads = [threading.Thread(target=capture, daemon=True), threading.Thread(target=worker, daemon=True)]
+    for thread in threads:
+        thread.start()
+    end = time.monotonic() + seconds
+    synthetic_ui_load(lambda: time.monotonic() > end, stall_ms, duty)
+    done.set()
+    for thread in threads:
+        thread.join(timeout=1)
+    stats = buffer.stats.snapshot()
+    return {"frames_captured": stats["frames_captured"], "input_overflows": stats["input_overflows"],
+            "ring_overflows": stats["overflows"], "parent_dropped": 0,
+            "detector_missed": stats["input_overflows"] + stats["overflows"]}
+
+
+def _measure_process(seconds, stall_ms, duty, sensitivity):
+    """Child process capture + detection, parent under UI load reading shared memory"""
+    audio = AudioProcess(("stub", {"sensitivity": sensitivity}), source="synthetic")
+    if not audio.start():
+        raise RuntimeError("audio process did not start")
+    done = threading.Event()
+
+    def consumer():
+        while not done.is_set():
+            audio.read()
+            time.sleep(0.01)
+
+    thread = threading.Thread(target=consumer, daemon=True)
+    thread.start()
+    try:
+        end = time.monotonic() + seconds
+        synthetic_ui_load(lambda: time.monotonic() > end, stall_ms, duty)
+    finally:
+        done.set()
+        thread.join(timeout=1)
+        stats = audio.stats()
+        audio.stop()
+    # Frames the parent drops only cost echo gating/recording; the child still ran detection on them
+    return {"frames_captured": stats["frames_captured"], "input_overflows": stats["input_overflows"],
+            "ring_overflows": 0, "parent_dropped": stats["overflows"],
+            "detector_missed": stats["input_overflows"]}
+
+
+def measure(seconds=20.0, stall_ms=80, duty=0.5, sensitivity=0.5):
+    """Overflow rates for both modes under the same synthetic UI load"""
+    results = {}
+    for mode, run in (("in-process", _measure_in_process), ("audio-process", _measure_process)):
+        stats = run(seconds, stall_ms, duty, sensitivity)
+        expected = seconds * 16000 / 512
+        stats["missed_percent"] = round(100 * stats["detector_missed"] / expected, 2)
+        stats["missed_per_minute"] = round(stats["detector_missed"] * 60 / seconds, 1)
+        results[mode] = stats
+    return results
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="GERTY audio process tools")
+    parser.add_argument("--measure", action="store_true", help="Compare overflow rates under synthetic UI load")
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--ui-stall-ms", type=float, default=80.0,
+                        help="Length of each GIL-holding UI step (JSON parse) in ms")
+    parser.add_argument("--ui-duty", type=float, default=0.5, help="Fraction of time the UI thread is busy")
+    parser.add_argument("--json", help="Write the results to this JSON file")
+    args = parser.parse_args(argv)
+    if not args.measure:
+        parser.print_help()
+        return 0
+
+    print(f"<AUDIO> {args.seconds:.0f}s per mode, UI stalls of {args.ui_stall_ms:.0f} ms at {args.ui_duty:.0%} duty")
+    results = measure(args.seconds, args.ui_stall_ms, args.ui_duty)
+    print(f"   {'mode':<14} {'frames':>7} {'input ovf':>10} {'ring ovf':>9} {'missed %':>9} {'missed/min':>11}")
+    for mode, stats in results.items():
+        print(f"   {mode:<14} {stats['frames_captured']:>7} {stats['input_overflows']:>10} "
+              f"{stats['ring_overflows']:>9} {stats['missed_percent']:>9} {stats['missed_per_minute']:>11}")
+    print("   input ovf = capture woke too late for the driver buffer, ring ovf = worker fell behind;"
+          " both are frames the wake word detector never saw")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
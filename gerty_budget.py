@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+GERTY response budget
+Answers only help while they fit on the screen: the overlay shows three
+lines of ~50 characters per page, and anything beyond ai.response_pages
+pages is generated (and waited for) but never seen. ResponseBudget turns
+that capacity into a word target for the prompt and a max_tokens cap for
+the request, then learns from every answer how long the AI takes per token
+and shrinks the limit when answers of that size would miss
+ai.target_latency. Answers cut off by the cap are trimmed back to the last
+complete sentence.
+
+    python gerty_budget.py --measure   # latency and wasted tokens vs a local stub AI
+"""
+
+import argparse
+import json
+import math
+import re
+import statistics
+import sys
+import threading
+import time
+from collections import deque
+
+from gerty import GertyScreen
+
+CHARS_PER_WORD = 6.0   # average English word plus a space
+HEADROOM = 1.3         # max_tokens over the word target, so the model can finish its sentence
+_SENTENCE_END = re.compile(r"[.!?](?=\s|$)")
+
+
+def display_capacity(screen, pages=1):
+    """Characters of answer text the screen can show over pages overlays"""
+    return screen.overlay_chars * screen.overlay_lines * max(pages, 1)
+
+
+def trim_to_sentence(text):
+    """text up to its last complete sentence (unchanged if it has none)"""
+    ends = list(_SENTENCE_END.finditer(text))
+    return text[:ends[-1].end()] if ends else text
+
+
+class ResponseBudget:
+    """
+    Length limit for AI answers: the display capacity, lowered when the
+    measured per-token time says a full-screen answer would take longer than
+    target_latency. Latency is modelled as overhead + tokens * per_token:
+    the overhead is fitted over the last window requests, and per_token
+    follows each answer (EWMA) so a slower server is noticed within a few
+    requests. Safe to use from several threads.
+    """
+
+    def __init__(self, capacity_chars, target_latency=4.0, min_tokens=16, chars_per_token=4.0, window=20):
+        self.capacity_chars = capacity_chars
+        self.target_latency = target_latency  # 0 = display capacity only
+        self.min_tokens = min_tokens
+        self.chars_per_token = chars_per_token  # refined from the server's usage counts
+        self.samples = deque(maxlen=window)     # (completion tokens, seconds)
+        self.overhead = None
+        self.per_token = None
+        self.requests = 0
+        self.truncated = 0
+        self.tokens_total = 0
+        self.latencies = deque(maxlen=200)
+        self._lock = threading.Lock()
+
+    def update(self, capacity_chars, target_latency):
+        """Follow display / config changes"""
+        self.capacity_chars = capacity_chars
+        self.target_latency = target_latency
+
+    @property
+    def max_tokens(self):
+        """Hard cap for the request: a screenful plus headroom, or less if that would be too slow"""
+        tokens = math.ceil(self.capacity_chars / self.chars_per_token * HEADROOM)
+        if self.target_latency and self.per_token:
+            tokens = min(tokens, int((self.target_latency - self.overhead) / self.per_token))
+        return max(self.min_tokens, tokens)
+
+    def instruction(self):
+        """Prompt sentence asking for an answer that ends comfortably inside the cap"""
+        words = max(5, int(self.max_tokens / HEADROOM * self.chars_per_token / CHARS_PER_WORD))
+        return f"Answer in at most {words} words. "
+
+    def record(self, text, seconds, completion_tokens=None, finish_reason=None):
+        """One finished request: answer text, total seconds and what the server reported"""
+        text = text or ""
+        with self._lock:
+            if completion_tokens and text:
+                self.chars_per_token = 0.8 * self.chars_per_token + 0.2 * (len(text) / completion_tokens)
+            tokens = completion_tokens or max(1, round(len(text) / self.chars_per_token))
+            self.requests += 1
+            self.tokens_total += tokens
+            self.latencies.append(seconds)
+            if finish_reason == "length":
+                self.truncated += 1
+            self.samples.append((tokens, seconds))
+            if self.per_token is not None:
+                rate = max((seconds - self.overhead) / tokens, 1e-4)
+                self.per_token = 0.6 * self.per_token + 0.4 * rate
+            self._fit()
+
+    def _fit(self):
+        """Overhead (and the first per-token estimate) by least squares over the recent samples"""
+        if len(self.samples) < 3:
+            return
+        xs = [x for x, _ in self.samples]
+        ys = [y for _, y in self.samples]
+        mean_x, mean_y = statistics.mean(xs), statistics.mean(ys)
+        var_x = sum((x - mean_x) ** 2 for x in xs)
+        if var_x < len(xs):  # less than one token of spread: nothing to separate overhead from
+            return
+        slope = sum((x - mean_x) * (y - mean_y) for x, y in self.samples) / var_x
+        overhead = max(0.0, mean_y - max(slope, 0.0) * mean_x)
+        self.overhead = min(overhead, min(ys))
+        if self.per_token is None:
+            self.per_token = max(slope, 1e-4)
+
+    def stats(self):
+        latencies = sorted(self.latencies)
+        return {
+            "requests": self.requests,
+            "max_tokens": self.max_tokens,
+            "mean_tokens": round(self.tokens_total / self.requests, 1) if self.requests else 0.0,
+            "mean_seconds": round(statistics.mean(latencies), 3) if latencies else 0.0,
+            "p95_seconds": round(latencies[int(len(latencies) * 0.95)], 3) if latencies else 0.0,
+            "truncated": self.truncated,
+            "overhead_s": round(self.overhead, 3) if self.overhead is not None else None,
+            "ms_per_token": round(self.per_token * 1000, 1) if self.per_token else None,
+            "chars_per_token": round(self.chars_per_token, 2),
+        }
+
+
+# Long-winded answers, as a chat model gives them without a length limit
+MEASURE_ANSWERS = [
+    "The Moon is about 384,400 kilometers from Earth on average. Its orbit is elliptical, so the distance "
+    "changes by around 40,000 kilometers over a month. Light takes a little over a second to make the trip. "
+    "The Apollo astronauts needed about three days to get there.",
+    "Helium-3 is a light isotope of helium with two protons and one neutron. It is rare on Earth but the lunar "
+    "regolith holds more of it, implanted by the solar wind over billions of years. Some people think it could "
+    "fuel future fusion reactors, though nobody has built one that works yet.",
+    "I'm doing fine, Sam. The base systems are all running normally and the harvesters are on schedule. "
+    "Is there anything you need from me today?",
+    "The sky looks black from the Moon because there is no atmosphere to scatter sunlight. On Earth, air "
+    "molecules scatter blue light in every direction, which is why the daytime sky is blue. Here there is "
+    "nothing to scatter it, so you see the stars even in daylight if your eyes adjust.",
+    "Your contract is for three years. You have a few weeks left before the return trip. After that a "
+    "replacement will take over the station and you will go home to Earth.",
+    "A lunar day lasts about 29.5 Earth days, from one sunrise to the next. That means roughly two weeks of "
+    "sunlight followed by two weeks of night. Temperatures swing from over 120 degrees Celsius to below minus "
+    "170 degrees Celsius.",
+]
+
+
+def measure(requests_per_phase=12, overhead=0.4, per_token=0.03, slow_per_token=0.08, target_latency=2.5):
+    """Answer latency and tokens nobody sees, without and with the budget, on a fast then a slow stub"""
+    import requests
+    from gerty_sim import StubAIServer
+
+    capacity = display_capacity(GertyScreen)
+    results = {}
+    for mode in ("unlimited", "budget"):
+        budget = ResponseBudget(capacity, target_latency)
+        for phase, speed in (("fast server", per_token), ("slow server", slow_per_token)):
+            latencies, generated, shown, limits = [], 0, 0, []
+            with StubAIServer(default_latency=overhead, token_latency=speed) as server:
+                session = requests.Session()
+                for i in range(requests_per_phase):
+                    answer = MEASURE_ANSWERS[i % len(MEASURE_ANSWERS)]
+                    server.answers = {"q": (answer, overhead)}
+                    payload = {"messages": [{"role": "user", "content": "q"}]}
+                    if mode == "budget":
+                        payload["max_tokens"] = budget.max_tokens
+                        limits.append(budget.max_tokens)
+                    start = time.perf_counter()
+                    data = session.post(server.url, json=payload, timeout=30).json()
+                    seconds = time.perf_counter() - start
+                    choice = data["choices"][0]
+                    text = choice["message"]["content"]
+                    tokens = data.get("usage", {}).get("completion_tokens")
+                    budget.record(text, seconds, tokens, choice.get("finish_reason"))
+                    if choice.get("finish_reason") == "length":
+                        text = trim_to_sentence(text)
+                    latencies.append(seconds)
+                    generated += tokens
+                    shown_text = text[:capacity]
+                    shown += round(len(shown_text) / 4)
+            results[f"{mode} / {phase}"] = {
+                "mean_seconds": round(statistics.mean(latencies), 3),
+                "settled_seconds": round(statistics.mean(latencies[len(latencies) // 2:]), 3),  # second half
+                "max_seconds": round(max(latencies), 3),
+                "tokens_generated": generated,
+                "tokens_unseen": max(0, generated - shown),
+                "max_tokens": f"{min(limits)}-{max(limits)}" if limits else "none",
+            }
+        results[f"{mode} / budget state"] = budget.stats()
+    return results
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="GERTY response budget tools")
+    parser.add_argument("--measure", action="store_true", help="Latency and unseen tokens with and without the budget")
+    parser.add_argument("--requests", type=int, default=12, help="Requests per server speed")
+    parser.add_argument("--target", type=float, default=2.5, help="Target seconds per answer")
+    parser.add_argument("--json", help="Write the results to this JSON file")
+    args = parser.parse_args(argv)
+    if not args.measure:
+        parser.print_help()
+        return 0
+
+    print(f"<BUDGET> {args.requests} requests per phase, stub 0.4 s + 30 ms/token then 80 ms/token, "
+          f"target {args.target:.1f} s, overlay {display_capacity(GertyScreen)} chars")
+    results = measure(args.requests, target_latency=args.target)
+    print(f"   {'mode / phase':<27} {'mean':>7} {'settled':>8} {'max':>7} {'tokens':>7} {'unseen':>7} "
+          f"{'max_tokens':>11}")
+    for name, stats in results.items():
+        if "tokens_generated" in stats:
+            print(f"   {name:<27} {stats['mean_seconds']:>6.2f}s {stats['settled_seconds']:>7.2f}s "
+                  f"{stats['max_seconds']:>6.2f}s "
+                  f"{stats['tokens_generated']:>7} {stats['tokens_unseen']:>7} {stats['max_tokens']:>11}")
+    state = results["budget / budget state"]
+    print(f"   {state['truncated']} answers cut at max_tokens and trimmed to a sentence")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+GERTY clocks
+SystemClock is the normal wall clock; VirtualClock lets simulations run the
+whole assistant deterministically without waiting in real time.
+"""
+
+import threading
+import time
+
+
+class SystemClock:
+    """Wall clock used in normal operation"""
+
+    def time(self):
+        return time.time()
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class VirtualClock:
+    """
+    Manually advanced clock. sleep() returns immediately after moving time
+    forward, and listeners are told about every advance so simulated inputs
+    (e.g. scripted microphone audio) can keep pace with virtual time.
+    """
+
+    def __init__(self, start=0.0):
+        self._now = start
+        self._lock = threading.RLock()
+        self._listeners = []
+
+    def time(self):
+        return self._now
+
+    def sleep(self, seconds):
+        self.advance(seconds)
+
+    def advance(self, seconds):
+        """Move time forward and notify listeners with (old_time, new_time)"""
+        if seconds <= 0:
+            return
+        with self._lock:
+            old = self._now
+            self._now = old + seconds
+            for listener in list(self._listeners):
+                listener(old, self._now)
+
+    def add_listener(self, callback):
+        self._listeners.append(callback)
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+GERTY configuration
+Typed settings read once at startup from a JSON file plus environment
+overrides, and re-read on SIGHUP. Settings marked restart=True only take
+effect after a restart (they are baked into the audio stream or window);
+everything else is applied live.
+
+File: $GERTY_CONFIG or gerty_config.json next to the scripts, e.g.
+    {"display": {"answer_duration": 6.0}, "ai": {"timeout": 10}}
+Environment: GERTY_<SECTION>_<FIELD>, e.g. GERTY_AI_TIMEOUT=10
+"""
+
+import json
+import os
+from dataclasses import dataclass, field, fields, is_dataclass
+from pathlib import Path
+
+DEFAULT_CONFIG_PATH = Path(__file__).parent / "gerty_config.json"
+
+DEFAULT_PROMPT = ("you are in an embedded machine named GERTY from the movie moon. Please respond concisely, "
+                  "and act like how a human would speak. Imagine that you are talking to Sam Bell. ")
+
+# Older environment variables that still work
+ENV_ALIASES = {
+    "GERTY_TTS": ("tts", "engine"),
+    "GERTY_PIPER_MODEL": ("tts", "piper_model"),
+    "PICOVOICE_ACCESS_KEY": ("wake", "access_key"),
+}
+
+
+def _restart(default):
+    """Field that only takes effect after a restart"""
+    return field(default=default, metadata={"restart": True})
+
+
+@dataclass
+class DisplayConfig:
+    width: int = _restart(1024)
+    height: int = _restart(600)
+    display_time: float = 2.0        # default seconds per image
+    boot_duration: float = 3.0
+    idle_refresh: float = 0.5        # idle screen redraw period
+    listening_duration: float = 1.0
+    thinking_duration: float = 2.0
+    answer_duration: float = 5.0
+    error_duration: float = 3.0
+    poll_ms: int = 50                # key/wake word poll interval while showing an image
+    power_save: bool = True          # idle: draw the face once, poll slower, then dim and blank
+    idle_poll_ms: int = 100          # key/wake word poll interval while idle
+    dim_after: float = 120.0         # idle seconds before dimming (0 = never)
+    sleep_after: float = 600.0       # idle seconds before blanking; only the wake word wakes (0 = never)
+    dim_level: float = 0.3
+    backlight: str = _restart("")    # sysfs backlight to dim as well, e.g. /sys/class/backlight/rpi_backlight
+
+
+@dataclass
+class AIConfig:
+    url: str = "https://ai.hackclub.com/chat/completions"
+    prompt: str = DEFAULT_PROMPT
+    timeout: float = 15.0
+    connect_timeout: float = 3.0     # fail fast when the host is unreachable
+    budget: bool = True              # cap answer length to what the display can show
+    response_pages: int = 1          # overlay pages (3 lines each) an answer may fill
+    target_latency: float = 4.0      # seconds per answer the length cap adapts to (0 = display capacity only)
+
+
+@dataclass
+class WakeConfig:
+    access_key: str = _restart("fill in with your access key :)")
+    keyword_dir: str = _restart(str(Path(__file__).parent))
+    sensitivity: float = _restart(0.5)
+    ring_buffer_frames: int = _restart(32)  # 32 x 512 samples ~ 1 s at 16 kHz
+    audio_process: bool = _restart(False)   # capture + detection in a child process (or --audio-process)
+    barge_in_budget: float = 0.1
+
+
+@dataclass
+class FrontEndConfig:
+    enabled: bool = _restart(False)  # clean mic audio for the wake word and speech recognition
+    highpass_hz: float = _restart(100.0)
+    agc_target_dbfs: float = _restart(-20.0)
+    agc_max_gain_db: float = _restart(24.0)
+    noise_suppression: bool = _restart(True)
+    noise_floor_db: float = _restart(-20.0)  # strongest attenuation of a noise-only bin
+    budget_ms: float = _restart(2.0)         # per 512-sample frame; noise suppression is dropped above it
+
+
+@dataclass
+class SpeechConfig:
+    listen_timeout: float = 5.0
+    phrase_time_limit: float = 10.0
+    ambient_duration: float = 0.5
+    speculate: bool = True           # ask the AI early on a stable partial transcript (streaming inputs only)
+    speculate_after: float = 0.3     # seconds a partial must stay unchanged
+
+
+@dataclass
+class TTSConfig:
+    engine: str = "auto"             # auto | espeak | piper | silent | off
+    piper_model: str = ""
+
+
+@dataclass
+class RecorderConfig:
+    enabled: bool = _restart(False)  # opt-in field recording of every interaction
+    directory: str = _restart("recordings")
+    pre_roll: float = _restart(2.0)  # seconds of audio kept before the wake word
+    post_roll: float = _restart(1.5)
+    max_sessions: int = 50
+    max_megabytes: float = 50.0
+
+
+@dataclass
+class ProfilerConfig:
+    enabled: bool = _restart(False)  # start sampling at boot (SIGUSR1 / P key toggle at runtime)
+    interval: float = 0.02           # seconds between stack samples
+    directory: str = "profiles"
+
+
+@dataclass
+class OfflineConfig:
+    enabled: bool = _restart(True)   # connectivity monitor + local answers during outages
+    probe_interval: float = _restart(10.0)
+    offline_probe_interval: float = _restart(3.0)
+    probe_timeout: float = _restart(2.0)
+    cache_path: str = _restart("answer_cache.json")
+    cache_size: int = _restart(200)
+    stt_engine: str = "sphinx"       # local speech recognition while offline: sphinx | off
+
+
+@dataclass
+class IntentConfig:
+    enabled: bool = True             # answer simple commands locally before STT text goes to the AI
+
+
+@dataclass
+class SupervisorConfig:
+    enabled: bool = _restart(False)  # watchdog with per-component warm restart (or --supervise)
+    check_interval: float = _restart(0.5)
+    audio_stall: float = _restart(3.0)  # seconds without captured frames before audio is restarted
+    ui_stall: float = _restart(30.0)    # seconds without a UI heartbeat (listening can block ~15 s)
+    ai_failures: int = 3                # consecutive AI errors before the HTTP pool is rebuilt
+    max_restarts: int = _restart(5)     # per component within restart_window, then give up
+    restart_window: float = _restart(300.0)
+
+
+@dataclass
+class ApiConfig:
+    enabled: bool = _restart(False)  # local HTTP/WebSocket control API (or --api)
+    host: str = _restart("127.0.0.1")
+    port: int = _restart(8765)
+    token: str = _restart("")        # if set, clients send "Authorization: Bearer <token>"
+    max_clients: int = _restart(64)
+
+
+@dataclass
+class GertyConfig:
+    display: DisplayConfig = field(default_factory=DisplayConfig)
+    ai: AIConfig = field(default_factory=AIConfig)
+    wake: WakeConfig = field(default_factory=WakeConfig)
+    frontend: FrontEndConfig = field(default_factory=FrontEndConfig)
+    speech: SpeechConfig = field(default_factory=SpeechConfig)
+    tts: TTSConfig = field(default_factory=TTSConfig)
+    recorder: RecorderConfig = field(default_factory=RecorderConfig)
+    profiler: ProfilerConfig = field(default_factory=ProfilerConfig)
+    supervisor: SupervisorConfig = field(default_factory=SupervisorConfig)
+    offline: OfflineConfig = field(default_factory=OfflineConfig)
+    intents: IntentConfig = field(default_factory=IntentConfig)
+    api: ApiConfig = field(default_factory=ApiConfig)
+
+    def to_dict(self):
+        return {f.name: {s.name: getattr(getattr(self, f.name), s.name) for s in fields(getattr(self, f.name))}
+                for f in fields(self)}
+
+
+def _coerce(value, kind):
+    """Convert a JSON/env value to the field's declared type"""
+    if kind is bool or kind == "bool":
+        if isinstance(value, str):
+            return value.strip().lower() in ("1", "true", "yes", "on")
+        return bool(value)
+    if kind is int or kind == "int":
+        return int(value)
+    if kind is float or kind == "float":
+        return float(value)
+    return str(value)
+
+
+def _set(config, section, name, value, source):
+    section_obj = getattr(config, section, None)
+    if section_obj is None or not is_dataclass(section_obj):
+        print(f"<CONFIG> Unknown section '{section}' in {source}")
+        return
+    for f in fields(section_obj):
+        if f.name == name:
+            try:
+                setattr(section_obj, name, _coerce(value, f.type))
+            except (TypeError, ValueError):
+                print(f"<CONFIG> Bad value for {section}.{name} in {source}: {value!r}")
+            return
+    print(f"<CONFIG> Unknown setting '{section}.{name}' in {source}")
+
+
+def apply_dict(config, data, source="overrides"):
+    """Apply {section: {field: value}} on top of a config"""
+    for section, values in data.items():
+        for name, value in (values or {}).items():
+            _set(config, section, name, value, source)
+    return config
+
+
+def load_config(path=None, environ=None):
+    """Build a GertyConfig from defaults, the JSON file (if present) and the environment"""
+    environ = os.environ if environ is None else environ
+    path = Path(path or environ.get("GERTY_CONFIG") or DEFAULT_CONFIG_PATH)
+    config = GertyConfig()
+
+    if path.exists():
+        try:
+            with open(path) as f:
+                apply_dict(config, json.load(f), path.name)
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"<CONFIG> Could not read {path}: {e} - using defaults")
+
+    for env_name, (section, name) in ENV_ALIASES.items():
+        if env_name in environ:
+            _set(config, section, name, environ[env_name], env_name)
+    for f in fields(config):
+        for s in fields(getattr(config, f.name)):
+            env_name = f"GERTY_{f.name}_{s.name}".upper()
+            if env_name in environ:
+                _set(config, f.name, s.name, environ[env_name], env_name)
+    return config
+
+
+def diff_config(old, new):
+    """Return [(section.name, old, new, needs_restart)] for every changed setting"""
+    changes = []
+    for f in fields(old):
+        old_section, new_section = getattr(old, f.name), getattr(new, f.name)
+        for s in fields(old_section):
+            before, after = getattr(old_section, s.name), getattr(new_section, s.name)
+            if before != after:
+                changes.append((f"{f.name}.{s.name}", before, after, bool(s.metadata.get("restart"))))
+    return changes
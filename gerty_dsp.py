@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+GERTY audio front end
+Optional clean-up of microphone audio before the wake word detector and the
+speech recogniser: DC / high-pass filtering, spectral noise suppression and
+automatic gain control, all on whole numpy blocks.
+
+Each 512-sample frame is analysed as two 50%-overlapping sqrt-Hann windows.
+High-pass and noise suppression are one gain per FFT bin, and the windows are
+overlap-added back, so the output lags the input by half a window (16 ms at
+16 kHz). The noise spectrum is tracked continuously (fast fall, slow rise),
+so it adapts to a fan or a harvester without any training. AGC follows the
+block RMS with a fast attack / slow release envelope, holds its gain in
+silence and ramps it across each block so there are no clicks.
+
+The stage watches its own cost: if the average time per frame goes over
+budget_ms, noise suppression (the expensive part) is switched off.
+"""
+
+import time
+
+from gerty.startup import LazyModule
+
+np = LazyModule("numpy")
+
+NOISE_RISE = 1.02      # per frame, ~2.7 dB/s upward drift of the noise estimate
+NOISE_FALL = 0.3       # weight of a quieter frame in the noise estimate
+GAIN_SMOOTHING = 0.6   # per window, suppression gain memory (limits "musical noise")
+SILENCE_DBFS = -55.0   # below this AGC holds its gain instead of boosting noise
+
+
+def _dbfs(db):
+    return 32768.0 * 10 ** (db / 20.0)
+
+
+class FrontEndStats:
+    """Per-frame cost of the front end"""
+
+    def __init__(self):
+        self.frames = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.over_budget = 0
+
+    def snapshot(self):
+        return {
+            "frames": self.frames,
+            "mean_ms": round(self.total_seconds / self.frames * 1000, 3) if self.frames else 0.0,
+            "max_ms": round(self.max_seconds * 1000, 3),
+            "over_budget": self.over_budget,
+        }
+
+
+class AudioFrontEnd:
+    """Stateful frame-by-frame preprocessor for 16-bit mono PCM"""
+
+    def __init__(self, sample_rate=16000, frame_length=512, highpass_hz=100.0, agc_target_dbfs=-20.0,
+                 agc_max_gain_db=24.0, noise_suppression=True, noise_floor_db=-20.0, budget_ms=2.0):
+        if frame_length % 2:
+            raise ValueError("frame length must be even")
+        self.sample_rate = sample_rate
+        self.frame_length = frame_length
+        self.hop = frame_length // 2
+        self.noise_suppression = noise_suppression
+        self.budget = budget_ms / 1000.0
+
+        # Periodic sqrt-Hann: analysis x synthesis window sums to 1 at 50% overlap
+        self.window = np.sqrt(np.hanning(frame_length + 1)[:-1]).astype(np.float32)
+        freqs = np.fft.rfftfreq(frame_length, 1.0 / sample_rate)
+        # 0 at DC, ramping to 1 at the cut-off
+        self.highpass = np.clip(freqs / highpass_hz, 0.0, 1.0).astype(np.float32) if highpass_hz else \
+            np.ones(len(freqs), np.float32)
+        self.floor = 10 ** (noise_floor_db / 20.0)
+
+        self.target = _dbfs(agc_target_dbfs)
+        self.max_gain = 10 ** (agc_max_gain_db / 20.0)
+        self.silence = _dbfs(SILENCE_DBFS)
+        self.reset()
+
+    def reset(self):
+        """Forget the noise estimate, gains and overlap state"""
+        bins = self.frame_length // 2 + 1
+        self.noise = None
+        self.ns_gain = np.ones(bins, np.float32)
+        self.level = None
+        self.agc_gain = 1.0
+        self._in_tail = np.zeros(self.hop, np.float32)
+        self._out_tail = np.zeros(self.hop, np.float32)
+        self.stats = FrontEndStats()
+        self._mean_cost = 0.0
+
+    def process(self, frame):
+        """One frame of PCM bytes -> cleaned frame as an int16 array"""
+        start = time.perf_counter()
+        n, hop = self.frame_length, self.hop
+        x = np.frombuffer(frame, dtype="<i2").astype(np.float32)
+        buf = np.concatenate((self._in_tail, x))
+        self._in_tail = buf[-hop:]
+
+        segments = np.lib.stride_tricks.sliding_window_view(buf, n)[::hop]  # (2, n), no copy
+        spectrum = np.fft.rfft(segments * self.window, axis=1)
+        gain = self.highpass
+        if self.noise_suppression:
+            gain = gain * self._suppression(spectrum)
+        y = np.fft.irfft(spectrum * gain, n=n, axis=1).astype(np.float32) * self.window
+
+        out = np.empty(n + hop, np.float32)
+        out[:n] = y[0]
+        out[:hop] += self._out_tail
+        out[n:] = 0.0
+        out[hop:] += y[1]
+        self._out_tail = out[n:]
+        out = self._agc(out[:n])
+        result = np.clip(out, -32768, 32767).astype(np.int16)
+        self._account(time.perf_counter() - start)
+        return result
+
+    def _suppression(self, spectrum):
+        """Per-window Wiener gains (2, bins) from the tracked noise spectrum"""
+        power = spectrum.real ** 2 + spectrum.imag ** 2
+        frame_power = power.mean(axis=0)
+        if self.noise is None:
+            self.noise = frame_power
+        else:
+            self.noise = np.where(frame_power > self.noise, self.noise * NOISE_RISE,
+                                  (1 - NOISE_FALL) * self.noise + NOISE_FALL * frame_power)
+        snr = np.maximum(power / (self.noise + 1e-6) - 1.0, 0.0)
+        wiener = np.maximum(snr / (snr + 1.0), self.floor)
+        gains = np.empty_like(wiener, dtype=np.float32)
+        g = self.ns_gain
+        for i in range(len(wiener)):
+            g = gains[i] = GAIN_SMOOTHING * g + (1 - GAIN_SMOOTHING) * wiener[i]
+        self.ns_gain = g
+        return gains
+
+    def _agc(self, out):
+        rms = float(np.sqrt(np.mean(out * out)))
+        gain = self.agc_gain
+        if rms > self.silence:
+            if self.level is None:
+                self.level = rms
+            elif rms > self.level:
+                self.level = 0.5 * self.level + 0.5 * rms    # attack
+            else:
+                self.level = 0.97 * self.level + 0.03 * rms  # release
+            gain = min(self.target / self.level, self.max_gain)
+        if gain != self.agc_gain:
+            out = out * np.linspace(self.agc_gain, gain, len(out), dtype=np.float32)
+            self.agc_gain = gain
+        elif gain != 1.0:
+            out = out * gain
+        return out
+
+    def _account(self, seconds):
+        stats = self.stats
+        stats.frames += 1
+        stats.total_seconds += seconds
+        stats.max_seconds = max(stats.max_seconds, seconds)
+        if seconds > self.budget:
+            stats.over_budget += 1
+        self._mean_cost = 0.98 * self._mean_cost + 0.02 * seconds
+        if self.noise_suppression and stats.frames > 50 and self._mean_cost > self.budget:
+            self.noise_suppression = False
+            print(f"<AUDIO> Front end averaging {self._mean_cost * 1000:.2f} ms per frame "
+                  f"(budget {self.budget * 1000:.1f} ms), noise suppression disabled")
+
+    def process_buffer(self, pcm):
+        """A whole recording (16-bit PCM bytes) -> cleaned bytes of the same length, delay removed"""
+        n = self.frame_length
+        samples = len(pcm) // 2
+        frames = -(-samples // n) + 1  # one extra frame flushes the overlap delay
+        padded = pcm[:samples * 2] + bytes((frames * n - samples) * 2)
+        out = np.concatenate([self.process(padded[i * n * 2:(i + 1) * n * 2]) for i in range(frames)])
+        return out[self.hop:self.hop + samples].tobytes()
+
+
+def create_frontend(settings, sample_rate=16000, frame_length=512):
+    """AudioFrontEnd from a FrontEndConfig, or None when the stage is disabled"""
+    if not settings.enabled:
+        return None
+    return AudioFrontEnd(sample_rate, frame_length, **frontend_kwargs(settings))
+
+
+def frontend_kwargs(settings):
+    """Constructor arguments from a FrontEndConfig (picklable, for the audio process)"""
+    return {
+        "highpass_hz": settings.highpass_hz,
+        "agc_target_dbfs": settings.agc_target_dbfs,
+        "agc_max_gain_db": settings.agc_max_gain_db,
+        "noise_suppression": settings.noise_suppression,
+        "noise_floor_db": settings.noise_floor_db,
+        "budget_ms": settings.budget_ms,
+    }
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+GERTY response emotions
+Picks the face to show with an AI answer from the words in it. The
+classifier is a small weighted lexicon with negation and intensifier
+handling (tens of microseconds per answer, no model files); EmotionWorker
+runs it on a background thread as the answer streams in and prefetches the
+chosen frame, so the UI thread finds the face already decoded and scaled.
+"""
+
+import re
+import threading
+
+# word or two-word phrase -> {emotion: weight}; emotion names as in gerty.assets.EMOTION_INDEX
+LEXICON = {
+    # happy (big grin) / content (smile)
+    "great": {"happy": 1.0}, "wonderful": {"happy": 1.2}, "fantastic": {"happy": 1.2}, "excellent": {"happy": 1.0},
+    "love": {"happy": 1.0}, "glad": {"happy": 1.0}, "happy": {"happy": 1.0}, "delighted": {"happy": 1.2},
+    "fun": {"happy": 0.8}, "haha": {"happy": 1.2}, "joke": {"happy": 0.6}, "congratulations": {"happy": 1.2},
+    "awesome": {"happy": 1.2}, "enjoy": {"happy": 0.8}, "laugh": {"happy": 0.8}, "yay": {"happy": 1.2},
+    "good": {"content": 0.6}, "nice": {"content": 0.6}, "sure": {"content": 0.4}, "hello": {"content": 0.6},
+    "thanks": {"content": 0.6}, "thank you": {"content": 0.8}, "welcome": {"content": 0.6},
+    "of course": {"content": 0.6}, "fine": {"content": 0.5}, "okay": {"content": 0.3}, "safe": {"content": 0.6},
+    "help": {"content": 0.4}, "hope": {"content": 0.5},
+    # thinking (flat face): explanations and figures
+    "because": {"thinking": 0.5}, "approximately": {"thinking": 0.8}, "about": {"thinking": 0.2},
+    "depends": {"thinking": 0.8}, "calculate": {"thinking": 0.8}, "kilometers": {"thinking": 0.6},
+    "miles": {"thinking": 0.6}, "degrees": {"thinking": 0.6}, "percent": {"thinking": 0.6},
+    "roughly": {"thinking": 0.8}, "let me think": {"thinking": 1.2}, "consider": {"thinking": 0.6},
+    # surprised
+    "wow": {"surprised": 1.2}, "amazing": {"surprised": 1.0, "happy": 0.4}, "incredible": {"surprised": 1.0},
+    "surprising": {"surprised": 1.0}, "unexpected": {"surprised": 1.0},
+    "whoa": {"surprised": 1.2}, "oh": {"surprised": 0.5}, "remarkable": {"surprised": 0.8},
+    # sad / disappointed (glum) / crying
+    "sorry": {"sad": 1.0}, "unfortunately": {"sad": 1.0}, "sad": {"sad": 1.0}, "miss": {"sad": 0.8},
+    "alone": {"sad": 0.8}, "lonely": {"crying": 1.0}, "bad": {"sad": 0.6}, "regret": {"sad": 1.0},
+    "can't": {"disappointed": 0.8}, "cannot": {"disappointed": 0.8}, "unable": {"disappointed": 1.0},
+    "failed": {"disappointed": 1.0}, "fail": {"disappointed": 0.8}, "lost": {"disappointed": 0.8},
+    "broken": {"disappointed": 0.8}, "impossible": {"disappointed": 0.8}, "too bad": {"disappointed": 1.0},
+    "died": {"crying": 1.4}, "death": {"crying": 1.2}, "dead": {"crying": 1.2}, "tragic": {"crying": 1.4},
+    "grief": {"crying": 1.4}, "cry": {"crying": 1.2}, "tears": {"crying": 1.2}, "heartbreaking": {"crying": 1.4},
+    "never see": {"crying": 1.0}, "goodbye": {"sad": 0.6},
+    # skeptical (wry) / unsure
+    "actually": {"skeptical": 0.8}, "however": {"skeptical": 0.6}, "doubt": {"skeptical": 1.0},
+    "hmm": {"skeptical": 1.0}, "unlikely": {"skeptical": 1.0}, "supposedly": {"skeptical": 1.0},
+    "well": {"skeptical": 0.3}, "but": {"skeptical": 0.3}, "claim": {"skeptical": 0.6},
+    "maybe": {"unsure": 0.8}, "perhaps": {"unsure": 0.8}, "might": {"unsure": 0.6}, "possibly": {"unsure": 0.8},
+    "not sure": {"unsure": 1.4}, "don't know": {"unsure": 1.4}, "unclear": {"unsure": 1.0},
+    "guess": {"unsure": 0.8}, "confusing": {"unsure": 1.0}, "uncertain": {"unsure": 1.2},
+    # worried
+    "careful": {"worried": 1.0}, "danger": {"worried": 1.2}, "dangerous": {"worried": 1.2},
+    "warning": {"worried": 1.0}, "risk": {"worried": 0.8}, "afraid": {"worried": 1.0}, "worried": {"worried": 1.2},
+    "emergency": {"worried": 1.4}, "alarm": {"worried": 1.0}, "fault": {"worried": 0.8}, "oxygen": {"worried": 0.6},
+    "urgent": {"worried": 1.0}, "problem": {"worried": 0.8}, "scary": {"worried": 1.2},
+}
+
+NEGATIONS = {"not", "no", "never", "don't", "doesn't", "didn't", "isn't", "wasn't", "aren't", "won't", "nothing"}
+INTENSIFIERS = {"very": 1.5, "so": 1.3, "really": 1.5, "extremely": 1.8, "quite": 1.2, "truly": 1.5}
+
+# What a negated word counts towards instead
+NEGATED = {"happy": "disappointed", "content": "unsure", "surprised": "content", "sad": "content",
+           "disappointed": "content", "crying": "sad", "worried": "content", "unsure": "content",
+           "skeptical": "content", "thinking": "thinking"}
+
+_WORD = re.compile(r"[a-z']+|\d+|[!?]")
+
+
+class EmotionClassifier:
+    """Lexicon scorer mapping text to an emotion name"""
+
+    def __init__(self, lexicon=None, default="content", threshold=0.8):
+        self.lexicon = LEXICON if lexicon is None else lexicon
+        self.default = default
+        self.threshold = threshold  # weakest score that beats the default face
+
+    def scores(self, text):
+        """{emotion: score} for the text"""
+        return self._score(text)[0]
+
+    def _score(self, text):
+        """(scores, whether any lexicon word was negated)"""
+        tokens = _WORD.findall(text.lower())
+        scores = {}
+        negated_any = False
+        negate_until = -1
+        boost = 1.0
+        skip = False
+        for i, token in enumerate(tokens):
+            if skip:
+                skip = False
+                continue
+            entry = self.lexicon.get(token + " " + tokens[i + 1]) if i + 1 < len(tokens) else None
+            if entry is not None:
+                skip = True  # two-word phrase
+            elif token in NEGATIONS:
+                negate_until = i + 3
+                continue
+            elif token in INTENSIFIERS:
+                boost = INTENSIFIERS[token]
+                continue
+            elif token.isdigit():
+                scores["thinking"] = scores.get("thinking", 0.0) + 0.3
+                continue
+            elif token == "!":
+                top = max(("happy", "surprised", "worried"), key=lambda e: scores.get(e, 0.0))
+                scores[top] = scores.get(top, 0.0) + 0.3
+                continue
+            else:
+                entry = self.lexicon.get(token)
+                if entry is None:
+                    continue
+            negated = i <= negate_until
+            negated_any = negated_any or negated
+            for emotion, weight in entry.items():
+                if negated:
+                    emotion = NEGATED.get(emotion, emotion)
+                scores[emotion] = scores.get(emotion, 0.0) + weight * boost
+            boost = 1.0
+        return scores, negated_any
+
+    def classify(self, text):
+        """
+        Best emotion for the text, or the default when nothing stands out.
+        A negated word always counts, however weak: "not good" should never get the default smile
+        """
+        scores, negated = self._score(text or "")
+        if not scores:
+            return self.default
+        emotion, score = max(scores.items(), key=lambda item: item[1])
+        return emotion if score >= self.threshold or negated else self.default
+
+
+class EmotionWorker:
+    """
+    Classifies the latest submitted text on a background thread and calls
+    prefetch(emotion) for each new result. Submitting the growing answer
+    while it streams keeps the face ready before the text is complete.
+    """
+
+    def __init__(self, classifier=None, prefetch=None):
+        self.classifier = classifier or EmotionClassifier()
+        self.prefetch = prefetch
+        self._pending = None
+        self._latest = (None, None)  # (text, emotion)
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="emotion", daemon=True)
+        self._thread.start()
+
+    def submit(self, text):
+        """Queue text for classification (replaces anything not yet started)"""
+        with self._cond:
+            self._pending = text
+            self._cond.notify_all()
+
+    def emotion_for(self, text, timeout=0.05):
+        """Emotion for text, from the worker if it is done in time, else computed here"""
+        with self._cond:
+            if self._latest[0] != text and self._pending != text:
+                self._pending = text
+                self._cond.notify_all()
+            self._cond.wait_for(lambda: self._latest[0] == text, timeout)
+            if self._latest[0] == text:
+                return self._latest[1]
+        return self.classifier.classify(text)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending is not None)
+                text, self._pending = self._pending, None
+            emotion = self.classifier.classify(text)
+            if self.prefetch is not None and emotion != self._latest[1]:
+                try:
+                    self.prefetch(emotion)
+                except Exception as e:
+                    print(f"<EMOTION> Prefetch failed: {e}")
+            with self._cond:
+                self._latest = (text, emotion)
+                self._cond.notify_all()
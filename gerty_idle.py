@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+GERTY idle power mode
+Between interactions the assistant only needs to notice the wake word. The
+idle state machine moves from awake (face shown once, not redrawn) to dim
+after display.dim_after seconds and to asleep (blank screen, backlight off
+if configured) after display.sleep_after seconds. Only the wake word wakes
+a sleeping GERTY.
+
+    python gerty_idle.py --measure   # idle CPU seconds per hour, old loop vs each state
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+AWAKE, DIM, ASLEEP = "awake", "dim", "asleep"
+
+
+class IdleStateMachine:
+    """Idle state from the time since the last interaction"""
+
+    def __init__(self, clock, dim_after=120.0, sleep_after=600.0):
+        self.clock = clock
+        self.dim_after = dim_after      # 0 = never dim
+        self.sleep_after = sleep_after  # 0 = never blank
+        self.last_activity = clock.time()
+        self.forced_sleep = False
+
+    def touch(self):
+        """Restart the dim/sleep countdown"""
+        self.last_activity = self.clock.time()
+
+    def wake(self):
+        """Wake word or key: back to awake"""
+        self.touch()
+        self.forced_sleep = False
+
+    def sleep(self):
+        """Blank straight away (e.g. "go to sleep")"""
+        self.forced_sleep = True
+
+    @property
+    def state(self):
+        idle = self.clock.time() - self.last_activity
+        if self.forced_sleep or (self.sleep_after and idle >= self.sleep_after):
+            return ASLEEP
+        if self.dim_after and idle >= self.dim_after:
+            return DIM
+        return AWAKE
+
+
+class Backlight:
+    """sysfs backlight (e.g. /sys/class/backlight/rpi_backlight) driven by the idle state"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.max_brightness = int((self.path / "max_brightness").read_text())
+        self.full = int((self.path / "brightness").read_text()) or self.max_brightness
+        if not os.access(self.path / "brightness", os.W_OK):
+            # Usually root-only; a udev rule can hand it to the video group
+            raise PermissionError(f"{self.path / 'brightness'} is not writable")
+
+    def set_level(self, level):
+        """level 0..1 of the brightness the screen had at startup"""
+        (self.path / "brightness").write_text(str(round(self.full * level)))
+
+
+class _BlitWindow:
+    """cv2-style window that copies each frame (stand-in for the blit) and sleeps in waitKey"""
+
+    WINDOW_NORMAL = 0
+
+    def __init__(self):
+        self.frames_shown = 0
+        self._screen = None
+
+    def namedWindow(self, name, flags=0):
+        pass
+
+    def resizeWindow(self, name, width, height):
+        pass
+
+    def imshow(self, name, img):
+        self._screen = img.copy()
+        self.frames_shown += 1
+
+    def waitKey(self, delay=0):
+        time.sleep(max(delay, 1) / 1000.0)
+        return -1
+
+    def destroyAllWindows(self):
+        pass
+
+
+def measure(seconds=20.0):
+    """CPU seconds per idle hour of the display loop, legacy redraw vs each idle state"""
+    from gerty_config import GertyConfig
+    from gerty_simple_voice import GERTYSimpleVoice
+
+    config = GertyConfig()
+    config.tts.engine = "off"
+    config.offline.enabled = False
+    results = {}
+    for mode in ("legacy", AWAKE, DIM, ASLEEP):
+        ui = _BlitWindow()
+        gerty = GERTYSimpleVoice(config=config, ui=ui)
+        config.display.power_save = mode != "legacy"
+        if mode == DIM:
+            gerty.idle.last_activity -= config.display.dim_after
+        elif mode == ASLEEP:
+            gerty.idle.sleep()
+        start_wall, start_cpu = time.perf_counter(), time.process_time()
+        while time.perf_counter() - start_wall < seconds:
+            gerty.wait_idle()
+        cpu = time.process_time() - start_cpu
+        wall = time.perf_counter() - start_wall
+        results[mode] = {"cpu_seconds_per_hour": round(cpu / wall * 3600, 1),
+                         "frames_shown": ui.frames_shown}
+    return results
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="GERTY idle power tools")
+    parser.add_argument("--measure", action="store_true", help="Idle CPU cost of the display loop per state")
+    parser.add_argument("--seconds", type=float, default=20.0, help="Run time per mode")
+    parser.add_argument("--json", help="Write the results to this JSON file")
+    args = parser.parse_args(argv)
+    if not args.measure:
+        parser.print_help()
+        return 0
+
+    print(f"<IDLE> {args.seconds:.0f}s per mode (display loop only; wake word detection costs the same in all)")
+    results = measure(args.seconds)
+    print(f"   {'mode':<8} {'CPU s/hour':>11} {'frames':>7}")
+    for mode, stats in results.items():
+        print(f"   {mode:<8} {stats['cpu_seconds_per_hour']:>11} {stats['frames_shown']:>7}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
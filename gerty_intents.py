@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+GERTY local intents
+Fast path between transcription and the AI: short commands and questions
+that need no language model ("what time is it", "stop", "go to sleep",
+"show me your happy face") are matched against a handler registry and
+answered in well under a millisecond.
+
+Matching is two-stage: every intent lists trigger keywords, and a word ->
+intents index picks the few candidates whose precompiled, anchored regex
+is then tried. Anchoring keeps longer questions ("what time is it in
+Tokyo") on the AI path.
+"""
+
+import re
+import time
+from collections import Counter
+
+# Actions the assistant carries out for an intent (besides showing/speaking the reply)
+REPLY, STOP, SLEEP, EMOTION = "reply", "stop", "sleep", "emotion"
+
+# Words that may wrap a command without changing it
+_LEAD = r"^(?:(?:hey |ok |okay )?gerty |please |can you |could you |would you )*"
+_TAIL = r"(?: please| gerty| now| for me)*$"
+
+
+def normalize_question(text):
+    """Lower case, punctuation and extra whitespace removed"""
+    return " ".join(re.sub(r"[^\w\s']", " ", text.lower()).split())
+
+
+def phrase(*alternatives):
+    """Anchored pattern matching any alternative, optionally wrapped in polite filler"""
+    return _LEAD + "(?:" + "|".join(alternatives) + ")" + _TAIL
+
+
+class IntentResult:
+    """What to do for a matched intent"""
+
+    def __init__(self, reply=None, action=REPLY, emotion="happy"):
+        self.reply = reply
+        self.action = action
+        self.emotion = emotion
+
+    def __repr__(self):
+        return f"IntentResult({self.reply!r}, action={self.action!r}, emotion={self.emotion!r})"
+
+
+class Intent:
+    def __init__(self, name, pattern, keywords, handler):
+        self.name = name
+        self.pattern = re.compile(pattern)
+        self.keywords = frozenset(keywords)
+        self.handler = handler  # handler(match, now) -> IntentResult
+
+
+class IntentRegistry:
+    """Keyword-indexed set of intents, tried in registration order"""
+
+    def __init__(self):
+        self.intents = []
+        self._index = {}
+        self.stats = Counter()
+
+    def register(self, name, pattern, keywords, handler):
+        intent = Intent(name, pattern, keywords, handler)
+        order = len(self.intents)
+        self.intents.append(intent)
+        for word in intent.keywords:
+            self._index.setdefault(word, []).append(order)
+        return intent
+
+    def match(self, text):
+        """(intent, match) for the first intent matching the question, or (None, None)"""
+        key = normalize_question(text)
+        candidates = set()
+        for word in key.split():
+            candidates.update(self._index.get(word, ()))
+        for order in sorted(candidates):
+            intent = self.intents[order]
+            match = intent.pattern.match(key)
+            if match:
+                return intent, match
+        return None, None
+
+    def handle(self, text, now=None):
+        """IntentResult for the question, or None if it should go to the AI"""
+        intent, match = self.match(text)
+        if intent is None:
+            return None
+        self.stats[intent.name] += 1
+        result = intent.handler(match, now or time.localtime())
+        result.intent = intent.name
+        return result
+
+
+def _time(match, now):
+    return IntentResult(f"It's {time.strftime('%I:%M %p', now).lstrip('0')}, Sam.")
+
+
+def _date(match, now):
+    return IntentResult(f"Today is {time.strftime('%A, %B', now)} {now.tm_mday}, {now.tm_year}.")
+
+
+def _day(match, now):
+    return IntentResult(f"It's {time.strftime('%A', now)}, Sam.")
+
+
+def _stop(match, now):
+    return IntentResult(None, action=STOP, emotion="neutral")
+
+
+def _sleep(match, now):
+    return IntentResult("Goodnight, Sam.", action=SLEEP, emotion="neutral")
+
+
+def _emotion(match, now):
+    word = match.group("emotion") or match.group("emotion2")
+    return IntentResult(None, action=EMOTION, emotion=EMOTION_WORDS[word])
+
+
+# Spoken word -> emotion name understood by gerty.assets
+EMOTION_WORDS = {
+    "happy": "happy", "smiling": "happy", "smiley": "happy",
+    "sad": "sad", "unhappy": "sad",
+    "thinking": "thinking", "thoughtful": "thinking",
+    "confused": "confused", "puzzled": "confused",
+    "listening": "listening",
+    "neutral": "neutral", "normal": "neutral",
+    "surprised": "surprised", "shocked": "surprised",
+    "crying": "crying", "worried": "worried", "scared": "worried",
+    "skeptical": "skeptical", "unsure": "unsure", "disappointed": "disappointed",
+}
+
+
+def default_registry():
+    """Built-in intents: time, date, day, stop, sleep and face display"""
+    registry = IntentRegistry()
+    registry.register("time", phrase(r"what time is it", r"what's the time", r"what is the time",
+                                     r"tell me the time", r"the time"), ["time"], _time)
+    registry.register("date", phrase(r"what's the date(?: today)?", r"what is the date(?: today)?",
+                                     r"what's today's date", r"what is today's date", r"what date is it"),
+                      ["date"], _date)
+    registry.register("day", phrase(r"what day is (?:it|today)", r"which day is it"), ["day"], _day)
+    registry.register("stop", phrase(r"stop", r"never ?mind", r"cancel", r"be quiet", r"quiet",
+                                     r"shut up", r"that's all", r"nothing"),
+                      ["stop", "never", "nevermind", "cancel", "quiet", "shut", "that's", "nothing"], _stop)
+    registry.register("sleep", phrase(r"go to sleep", r"(?:good ?night|sleep mode)", r"sleep"),
+                      ["sleep", "goodnight", "good", "night"], _sleep)
+    emotions = "|".join(sorted(EMOTION_WORDS, key=len, reverse=True))
+    registry.register("emotion", phrase(r"(?:show|make|give)(?: me)? (?:a |an |your |the )?(?P<emotion>"
+                                        + emotions + r")(?: face| expression)?",
+                                        r"(?:look|be) (?P<emotion2>" + emotions + r")"),
+                      ["show", "make", "give", "look", "be"], _emotion)
+    return registry
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+GERTY wake word keyword registry
+Loads every Porcupine .ppn model for the running platform into one detector
+and maps the keyword index returned by ``porcupine.process`` to an action
+"""
+
+import glob
+import os
+import re
+import sys
+from pathlib import Path
+
+# Actions a keyword can trigger
+WAKE = "wake"
+STOP = "stop"
+SHUTDOWN = "shutdown"
+ACTIONS = (WAKE, STOP, SHUTDOWN)
+
+# Default action per keyword phrase (as it appears in the .ppn file name)
+DEFAULT_ACTIONS = {
+    "Hey-GERTY": WAKE,
+    "Hey-Goodie": WAKE,
+    "Stop": STOP,
+    "GERTY-Stop": STOP,
+    "Go-To-Sleep": SHUTDOWN,
+    "GERTY-Shutdown": SHUTDOWN,
+}
+
+# e.g. Hey-GERTY_en_raspberry-pi_v3_0_0.ppn
+PPN_PATTERN = re.compile(r"^(?P<phrase>.+?)_(?P<lang>[a-z]{2})_(?P<platform>[a-z0-9-]+)_v(?P<version>[0-9_]+)\.ppn$")
+
+
+def detect_platform():
+    """Return the Porcupine platform name for this machine"""
+    if sys.platform == "darwin":
+        return "mac"
+    if sys.platform.startswith("win"):
+        return "windows"
+    try:
+        with open("/proc/device-tree/model", "r", errors="ignore") as f:
+            if "raspberry pi" in f.read().lower():
+                return "raspberry-pi"
+    except OSError:
+        pass
+    return "linux"
+
+
+def parse_keyword_file(path):
+    """Split a .ppn file name into (phrase, language, platform) or None if it doesn't match"""
+    match = PPN_PATTERN.match(os.path.basename(str(path)))
+    if not match:
+        return None
+    return match.group("phrase"), match.group("lang"), match.group("platform")
+
+
+class KeywordSpec:
+    """One keyword phrase with its model files per platform"""
+
+    def __init__(self, name, action=WAKE, sensitivity=0.5):
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown keyword action '{action}' (expected one of {ACTIONS})")
+        self.name = name
+        self.action = action
+        self.sensitivity = sensitivity
+        self.paths = {}  # platform -> model path
+
+    def __repr__(self):
+        return f"KeywordSpec({self.name!r}, action={self.action!r}, platforms={sorted(self.paths)})"
+
+
+class KeywordRegistry:
+    """Collects keyword models and resolves the set to load for the current platform"""
+
+    def __init__(self, platform=None):
+        self.platform = platform or detect_platform()
+        self.specs = {}
+        self._active = []  # KeywordSpecs in the order they were passed to Porcupine
+
+    def register(self, name, path, platform, action=None, sensitivity=None):
+        """Add a model file for a keyword phrase"""
+        spec = self.specs.get(name)
+        if spec is None:
+            spec = KeywordSpec(name, action or DEFAULT_ACTIONS.get(name, WAKE))
+            self.specs[name] = spec
+        elif action:
+            spec.action = action
+        if sensitivity is not None:
+            spec.sensitivity = sensitivity
+        spec.paths[platform] = str(path)
+        return spec
+
+    def discover(self, directory, actions=None):
+        """Register every .ppn model found in ``directory``"""
+        actions = actions or {}
+        found = 0
+        for path in sorted(glob.glob(str(Path(directory) / "*.ppn"))):
+            parsed = parse_keyword_file(path)
+            if parsed is None:
+                print(f"   <WARNING> Ignoring keyword model with unexpected name: {path}")
+                continue
+            phrase, _lang, platform = parsed
+            self.register(phrase, path, platform, action=actions.get(phrase))
+            found += 1
+        return found
+
+    def resolve(self):
+        """
+        Pick the models to load for this platform.
+
+        Falls back to every discovered model when none was built for this
+        platform, so Porcupine reports the mismatch instead of silently
+        starting without a keyword.
+        """
+        active = [spec for spec in self.specs.values() if self.platform in spec.paths]
+        paths = [spec.paths[self.platform] for spec in active]
+        if not active:
+            for spec in self.specs.values():
+                platform, path = sorted(spec.paths.items())[0]
+                print(f"   <WARNING> No '{self.platform}' model for '{spec.name}', trying {platform} model")
+                active.append(spec)
+                paths.append(path)
+        self._active = active
+        return paths
+
+    def sensitivities(self):
+        """Sensitivities matching the order returned by resolve()"""
+        return [spec.sensitivity for spec in self._active]
+
+    def keyword_for(self, keyword_index):
+        """Map a Porcupine keyword index back to its KeywordSpec (None if no detection)"""
+        if 0 <= keyword_index < len(self._active):
+            return self._active[keyword_index]
+        return None
+
+    def action_for(self, keyword_index):
+        """Map a Porcupine keyword index to its action name (None if no detection)"""
+        spec = self.keyword_for(keyword_index)
+        return spec.action if spec else None
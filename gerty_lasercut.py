@@ -0,0 +1,589 @@
+#!/usr/bin/env python3
+"""
+GERTY laser-cut toolpath optimiser
+Reads the R12 DXFs in design/Techsoft (CRLF, LINE / ARC / CIRCLE / POLYLINE
+with VERTEX + SEQEND / POINT) one group-code pair at a time, so the text of
+a 200k-line file is never held in memory, only the geometry parsed from it.
+
+The exported drawings cut in file order: hundreds of separate LINE
+fragments, each with its own pierce and a rapid move to wherever the next
+one happens to start, and outer contours often cut before the holes inside
+them (the part drops or shifts before its holes are done). This tool:
+
+  - joins fragments whose ends meet (within --tolerance, same layer and
+    colour) into continuous paths, closing them when they come back round
+  - orders the paths nearest-first from the laser's home corner, starting
+    closed paths at whichever vertex (or, for circles, point) is nearest
+  - never cuts a contour before everything inside it
+
+and writes the result as an R12 DXF of bulged POLYLINEs, keeping the
+original header and tables. Entities it does not cut (POINT, TEXT, 3D
+polylines, ...) are copied through unchanged.
+
+    python gerty_lasercut.py design/Techsoft/*.dxf            # writes optimised/<name>.dxf
+    python gerty_lasercut.py FILE.dxf --cut-speed 20 --json report.json
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+ENCODING = "cp1252"     # R12 files from Techsoft 2D Design are ANSI
+CHORD_TOLERANCE = 0.1   # mm, when arcs are flattened for inside/outside tests
+
+
+# DXF reading -----------------------------------------------------------------
+
+def read_pairs(stream):
+    """(group code, value) pairs from an open DXF text stream"""
+    while True:
+        code = stream.readline()
+        if not code:
+            return
+        value = stream.readline()
+        yield int(code), value.strip()
+
+
+def _records(pairs):
+    """Group pairs into (type, [(code, value), ...]) records, stopping after ENDSEC"""
+    kind, group = None, []
+    for code, value in pairs:
+        if code == 0:
+            if kind is not None:
+                yield kind, group
+            if value == "ENDSEC":
+                return
+            kind, group = value, []
+        else:
+            group.append((code, value))
+    if kind is not None:
+        yield kind, group
+
+
+class Drawing:
+    """A DXF split into what comes before ENTITIES, the entities, and what comes after"""
+
+    def __init__(self, preamble, entities, passthrough, postamble):
+        self.preamble = preamble        # raw pairs up to and including "2 ENTITIES"
+        self.entities = entities        # Toolpaths in file order
+        self.passthrough = passthrough  # raw records copied to the output unchanged
+        self.postamble = postamble      # raw pairs after the ENTITIES section, without EOF
+
+
+def read_dxf(path):
+    """Stream-parse a DXF into a Drawing"""
+    with open(path, encoding=ENCODING, errors="replace") as f:
+        pairs = read_pairs(f)
+        preamble = []
+        for pair in pairs:
+            preamble.append(pair)
+            if pair == (2, "ENTITIES") and len(preamble) > 1 and preamble[-2] == (0, "SECTION"):
+                break
+        else:
+            raise ValueError(f"{path}: no ENTITIES section")
+
+        entities, passthrough = [], []
+        polyline = None  # (header record, [vertex records]) while inside POLYLINE ... SEQEND
+        for kind, group in _records(pairs):
+            if polyline is not None:
+                if kind == "VERTEX":
+                    polyline[1].append(group)
+                    continue
+                path = _polyline_path(*polyline)
+                if path is None:
+                    passthrough.append(("POLYLINE", polyline[0]))
+                    passthrough.extend(("VERTEX", vertex) for vertex in polyline[1])
+                    passthrough.append((kind, group))
+                elif path.points:
+                    entities.append(path)
+                polyline = None
+                if kind == "SEQEND":
+                    continue
+            if kind == "POLYLINE":
+                polyline = (group, [])
+                continue
+            path = _entity_path(kind, group)
+            if path is None:
+                passthrough.append((kind, group))
+            else:
+                entities.append(path)
+        postamble = [pair for pair in pairs if pair != (0, "EOF")]
+    return Drawing(preamble, entities, passthrough, postamble)
+
+
+def _fields(group):
+    fields = {}
+    for code, value in group:
+        fields.setdefault(code, value)
+    return fields
+
+
+def _style(fields):
+    """(layer, linetype, colour): only paths with the same style are joined or written together"""
+    return fields.get(8, "0"), fields.get(6), fields.get(62)
+
+
+def _entity_path(kind, group):
+    """Toolpath for a LINE / ARC / CIRCLE, or None for entities that are not cut"""
+    f = _fields(group)
+    try:
+        if kind == "LINE":
+            start = (float(f[10]), float(f[20]))
+            end = (float(f[11]), float(f[21]))
+            return Toolpath([start, end], [0.0], _style(f))
+        if kind == "CIRCLE":
+            return Toolpath.full_circle((float(f[10]), float(f[20])), float(f[40]), _style(f))
+        if kind == "ARC":
+            return Toolpath.arc((float(f[10]), float(f[20])), float(f[40]), float(f[50]), float(f[51]), _style(f))
+    except KeyError:
+        pass
+    return None
+
+
+def _polyline_path(header, vertices):
+    """Toolpath for a 2D POLYLINE, or None for 3D polylines and meshes"""
+    f = _fields(header)
+    flags = int(f.get(70, 0))
+    if flags & (8 | 16 | 64):
+        return None
+    points, bulges = [], []
+    for vertex in vertices:
+        v = _fields(vertex)
+        if int(v.get(70, 0)) & 16:  # spline frame control point, not on the curve
+            continue
+        points.append((float(v.get(10, 0.0)), float(v.get(20, 0.0))))
+        bulges.append(float(v.get(42, 0.0)))
+    if flags & 1 and len(points) > 1:
+        points.append(points[0])
+    else:
+        bulges = bulges[:-1]
+    return Toolpath(points, bulges[:max(len(points) - 1, 0)], _style(f))
+
+
+# Geometry --------------------------------------------------------------------
+
+def _dist(a, b):
+    return math.hypot(a[0] - b[0], a[1] - b[1])
+
+
+def _segment_length(a, b, bulge):
+    chord = _dist(a, b)
+    if not bulge:
+        return chord
+    theta = 4 * math.atan(abs(bulge))
+    return chord * theta / (2 * math.sin(theta / 2)) if theta < 2 * math.pi - 1e-9 else chord
+
+
+def _arc_points(a, b, bulge, tolerance=CHORD_TOLERANCE):
+    """Points along a bulged segment (excluding a), within tolerance of the true arc"""
+    chord = _dist(a, b)
+    if not bulge or chord == 0:
+        return [b]
+    theta = 4 * math.atan(bulge)
+    radius = chord / (2 * math.sin(abs(theta) / 2))
+    # centre is perpendicular to the chord midpoint, on the side given by the bulge sign
+    mx, my = (a[0] + b[0]) / 2, (a[1] + b[1]) / 2
+    offset = radius * math.cos(abs(theta) / 2) * (1 if (abs(theta) < math.pi) == (bulge > 0) else -1)
+    nx, ny = -(b[1] - a[1]) / chord, (b[0] - a[0]) / chord
+    cx, cy = mx + nx * offset, my + ny * offset
+    start = math.atan2(a[1] - cy, a[0] - cx)
+    step = 2 * math.acos(max(-1.0, 1 - tolerance / radius)) if radius > tolerance else abs(theta)
+    n = max(2, int(abs(theta) / max(step, 1e-3)) + 1)
+    return [(cx + radius * math.cos(start + theta * i / n), cy + radius * math.sin(start + theta * i / n))
+            for i in range(1, n)] + [b]
+
+
+class Toolpath:
+    """
+    A continuous cut: points joined by straight (bulge 0) or arc segments,
+    as in a DXF POLYLINE. Closed paths repeat their first point at the end.
+    """
+
+    __slots__ = ("points", "bulges", "style", "circle", "_polygon", "_bbox")
+
+    def __init__(self, points, bulges, style, circle=None):
+        self.points = points
+        self.bulges = bulges      # bulges[i] belongs to the segment points[i] -> points[i + 1]
+        self.style = style
+        self.circle = circle      # (centre, radius) when the path is a whole circle
+        self._polygon = None
+        self._bbox = None
+
+    @classmethod
+    def full_circle(cls, centre, radius, style, angle=0.0):
+        """Whole circle as two half-circle arcs, starting at angle (radians)"""
+        cx, cy = centre
+        start = (cx + radius * math.cos(angle), cy + radius * math.sin(angle))
+        middle = (2 * cx - start[0], 2 * cy - start[1])
+        return cls([start, middle, start], [1.0, 1.0], style, circle=(centre, radius))
+
+    @classmethod
+    def arc(cls, centre, radius, start_deg, end_deg, style):
+        sweep = (end_deg - start_deg) % 360.0 or 360.0
+        if sweep >= 359.999:
+            return cls.full_circle(centre, radius, style, math.radians(start_deg))
+        a0, a1 = math.radians(start_deg), math.radians(end_deg)
+        start = (centre[0] + radius * math.cos(a0), centre[1] + radius * math.sin(a0))
+        end = (centre[0] + radius * math.cos(a1), centre[1] + radius * math.sin(a1))
+        return cls([start, end], [math.tan(math.radians(sweep) / 4)], style)
+
+    @property
+    def start(self):
+        return self.points[0]
+
+    @property
+    def end(self):
+        return self.points[-1]
+
+    @property
+    def closed(self):
+        return len(self.points) > 2 and self.points[0] == self.points[-1] or self.circle is not None
+
+    @property
+    def length(self):
+        return sum(_segment_length(a, b, bulge) for a, b, bulge in zip(self.points, self.points[1:], self.bulges))
+
+    def reversed(self):
+        return Toolpath(self.points[::-1], [-b for b in self.bulges[::-1]], self.style, self.circle)
+
+    def starting_at(self, index):
+        """Closed path re-entered at points[index]"""
+        if index == 0:
+            return self
+        points = self.points[index:-1] + self.points[:index] + [self.points[index]]
+        return Toolpath(points, self.bulges[index:] + self.bulges[:index], self.style)
+
+    def polygon(self):
+        """Flattened outline (arcs as chords)"""
+        if self._polygon is None:
+            polygon = [self.points[0]]
+            for a, b, bulge in zip(self.points, self.points[1:], self.bulges):
+                polygon.extend(_arc_points(a, b, bulge))
+            self._polygon = polygon
+        return self._polygon
+
+    def bbox(self):
+        if self._bbox is None:
+            xs = [p[0] for p in self.polygon()]
+            ys = [p[1] for p in self.polygon()]
+            self._bbox = (min(xs), min(ys), max(xs), max(ys))
+        return self._bbox
+
+    def probe(self):
+        """A point on the path well away from its ends, for inside/outside tests"""
+        polygon = self.polygon()
+        return polygon[len(polygon) // 2]
+
+    def contains(self, point):
+        """Even-odd point-in-polygon test (closed paths)"""
+        x, y = point
+        inside = False
+        polygon = self.polygon()
+        for (x1, y1), (x2, y2) in zip(polygon, polygon[1:]):
+            if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+                inside = not inside
+        return inside
+
+    def area(self):
+        x0, y0, x1, y1 = self.bbox()
+        return (x1 - x0) * (y1 - y0)
+
+    def entry(self, position):
+        """(travel distance, path oriented to start nearest position)"""
+        if self.circle is not None:
+            (cx, cy), radius = self.circle
+            angle = math.atan2(position[1] - cy, position[0] - cx)
+            return abs(math.hypot(position[0] - cx, position[1] - cy) - radius), \
+                Toolpath.full_circle(self.circle[0], radius, self.style, angle)
+        if self.closed:
+            best = min(range(len(self.points) - 1), key=lambda i: _dist(position, self.points[i]))
+            return _dist(position, self.points[best]), self.starting_at(best)
+        to_start, to_end = _dist(position, self.start), _dist(position, self.end)
+        return (to_start, self) if to_start <= to_end else (to_end, self.reversed())
+
+    def bbox_distance(self, position):
+        """Lower bound for entry(): distance from position to the bounding box"""
+        x0, y0, x1, y1 = self.bbox()
+        dx = max(x0 - position[0], 0.0, position[0] - x1)
+        dy = max(y0 - position[1], 0.0, position[1] - y1)
+        return math.hypot(dx, dy)
+
+
+# Optimisation ----------------------------------------------------------------
+
+def join_paths(paths, tolerance=0.01):
+    """
+    Chain open paths whose ends meet into longer paths (closing them when the
+    chain comes back to its start). Returns (joined paths, source indices per path)
+    """
+    def cell(point):
+        return round(point[0] / tolerance), round(point[1] / tolerance)
+
+    ends = defaultdict(list)  # grid cell -> [(path index, 0 = start / 1 = end)]
+    for i, path in enumerate(paths):
+        if not path.closed:
+            ends[cell(path.start)].append((i, 0))
+            ends[cell(path.end)].append((i, 1))
+    used = [False] * len(paths)
+
+    def neighbour(point, style):
+        cx, cy = cell(point)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for j, which in ends.get((cx + dx, cy + dy), ()):
+                    candidate = paths[j]
+                    if not used[j] and candidate.style == style and \
+                            _dist(point, candidate.end if which else candidate.start) <= tolerance:
+                        return j, which
+        return None
+
+    joined, sources = [], []
+    for i, path in enumerate(paths):
+        if used[i]:
+            continue
+        used[i] = True
+        if path.closed:
+            joined.append(path)
+            sources.append([i])
+            continue
+        points, bulges, members = list(path.points), list(path.bulges), [i]
+        for forward in (True, False):
+            while not (len(points) > 2 and _dist(points[0], points[-1]) <= tolerance):
+                found = neighbour(points[-1] if forward else points[0], path.style)
+                if found is None:
+                    break
+                j, which = found
+                used[j] = True
+                members.append(j)
+                piece = paths[j]
+                # forward: the piece must start at our end; backward: it must end at our start
+                if forward == bool(which):
+                    piece = piece.reversed()
+                if forward:
+                    points.extend(piece.points[1:])
+                    bulges.extend(piece.bulges)
+                else:
+                    points[:0] = piece.points[:-1]
+                    bulges[:0] = piece.bulges
+        if len(points) > 2 and _dist(points[0], points[-1]) <= tolerance:
+            points[-1] = points[0]
+        joined.append(Toolpath(points, bulges, path.style))
+        sources.append(members)
+    return joined, sources
+
+
+def containers(paths):
+    """For each path, the indices of the closed paths it lies inside"""
+    closed = sorted((i for i, p in enumerate(paths) if p.closed), key=lambda i: paths[i].area())
+    inside = [[] for _ in paths]
+    for i, path in enumerate(paths):
+        x0, y0, x1, y1 = path.bbox()
+        area = path.area()
+        probe = path.probe()
+        for j in closed:
+            outer = paths[j]
+            if j == i or outer.area() <= area:
+                continue
+            ox0, oy0, ox1, oy1 = outer.bbox()
+            if ox0 <= x0 and oy0 <= y0 and x1 <= ox1 and y1 <= oy1 and outer.contains(probe):
+                inside[i].append(j)
+    return inside
+
+
+def order_paths(paths, home=(0.0, 0.0), inside=None):
+    """
+    Nearest-next ordering from home in which no closed path is cut before
+    the paths inside it. Returns (path indices, oriented paths) in cutting order
+    """
+    if inside is None:
+        inside = containers(paths)
+    waiting = [0] * len(paths)  # paths still to cut inside each one
+    for outers in inside:
+        for j in outers:
+            waiting[j] += 1
+    ready = [i for i in range(len(paths)) if not waiting[i]]
+    position = home
+    order, ordered = [], []
+    while ready:
+        ready.sort(key=lambda i: paths[i].bbox_distance(position))
+        best, best_cost, best_path = None, math.inf, None
+        for k, i in enumerate(ready):
+            if paths[i].bbox_distance(position) >= best_cost:
+                break
+            cost, oriented = paths[i].entry(position)
+            if cost < best_cost:
+                best, best_cost, best_path = k, cost, oriented
+        i = ready.pop(best)
+        order.append(i)
+        ordered.append(best_path)
+        position = best_path.end
+        for j in inside[i]:
+            waiting[j] -= 1
+            if not waiting[j]:
+                ready.append(j)
+    return order, ordered
+
+
+def inside_out_violations(finished, inside):
+    """Paths finished after a contour they lie inside (finished: when each path is done, by index)"""
+    return sum(1 for i, outers in enumerate(inside) for j in outers if finished[i] > finished[j])
+
+
+def estimate(paths, cut_speed, travel_speed, pierce, home=(0.0, 0.0)):
+    """Cut / travel distances (mm) and time (s) for paths cut in this order and direction"""
+    position = home
+    cut = travel = 0.0
+    for path in paths:
+        travel += _dist(position, path.start)
+        cut += path.length
+        position = path.end
+    return {
+        "paths": len(paths),
+        "cut_mm": round(cut, 1),
+        "travel_mm": round(travel, 1),
+        "seconds": round(cut / cut_speed + travel / travel_speed + len(paths) * pierce, 1),
+    }
+
+
+# DXF writing -----------------------------------------------------------------
+
+def _number(value):
+    return f"{value:.6f}".rstrip("0").rstrip(".") if value % 1 else str(int(value))
+
+
+def write_dxf(path, drawing, ordered):
+    """R12 DXF with the ordered paths as POLYLINEs, header, tables and other entities as read"""
+    with open(path, "w", encoding=ENCODING, newline="\r\n") as f:
+        def pair(code, value):
+            f.write(f"{code:>3}\n{value}\n")
+
+        for code, value in drawing.preamble:
+            pair(code, value)
+        for p in ordered:
+            layer, linetype, colour = p.style
+            closed = p.closed
+            style = [(8, layer)] + ([(6, linetype)] if linetype else []) + ([(62, colour)] if colour else [])
+            pair(0, "POLYLINE")
+            for code, value in style:
+                pair(code, value)
+            for code, value in ((66, 1), (10, 0), (20, 0), (30, 0), (70, 1 if closed else 0)):
+                pair(code, value)
+            points = p.points[:-1] if closed else p.points
+            for i, (x, y) in enumerate(points):
+                pair(0, "VERTEX")
+                pair(8, layer)
+                pair(10, _number(x))
+                pair(20, _number(y))
+                pair(30, 0)
+                bulge = p.bulges[i] if i < len(p.bulges) else 0.0
+                if bulge:
+                    pair(42, _number(bulge))
+            pair(0, "SEQEND")
+            pair(8, layer)
+        for kind, group in drawing.passthrough:
+            pair(0, kind)
+            for code, value in group:
+                pair(code, value)
+        pair(0, "ENDSEC")
+        for code, value in drawing.postamble:
+            pair(code, value)
+        pair(0, "EOF")
+
+
+def optimise(source, output, cut_speed=15.0, travel_speed=150.0, pierce=0.3, tolerance=0.01):
+    """Optimise one DXF into output; returns the before/after report"""
+    timings = {}
+    start = time.perf_counter()
+    drawing = read_dxf(source)
+    timings["parse"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    joined, sources = join_paths(drawing.entities, tolerance)
+    timings["join"] = time.perf_counter() - start
+    start = time.perf_counter()
+    inside = containers(joined)
+    order, ordered = order_paths(joined, inside=inside)
+    timings["order"] = time.perf_counter() - start
+    start = time.perf_counter()
+    write_dxf(output, drawing, ordered)
+    timings["write"] = time.perf_counter() - start
+
+    # In file order a contour is finished when its last fragment is cut
+    finished = [max(members) for members in sources]
+    before = estimate(drawing.entities, cut_speed, travel_speed, pierce)
+    after = estimate(ordered, cut_speed, travel_speed, pierce)
+    if abs(before["cut_mm"] - after["cut_mm"]) > 0.1 + 1e-4 * before["cut_mm"]:
+        print(f"<LASER> {source}: cut length changed {before['cut_mm']} -> {after['cut_mm']} mm, check the output")
+    before["inner_after_outer"] = inside_out_violations(finished, inside)
+    after["inner_after_outer"] = inside_out_violations(_positions(order), inside)
+    return {
+        "file": str(source),
+        "output": str(output),
+        "entities": len(drawing.entities),
+        "kept_as_is": len(drawing.passthrough),
+        "before": before,
+        "after": after,
+        "timings_ms": {k: round(v * 1000, 1) for k, v in timings.items()},
+    }
+
+
+def _positions(order):
+    """Cutting position of each path index"""
+    positions = [0] * len(order)
+    for n, i in enumerate(order):
+        positions[i] = n
+    return positions
+
+
+def _minutes(seconds):
+    return f"{int(seconds // 60)}:{int(seconds % 60):02d}"
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="GERTY laser-cut toolpath optimiser")
+    parser.add_argument("files", nargs="+", help="DXF files (e.g. design/Techsoft/*.dxf)")
+    parser.add_argument("--output-dir", default="optimised", help="Where the optimised DXFs are written")
+    parser.add_argument("--cut-speed", type=float, default=15.0, help="Cutting speed in mm/s")
+    parser.add_argument("--travel-speed", type=float, default=150.0, help="Rapid (laser off) speed in mm/s")
+    parser.add_argument("--pierce", type=float, default=0.3, help="Seconds per laser start")
+    parser.add_argument("--tolerance", type=float, default=0.01, help="Gap in mm still joined into one path")
+    parser.add_argument("--json", help="Write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    out_dir = Path(args.output_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    reports = []
+    print(f"<LASER> cut {args.cut_speed:g} mm/s, travel {args.travel_speed:g} mm/s, {args.pierce:g} s per pierce")
+    print(f"   {'file':<34} {'paths':>11} {'travel m':>13} {'inner late':>11} {'est. time':>13} {'ms':>6}")
+    for source in args.files:
+        source = Path(source)
+        try:
+            report = optimise(source, out_dir / source.name, args.cut_speed, args.travel_speed, args.pierce,
+                              args.tolerance)
+        except (OSError, ValueError) as e:
+            print(f"<LASER> {source}: {e}")
+            continue
+        reports.append(report)
+        b, a = report["before"], report["after"]
+        print(f"   {source.name[:34]:<34} {b['paths']:>5}->{a['paths']:<5} "
+              f"{b['travel_mm'] / 1000:>6.1f}->{a['travel_mm'] / 1000:<5.1f} "
+              f"{b['inner_after_outer']:>4}->{a['inner_after_outer']:<4} "
+              f"{_minutes(b['seconds']):>6}->{_minutes(a['seconds']):<6} {sum(report['timings_ms'].values()):>6.0f}")
+    if len(reports) > 1:
+        before = sum(r["before"]["seconds"] for r in reports)
+        after = sum(r["after"]["seconds"] for r in reports)
+        print(f"   total estimated time {_minutes(before)} -> {_minutes(after)} "
+              f"({(before - after) / before:.0%} less), written to {out_dir}/")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=2)
+    return 0 if reports else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
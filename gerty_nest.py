@@ -0,0 +1,682 @@
+#!/usr/bin/env python3
+"""
+GERTY sheet nesting
+Packs the parts from several laser-cut DXFs onto as few stock sheets as
+possible and writes one cut file per sheet.
+
+Parts are found in the drawings rather than declared: paths that touch
+(within --join) or lie inside one another are one part, and the short
+fragments the Techsoft exports leave around finger joints are folded into
+the part they sit against. Each part is packed as its convex hull, its
+bounding polygon, so sloped and rounded parts sit closer than their
+bounding boxes would allow. Placement is first fit, largest parts first,
+in 90 degree turns:
+
+  - candidate positions are the sheet corner and the right / top edges of
+    the parts already on the sheet, tried lowest first
+  - a uniform grid index over the placed parts limits each overlap test
+    to the parts nearby, and the test itself is a separating-axis check
+    of the two hulls against the gap
+  - a placed part then slides down and left as far as its hull allows
+
+Every sheet is written as an R12 DXF in gerty_lasercut's cutting order
+(holes before the outlines around them, nearest path next). The report
+gives the material used per sheet, the sheets the same parts need when
+each file is nested on its own, and how long each stage took.
+
+    python gerty_nest.py design/Techsoft/*.dxf                    # wood sheets, writes nested/sheet-NN.dxf
+    python gerty_nest.py design/Techsoft/*.dxf --material cardboard --copies 2
+    python gerty_nest.py design/Techsoft/*.dxf --sheet 800x500 --gap 2
+    python gerty_nest.py design/Techsoft/*.dxf --measure          # sheets and runtime for 1-16 sets
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from gerty_lasercut import (Drawing, Toolpath, _arc_points, _minutes, _number, estimate, containers, join_paths,
+                            order_paths, read_dxf, write_dxf)
+
+# Stock sheets: width, height (mm) and the default gap between parts
+MATERIALS = {
+    "wood": (600.0, 400.0, 3.0),       # 3 mm ply / MDF cut to the laser bed
+    "cardboard": (594.0, 420.0, 4.0),  # A2 board, chars further from the cut
+}
+HULL_TOLERANCE = 0.5   # mm, arcs flattened for the hulls (allowed for in the gap)
+FRAGMENT = 10.0        # mm, smaller clusters are joint fragments rather than parts
+FRAGMENT_REACH = 3.0   # mm, how far from a part a fragment may lie and still belong to it
+
+
+class GridIndex:
+    """Uniform grid of bounding boxes: which items may lie within reach of a box"""
+
+    def __init__(self, cell=50.0):
+        self.cell = cell
+        self.cells = defaultdict(list)
+        self.boxes = {}
+
+    def _cells(self, box):
+        c = self.cell
+        for i in range(math.floor(box[0] / c), math.floor(box[2] / c) + 1):
+            for j in range(math.floor(box[1] / c), math.floor(box[3] / c) + 1):
+                yield i, j
+
+    def insert(self, key, box):
+        self.boxes[key] = box
+        for cell in self._cells(box):
+            self.cells[cell].append(key)
+
+    def query(self, box, reach=0.0):
+        """Keys whose boxes come within reach of box (on both axes)"""
+        x0, y0, x1, y1 = box[0] - reach, box[1] - reach, box[2] + reach, box[3] + reach
+        found = set()
+        for cell in self._cells((x0, y0, x1, y1)):
+            for key in self.cells.get(cell, ()):
+                if key not in found:
+                    b = self.boxes[key]
+                    if b[0] <= x1 and x0 <= b[2] and b[1] <= y1 and y0 <= b[3]:
+                        found.add(key)
+        return found
+
+
+# Geometry --------------------------------------------------------------------
+
+def _flatten(path, tolerance=HULL_TOLERANCE):
+    points = [path.points[0]]
+    for a, b, bulge in zip(path.points, path.points[1:], path.bulges):
+        points.extend(_arc_points(a, b, bulge, tolerance))
+    return points
+
+
+def _cross(o, a, b):
+    return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+
+def convex_hull(points):
+    """Counter-clockwise convex hull (monotone chain)"""
+    points = sorted(set(points))
+    if len(points) < 3:
+        return points
+
+    def half(chain_points):
+        chain = []
+        for p in chain_points:
+            while len(chain) >= 2 and _cross(chain[-2], chain[-1], p) <= 0:
+                chain.pop()
+            chain.append(p)
+        return chain[:-1]
+
+    return half(points) + half(points[::-1])
+
+
+def enclose(hull, directions=16, edge=5.0):
+    """
+    Convex polygon around hull with at most directions + (edges longer than
+    edge) sides: its supporting lines at even angles and along its long edges.
+    Boxes come back unchanged and round parts grow by under 2%, while the
+    overlap test gets far fewer axes to check.
+    """
+    if len(hull) < 3:
+        return hull
+    angles = {round(2 * math.pi * k / directions, 9) for k in range(directions)}
+    for (x0, y0), (x1, y1) in zip(hull, hull[1:] + hull[:1]):
+        if math.hypot(x1 - x0, y1 - y0) >= edge:
+            angles.add(round(math.atan2(x0 - x1, y1 - y0) % (2 * math.pi), 9))
+    lines = []
+    for angle in sorted(angles):
+        nx, ny = math.cos(angle), math.sin(angle)
+        lines.append((nx, ny, max(nx * x + ny * y for x, y in hull)))
+    polygon = []
+    for (ax, ay, ah), (bx, by, bh) in zip(lines, lines[1:] + lines[:1]):
+        det = ax * by - ay * bx
+        if abs(det) > 1e-12:
+            polygon.append(((ah * by - bh * ay) / det, (ax * bh - bx * ah) / det))
+    return convex_hull(polygon)
+
+
+def polygon_area(points):
+    return abs(sum(x0 * y1 - x1 * y0 for (x0, y0), (x1, y1) in zip(points, points[1:] + points[:1]))) / 2
+
+
+def _bounds(points):
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _axes(hull):
+    """x, y and the unit edge normals of a convex polygon, one per direction"""
+    axes = {}
+    for (x0, y0), (x1, y1) in zip(hull, hull[1:] + hull[:1]):
+        length = math.hypot(x1 - x0, y1 - y0)
+        if length > 1e-9:
+            nx, ny = (y1 - y0) / length, (x0 - x1) / length
+            if nx < 0 or (nx == 0 and ny < 0):
+                nx, ny = -nx, -ny
+            axes[round(nx, 9), round(ny, 9)] = None
+    axes.pop((1.0, 0.0), None)
+    axes.pop((0.0, 1.0), None)
+    return [(1.0, 0.0), (0.0, 1.0)] + list(axes)  # x and y first: they part most neighbours
+
+
+def _core(hull):
+    """A box inside a convex polygon: its bounding box shrunk about the centre until it fits"""
+    if len(hull) < 3:
+        return None
+    cx = sum(x for x, _ in hull) / len(hull)
+    cy = sum(y for _, y in hull) / len(hull)
+    x0, y0, x1, y1 = _bounds(hull)
+
+    def inside(t):
+        corners = ((cx + t * (x0 - cx), cy + t * (y0 - cy)), (cx + t * (x1 - cx), cy + t * (y1 - cy)))
+        return all(_cross(a, b, (px, py)) >= 0 for a, b in zip(hull, hull[1:] + hull[:1])
+                   for px in (corners[0][0], corners[1][0]) for py in (corners[0][1], corners[1][1]))
+
+    low, high = 0.0, 1.0
+    for _ in range(16):
+        middle = (low + high) / 2
+        low, high = (middle, high) if inside(middle) else (low, middle)
+    if low == 0.0:
+        return None
+    return cx + low * (x0 - cx), cy + low * (y0 - cy), cx + low * (x1 - cx), cy + low * (y1 - cy)
+
+
+def _project(item, axis):
+    """(min, max) of item.hull projected on axis, cached in item.spans"""
+    nx, ny = axis
+    values = [nx * x + ny * y for x, y in item.hull]
+    span = item.spans[axis] = (min(values), max(values))
+    return span
+
+
+def _apart(a, offset, b, gap):
+    """Shape a moved by offset is at least gap from placement b along some separating axis"""
+    dx, dy = offset
+    a_spans, b_spans = a.spans, b.spans
+    for axes in (a.axes, b.axes):
+        for axis in axes:
+            a_lo, a_hi = a_spans.get(axis) or _project(a, axis)
+            b_lo, b_hi = b_spans.get(axis) or _project(b, axis)
+            shift = axis[0] * dx + axis[1] * dy
+            if b_lo - a_hi - shift >= gap or a_lo + shift - b_hi >= gap:
+                return True
+    return False
+
+
+def _segment_gap(p, q, a, b):
+    """Distance between segments pq and ab"""
+    d1, d2 = _cross(a, b, p), _cross(a, b, q)
+    d3, d4 = _cross(p, q, a), _cross(p, q, b)
+    if ((d1 > 0) != (d2 > 0)) and ((d3 > 0) != (d4 > 0)) and d1 and d2 and d3 and d4:
+        return 0.0
+    return min(_point_gap(p, a, b), _point_gap(q, a, b), _point_gap(a, p, q), _point_gap(b, p, q))
+
+
+def _point_gap(p, a, b):
+    dx, dy = b[0] - a[0], b[1] - a[1]
+    length = dx * dx + dy * dy
+    t = 0.0 if length == 0 else max(0.0, min(1.0, ((p[0] - a[0]) * dx + (p[1] - a[1]) * dy) / length))
+    return math.hypot(p[0] - a[0] - t * dx, p[1] - a[1] - t * dy)
+
+
+def _near(a, b, reach):
+    """Polylines a and b come within reach of each other"""
+    if len(a) == 1 or len(b) == 1:
+        a, b = (a * 2 if len(a) == 1 else a), (b * 2 if len(b) == 1 else b)
+    for p, q in zip(a, a[1:]):
+        px0, px1 = min(p[0], q[0]) - reach, max(p[0], q[0]) + reach
+        py0, py1 = min(p[1], q[1]) - reach, max(p[1], q[1]) + reach
+        for s, t in zip(b, b[1:]):
+            if (max(s[0], t[0]) >= px0 and min(s[0], t[0]) <= px1 and max(s[1], t[1]) >= py0
+                    and min(s[1], t[1]) <= py1 and _segment_gap(p, q, s, t) <= reach):
+                return True
+    return False
+
+
+def _box_gap(a, b):
+    return math.hypot(max(a[0] - b[2], 0.0, b[0] - a[2]), max(a[1] - b[3], 0.0, b[1] - a[3]))
+
+
+# Parts -----------------------------------------------------------------------
+
+class Shape:
+    """A part turned by angle degrees, its hull moved so the bounding box starts at (0, 0)"""
+
+    __slots__ = ("angle", "width", "height", "hull", "axes", "origin", "spans", "core")
+
+    def __init__(self, angle, hull):
+        x0, y0, x1, y1 = _bounds(hull)
+        self.angle = angle
+        self.width = x1 - x0
+        self.height = y1 - y0
+        self.hull = [(x - x0, y - y0) for x, y in hull]
+        self.axes = _axes(self.hull)
+        self.origin = (x0, y0)  # where the turned part's box corner was
+        self.spans = {}
+        self.core = _core(self.hull)
+
+
+def _turn(angle):
+    return {0: (1.0, 0.0), 90: (0.0, 1.0), 180: (-1.0, 0.0), 270: (0.0, -1.0)}[angle % 360]
+
+
+class Part:
+    """Paths cut out as one piece, in the coordinates of the drawing they came from"""
+
+    def __init__(self, name, paths):
+        self.name = name
+        self.paths = paths
+        points = [p for path in paths for p in _flatten(path)]
+        self.box = _bounds(points)
+        self.hull = enclose(convex_hull(points))
+        self.hull_area = polygon_area(self.hull)
+        # Material: the outline's area where it is one closed contour, else the hull's
+        outline = max((polygon_area(path.polygon()) for path in paths if path.closed), default=0.0)
+        self.area = outline if outline >= 0.5 * self.hull_area else self.hull_area
+
+    def shapes(self, angles):
+        """One Shape per distinct orientation"""
+        shapes, seen = [], set()
+        for angle in angles:
+            c, s = _turn(angle)
+            shape = Shape(angle, [(c * x - s * y, s * x + c * y) for x, y in self.hull])
+            key = tuple((round(x, 3), round(y, 3)) for x, y in sorted(shape.hull))
+            if key not in seen:
+                seen.add(key)
+                shapes.append(shape)
+        return shapes
+
+
+def find_parts(drawing, name, join=0.5, tolerance=0.01):
+    """Split a drawing into Parts: touching or nested paths, with joint fragments folded in"""
+    paths, _ = join_paths(drawing.entities, tolerance)
+    parent = list(range(len(paths)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, outers in enumerate(containers(paths)):
+        for j in outers:
+            parent[find(i)] = find(j)
+    polygons = [path.polygon() for path in paths]
+    index = GridIndex(25.0)
+    for i, path in enumerate(paths):
+        for j in index.query(path.bbox(), join):
+            if find(i) != find(j) and _near(polygons[i], polygons[j], join):
+                parent[find(i)] = find(j)
+        index.insert(i, path.bbox())
+
+    clusters = defaultdict(list)
+    for i in range(len(paths)):
+        clusters[find(i)].append(i)
+    clusters = list(clusters.values())
+    boxes = [_bounds([corner for i in members for corner in (paths[i].bbox()[:2], paths[i].bbox()[2:])])
+             for members in clusters]
+    large = GridIndex(50.0)
+    for k, (x0, y0, x1, y1) in enumerate(boxes):
+        if max(x1 - x0, y1 - y0) >= FRAGMENT:
+            large.insert(k, boxes[k])
+    owner = {}
+    for k, members in enumerate(clusters):
+        if k in large.boxes:
+            continue
+        for j in sorted(large.query(boxes[k], FRAGMENT_REACH), key=lambda j: _box_gap(boxes[k], boxes[j])):
+            if any(_near(polygons[i], polygons[m], FRAGMENT_REACH) for i in members for m in clusters[j]):
+                owner[k] = j
+                break
+    for k, j in owner.items():
+        clusters[j].extend(clusters[k])
+    return [Part(f"{name}#{n + 1}", [paths[i] for i in sorted(members)])
+            for n, members in enumerate(m for k, m in enumerate(clusters) if k not in owner)]
+
+
+# Nesting ---------------------------------------------------------------------
+
+class Placement:
+    """A part on a sheet: turned by shape.angle, bounding box corner at (x, y)"""
+
+    __slots__ = ("part", "shape", "x", "y", "hull", "axes", "box", "spans", "core")
+
+    def __init__(self, part, shape, x, y):
+        self.part = part
+        self.shape = shape
+        self.x = x
+        self.y = y
+        self.hull = [(px + x, py + y) for px, py in shape.hull]
+        self.axes = shape.axes
+        self.box = (x, y, x + shape.width, y + shape.height)
+        self.spans = {}
+        core = shape.core
+        self.core = (core[0] + x, core[1] + y, core[2] + x, core[3] + y) if core else None
+
+    def paths(self):
+        """The part's paths moved onto the sheet"""
+        c, s = _turn(self.shape.angle)
+        dx, dy = self.x - self.shape.origin[0], self.y - self.shape.origin[1]
+
+        def move(p):
+            return c * p[0] - s * p[1] + dx, s * p[0] + c * p[1] + dy
+
+        return [Toolpath([move(p) for p in path.points], list(path.bulges), path.style,
+                         (move(path.circle[0]), path.circle[1]) if path.circle else None)
+                for path in self.part.paths]
+
+
+class Sheet:
+    """One stock sheet and the parts placed on it so far"""
+
+    def __init__(self, width, height, gap=3.0, margin=5.0):
+        self.width = width
+        self.height = height
+        # Hull chords cut inside arcs by up to HULL_TOLERANCE on either part
+        self.gap = gap + 2 * HULL_TOLERANCE
+        self.margin = margin + HULL_TOLERANCE
+        self.placements = []
+        self.index = GridIndex(50.0)
+        self.xs = {self.margin}
+        self.ys = {self.margin}
+        self.hull_area = 0.0
+        self.rejected = []  # (width, height) of shapes that found no room
+        self._blocker = None
+        self._candidates = None
+
+    @property
+    def usable_area(self):
+        return (self.width - 2 * self.margin) * (self.height - 2 * self.margin)
+
+    def fits(self, shape, x, y):
+        m = self.margin
+        if x < m or y < m or x + shape.width > self.width - m or y + shape.height > self.height - m:
+            return False
+        # Neighbouring candidates mostly clash with the same part: try that one before the index
+        if self._blocker is not None and self._clash(shape, x, y, self.placements[self._blocker]):
+            return False
+        for k in self.index.query((x, y, x + shape.width, y + shape.height), self.gap):
+            if k != self._blocker and self._clash(shape, x, y, self.placements[k]):
+                self._blocker = k
+                return False
+        return True
+
+    def _clash(self, shape, x, y, other):
+        gap = self.gap
+        core, other_core = shape.core, other.core
+        box = other.box
+        if x + shape.width <= box[0] - gap or box[2] + gap <= x or \
+                y + shape.height <= box[1] - gap or box[3] + gap <= y:
+            return False
+        # Boxes inside both hulls closer than the gap: a clash without the full test
+        if core and other_core and (x + core[0] - gap < other_core[2] and other_core[0] < x + core[2] + gap and
+                                    y + core[1] - gap < other_core[3] and other_core[1] < y + core[3] + gap):
+            return True
+        return not _apart(shape, (x, y), other, gap)
+
+    def _settle(self, shape, x, y):
+        """Slide a fitting shape down, then left, as far as it still fits"""
+        for _ in range(3):
+            moved = False
+            for axis in (1, 0):
+                here = (x, y)[axis]
+                spot = (lambda v: (x, v)) if axis else (lambda v: (v, y))
+                low, high = self.margin, here
+                if high - low < 0.25:
+                    continue
+                if self.fits(shape, *spot(low)):
+                    high = low
+                else:
+                    for _ in range(10):
+                        middle = (low + high) / 2
+                        if self.fits(shape, *spot(middle)):
+                            high = middle
+                        else:
+                            low = middle
+                if here - high >= 0.25:
+                    x, y = spot(high)
+                    moved = True
+            if not moved:
+                break
+        return x, y
+
+    def place(self, part, shapes):
+        """Put part at its lowest, then leftmost, position; False if it does not fit"""
+        if self.hull_area + part.hull_area > self.usable_area:
+            return False
+        # The sheet only fills up: anything at least as large as a shape it turned away is skipped
+        shapes = [s for s in shapes if not any(s.width >= w and s.height >= h for w, h in self.rejected)]
+        if self._candidates is None:
+            self._candidates = sorted((y, x) for y in self.ys for x in self.xs)
+        best = None
+        for shape in shapes:
+            for y, x in self._candidates:
+                if best is not None and y + shape.height > best[0]:
+                    break
+                if self.fits(shape, x, y):
+                    x, y = self._settle(shape, x, y)
+                    if best is None or (y + shape.height, x) < best[:2]:
+                        best = (y + shape.height, x, shape, y)
+                    break
+            else:
+                if best is None:
+                    self.rejected.append((shape.width, shape.height))
+        if best is None:
+            return False
+        _, x, shape, y = best
+        placement = Placement(part, shape, x, y)
+        self.index.insert(len(self.placements), placement.box)
+        self.placements.append(placement)
+        self.xs.add(placement.box[2] + self.gap)
+        self.ys.add(placement.box[3] + self.gap)
+        self._candidates = None
+        self.hull_area += part.hull_area
+        return True
+
+    def utilisation(self):
+        return sum(p.part.area for p in self.placements) / (self.width * self.height)
+
+
+def nest(parts, width, height, gap=3.0, margin=5.0, rotations=4):
+    """Parts onto as few width x height sheets as first fit finds. Returns (sheets, parts that fit none)"""
+    angles = (0, 90, 180, 270)[:rotations]
+    sheets, unplaced = [], []
+    for part in sorted(parts, key=lambda p: p.hull_area, reverse=True):
+        shapes = part.shapes(angles)
+        if not any(sheet.place(part, shapes) for sheet in sheets):
+            sheet = Sheet(width, height, gap, margin)
+            if sheet.place(part, shapes):
+                sheets.append(sheet)
+            else:
+                unplaced.append(part)
+    return sheets, unplaced
+
+
+# Output ----------------------------------------------------------------------
+
+def _sheet_preamble(preamble, width, height):
+    """Header and tables of a source drawing, with extents and limits set to the sheet"""
+    corners = {"$EXTMIN": (0, 0), "$LIMMIN": (0, 0), "$EXTMAX": (width, height), "$LIMMAX": (width, height)}
+    out, corner = [], None
+    for code, value in preamble:
+        if code == 9:
+            corner = corners.get(value)
+        elif corner is not None and code in (10, 20):
+            value = _number(corner[code == 20])
+        out.append((code, value))
+    return out
+
+
+def load_parts(files, join=0.5):
+    """(parts per file, first drawing) from DXF files"""
+    groups, template = [], None
+    for source in files:
+        drawing = read_dxf(source)
+        template = template or drawing
+        groups.append(find_parts(drawing, Path(source).stem, join))
+    return groups, template
+
+
+def separately(groups, width, height, gap, margin=5.0, rotations=4, copies=1):
+    """Sheets used when each file is nested on its own, as when the drawings are cut one at a time"""
+    return sum(len(nest(parts * copies, width, height, gap, margin, rotations)[0]) for parts in groups)
+
+
+def _used(sheets):
+    return sum(p.part.area for sheet in sheets for p in sheet.placements)
+
+
+def run(files, width, height, gap, margin=5.0, rotations=4, copies=1, join=0.5, out_dir=None,
+        cut_speed=15.0, travel_speed=150.0, pierce=0.3):
+    """Nest files onto sheets (written to out_dir unless None); returns the report"""
+    timings = {}
+    start = time.perf_counter()
+    groups, template = load_parts(files, join)
+    parts = [part for group in groups for part in group]
+    timings["parts"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sheets, unplaced = nest(parts * copies, width, height, gap, margin, rotations)
+    timings["nest"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    reports = []
+    for n, sheet in enumerate(sheets, 1):
+        paths = [path for placement in sheet.placements for path in placement.paths()]
+        ordered = order_paths(paths)[1]
+        output = None
+        if out_dir is not None:
+            output = Path(out_dir) / f"sheet-{n:02d}.dxf"
+            write_dxf(output, Drawing(_sheet_preamble(template.preamble, width, height), [], [],
+                                      template.postamble), ordered)
+        reports.append({
+            "sheet": n,
+            "output": str(output) if output else None,
+            "parts": len(sheet.placements),
+            "utilisation": round(sheet.utilisation(), 3),
+            "hull_utilisation": round(sheet.hull_area / (width * height), 3),
+            "cut": estimate(ordered, cut_speed, travel_speed, pierce),
+        })
+    timings["write" if out_dir is not None else "order"] = time.perf_counter() - start
+
+    material = _used(sheets)
+    alone = separately(groups, width, height, gap, margin, rotations, copies)
+    return {
+        "files": [str(f) for f in files],
+        "sheet_mm": [width, height],
+        "gap_mm": gap,
+        "parts": len(parts) * copies,
+        "sheets": reports,
+        "unplaced": [{"part": p.name, "size_mm": [round(p.box[2] - p.box[0], 1), round(p.box[3] - p.box[1], 1)]}
+                     for p in unplaced],
+        "material_m2": round(material / 1e6, 4),
+        "utilisation": round(material / (len(sheets) * width * height), 3) if sheets else 0.0,
+        "sheets_file_by_file": alone,
+        "timings_ms": {k: round(v * 1000, 1) for k, v in timings.items()},
+    }
+
+
+def measure(files, width, height, gap, margin=5.0, rotations=4, copies=(1, 2, 4, 8, 16)):
+    """Sheets, utilisation and nesting time as the part count grows, against nesting file by file"""
+    groups, _ = load_parts(files)
+    parts = [part for group in groups for part in group]
+    usable = (width - 2 * margin) * (height - 2 * margin)
+    results = []
+    for n in copies:
+        alone = separately(groups, width, height, gap, margin, rotations, n)
+        start = time.perf_counter()
+        sheets, unplaced = nest(parts * n, width, height, gap, margin, rotations)
+        seconds = time.perf_counter() - start
+        material = _used(sheets)
+        results.append({
+            "copies": n,
+            "parts": len(parts) * n,
+            "sheets_file_by_file": alone,
+            "utilisation_file_by_file": round(material / (alone * width * height), 3) if alone else 0.0,
+            "sheets": len(sheets),
+            "utilisation": round(material / (len(sheets) * width * height), 3) if sheets else 0.0,
+            "unplaced": len(unplaced),
+            # Hull area over usable sheet area: no layout can use fewer sheets
+            "sheets_lower_bound": math.ceil(sum(p.hull_area for p in parts) * n / usable),
+            "nest_seconds": round(seconds, 3),
+            "ms_per_part": round(seconds * 1000 / (len(parts) * n), 2),
+        })
+    return results
+
+
+def _sheet_size(text):
+    try:
+        width, height = (float(v) for v in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT in mm, got {text!r}")
+    return width, height
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="GERTY sheet nesting")
+    parser.add_argument("files", nargs="+", help="DXF files (e.g. design/Techsoft/*.dxf)")
+    parser.add_argument("--material", choices=sorted(MATERIALS), default="wood", help="Stock sheet preset")
+    parser.add_argument("--sheet", type=_sheet_size, help="Sheet size in mm, e.g. 600x400 (overrides the preset)")
+    parser.add_argument("--gap", type=float, help="Space between parts in mm (default from the preset)")
+    parser.add_argument("--margin", type=float, default=5.0, help="Space left at the sheet edges in mm")
+    parser.add_argument("--rotations", type=int, choices=(1, 2, 4), default=4, help="Orientations tried per part")
+    parser.add_argument("--copies", type=int, default=1, help="Sets of parts to cut")
+    parser.add_argument("--join", type=float, default=0.5, help="Paths this close (mm) belong to one part")
+    parser.add_argument("--output-dir", default="nested", help="Where the sheet DXFs are written")
+    parser.add_argument("--cut-speed", type=float, default=15.0, help="Cutting speed in mm/s")
+    parser.add_argument("--travel-speed", type=float, default=150.0, help="Rapid (laser off) speed in mm/s")
+    parser.add_argument("--pierce", type=float, default=0.3, help="Seconds per laser start")
+    parser.add_argument("--measure", action="store_true", help="Utilisation and runtime for 1-16 sets, no output")
+    parser.add_argument("--json", help="Write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    width, height, gap = MATERIALS[args.material]
+    if args.sheet:
+        width, height = args.sheet
+    if args.gap is not None:
+        gap = args.gap
+
+    try:
+        if args.measure:
+            print(f"<NEST> {len(args.files)} files on {width:g}x{height:g} mm sheets, {gap:g} mm gap")
+            report = measure(args.files, width, height, gap, args.margin, args.rotations)
+            print(f"   {'sets':>4} {'parts':>6} {'file by file':>15} {'together':>15} {'bound':>6} "
+                  f"{'nest s':>7} {'ms/part':>8}")
+            for r in report:
+                print(f"   {r['copies']:>4} {r['parts']:>6} {r['sheets_file_by_file']:>6} "
+                      f"({r['utilisation_file_by_file']:>6.1%}) {r['sheets']:>6} ({r['utilisation']:>6.1%}) "
+                      f"{r['sheets_lower_bound']:>6} {r['nest_seconds']:>7.2f} {r['ms_per_part']:>8.2f}")
+        else:
+            out_dir = Path(args.output_dir)
+            out_dir.mkdir(parents=True, exist_ok=True)
+            report = run(args.files, width, height, gap, args.margin, args.rotations, args.copies, args.join,
+                         out_dir, args.cut_speed, args.travel_speed, args.pierce)
+            stock = "custom" if args.sheet else args.material
+            print(f"<NEST> {report['parts']} parts from {len(args.files)} files on {stock} {width:g}x{height:g} mm "
+                  f"sheets, {gap:g} mm gap")
+            print(f"   {'sheet':<14} {'parts':>6} {'used':>6} {'hulls':>6} {'est. time':>10}")
+            for s in report["sheets"]:
+                print(f"   {Path(s['output']).name:<14} {s['parts']:>6} {s['utilisation']:>6.1%} "
+                      f"{s['hull_utilisation']:>6.1%} {_minutes(s['cut']['seconds']):>10}")
+            for p in report["unplaced"]:
+                print(f"<NEST> {p['part']} ({p['size_mm'][0]:g}x{p['size_mm'][1]:g} mm) does not fit a sheet")
+            t = report["timings_ms"]
+            print(f"   {len(report['sheets'])} sheets ({report['sheets_file_by_file']} nesting file by file), "
+                  f"{report['material_m2']} m2 of parts, {report['utilisation']:.1%} of the material used")
+            print(f"   parts {t['parts']:.0f} ms, nest {t['nest']:.0f} ms, write {t['write']:.0f} ms, "
+                  f"written to {out_dir}/")
+    except (OSError, ValueError) as e:
+        print(f"<NEST> {e}")
+        return 1
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
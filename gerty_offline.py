@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+GERTY offline fallback
+A background connectivity monitor plus the local-only answer paths used
+while the network is down: a cache of previous AI answers and a fixed
+apology (local intents in gerty_intents run before either, online or not). The pipeline checks
+ConnectivityMonitor.online before every network call, so an outage costs
+nothing beyond the first failed request.
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+from gerty_intents import normalize_question
+
+OFFLINE_APOLOGY = "I can't reach the network right now, Sam. I'll be back to full strength once it returns."
+
+
+class ConnectivityMonitor:
+    """
+    Probes the AI host with a TCP connect in the background. Request failures
+    reported by the pipeline flip the state to offline straight away and
+    trigger an early probe; a successful probe or request flips it back.
+    """
+
+    def __init__(self, url, interval=10.0, offline_interval=3.0, timeout=2.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname
+        self.port = parsed.port or (443 if parsed.scheme == "https" else 80)
+        self.interval = interval
+        self.offline_interval = offline_interval
+        self.timeout = timeout
+        self.online = True
+        self.changed_at = time.monotonic()
+        self.outages = 0
+        self._listeners = []
+        self._wake = threading.Event()
+        self._running = threading.Event()
+        self._thread = None
+
+    def add_listener(self, callback):
+        """callback(online) on every state change"""
+        self._listeners.append(callback)
+
+    def probe(self):
+        """One connect attempt to the AI host; returns True if it answered"""
+        try:
+            socket.create_connection((self.host, self.port), timeout=self.timeout).close()
+            return True
+        except OSError:
+            return False
+
+    def check(self):
+        """Probe now and update the state"""
+        self._set(self.probe())
+        return self.online
+
+    def report_success(self):
+        self._set(True)
+
+    def report_failure(self):
+        """A network request failed: treat as offline until the next good probe"""
+        self._set(False)
+        self._wake.set()
+
+    def _set(self, online):
+        if online == self.online:
+            return
+        self.online = online
+        self.changed_at = time.monotonic()
+        if not online:
+            self.outages += 1
+        print(f"<NET> {'Back online' if online else 'Network unreachable, using offline answers'}")
+        for callback in list(self._listeners):
+            callback(online)
+
+    def start(self):
+        if self._running.is_set():
+            return
+        self._running.set()
+        self._thread = threading.Thread(target=self._run, name="connectivity", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running.clear()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=self.timeout + 1)
+            self._thread = None
+
+    def _run(self):
+        while self._running.is_set():
+            self.check()
+            self._wake.wait(self.interval if self.online else self.offline_interval)
+            self._wake.clear()
+
+
+class AnswerCache:
+    """Most recent AI answers by normalized question, persisted as JSON"""
+
+    def __init__(self, path="answer_cache.json", max_entries=200):
+        self.path = path
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                self.entries.update(json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"<WARNING> Could not read answer cache {self.path}: {e}")
+
+    def get(self, question):
+        with self._lock:
+            return self.entries.get(normalize_question(question))
+
+    def put(self, question, answer):
+        if not question or not answer:
+            return
+        with self._lock:
+            key = normalize_question(question)
+            self.entries.pop(key, None)
+            self.entries[key] = answer
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            snapshot = dict(self.entries)
+        if self.path:
+            try:
+                with open(self.path, "w") as f:
+                    json.dump(snapshot, f, indent=1)
+            except OSError as e:
+                print(f"<WARNING> Could not save answer cache: {e}")
+
+
+class OfflineResponder:
+    """Answers a question without the network: the answer cache, then an apology"""
+
+    def __init__(self, cache=None):
+        self.cache = cache
+
+    def answer(self, question):
+        """Returns (answer, source) where source is "cache" or "apology" """
+        cached = self.cache.get(question) if self.cache else None
+        if cached:
+            return cached, "cache"
+        return OFFLINE_APOLOGY, "apology"
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+GERTY session recorder and replay
+Opt-in field recorder: keeps a short pre-roll of microphone frames and, for
+each interaction, archives the audio around the wake word, the captured
+question audio, the transcript, the AI exchange and every pipeline timestamp
+into one compact zip per session (oldest sessions are rotated out).
+
+Replay pushes a recorded session back through the full pipeline on the
+simulation clock, with AI responses served from the recording:
+    python gerty_recorder.py list [--dir recordings]
+    python gerty_recorder.py replay recordings/session-....zip [--profile out.prof]
+"""
+
+import argparse
+import glob
+import io
+import json
+import os
+import sys
+import threading
+import time
+import wave
+import zipfile
+from collections import deque
+
+FORMAT_VERSION = 1
+
+
+def _wav_bytes(pcm, sample_rate):
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+
+def _read_wav(data):
+    with wave.open(io.BytesIO(data), "rb") as wav:
+        return wav.readframes(wav.getnframes())
+
+
+class SessionRecorder:
+    """
+    Collects one interaction at a time from the assistant's frame path and
+    timeline marks. add_frame() is called for every captured frame, event()
+    for every timeline mark; a session opens on "wake" and is written out on
+    "idle" by a background thread.
+    """
+
+    def __init__(self, directory="recordings", sample_rate=16000, frame_length=512,
+                 pre_roll=2.0, post_roll=1.5, max_sessions=50, max_megabytes=50.0):
+        self.directory = str(directory)
+        self.sample_rate = sample_rate
+        self.frame_length = frame_length
+        self.frame_seconds = frame_length / sample_rate
+        self.post_roll_frames = int(post_roll / self.frame_seconds)
+        self.max_sessions = max_sessions
+        self.max_bytes = int(max_megabytes * 1024 * 1024)
+        self._pre_roll = deque(maxlen=max(1, int(pre_roll / self.frame_seconds)))
+        self._session = None
+        self._post_frames_left = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def add_frame(self, frame):
+        """Raw PCM frame from the capture path"""
+        with self._lock:
+            if self._session is not None and self._post_frames_left > 0:
+                self._session["audio"].append(frame)
+                self._post_frames_left -= 1
+            else:
+                self._pre_roll.append(frame)
+
+    def add_speech(self, pcm):
+        """16 kHz 16-bit audio captured for speech recognition"""
+        with self._lock:
+            if self._session is not None:
+                self._session["speech"].append(pcm)
+
+    def event(self, name, t, data=None):
+        """Timeline mark from the assistant"""
+        data = data or {}
+        with self._lock:
+            if name == "wake" and self._session is None:
+                self._begin(t, data)
+            session = self._session
+            if session is None:
+                return
+            session["events"].append({"event": name, "t": round(t - session["wake_t"], 4), "data": data})
+            if name == "question":
+                session["transcript"] = data.get("text")
+            elif name == "ai_request":
+                session["ai"].append({"question": data.get("text"), "sent_t": t})
+            elif name == "answer" and session["ai"]:
+                exchange = session["ai"][-1]
+                exchange["answer"] = data.get("text")
+                exchange["latency"] = round(t - exchange.pop("sent_t"), 4)
+            elif name == "idle":
+                self._session = None
+                threading.Thread(target=self._write, args=(session,), daemon=True).start()
+
+    def _begin(self, t, data):
+        self._session = {
+            "wake_t": t,
+            "keyword": data.get("keyword"),
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "audio": list(self._pre_roll),
+            "wake_offset": len(self._pre_roll) * self.frame_seconds,
+            "speech": [],
+            "events": [],
+            "transcript": None,
+            "ai": [],
+        }
+        self._pre_roll.clear()
+        self._post_frames_left = self.post_roll_frames
+
+    def _write(self, session):
+        meta = {
+            "version": FORMAT_VERSION,
+            "started_at": session["started_at"],
+            "keyword": session["keyword"],
+            "sample_rate": self.sample_rate,
+            "frame_length": self.frame_length,
+            "wake_offset": session["wake_offset"],
+            "transcript": session["transcript"],
+            "ai": [exchange for exchange in session["ai"] if "answer" in exchange],
+            "events": session["events"],
+        }
+        name = f"session-{time.strftime('%Y%m%d-%H%M%S')}-{int(time.time() * 1000) % 1000:03d}.zip"
+        path = os.path.join(self.directory, name)
+        try:
+            with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+                archive.writestr("session.json", json.dumps(meta, indent=1))
+                archive.writestr("wake.wav", _wav_bytes(b"".join(session["audio"]), self.sample_rate))
+                if session["speech"]:
+                    archive.writestr("speech.wav", _wav_bytes(b"".join(session["speech"]), self.sample_rate))
+            print(f"<REC> Session saved: {path}")
+            self._rotate()
+        except OSError as e:
+            print(f"<WARNING> Could not save session recording: {e}")
+
+    def _rotate(self):
+        """Delete the oldest sessions beyond the count/size limits"""
+        sessions = sorted(glob.glob(os.path.join(self.directory, "session-*.zip")))
+        sizes = {path: os.path.getsize(path) for path in sessions}
+        total = sum(sizes.values())
+        while sessions and (len(sessions) > self.max_sessions or total > self.max_bytes):
+            oldest = sessions.pop(0)
+            total -= sizes[oldest]
+            try:
+                os.remove(oldest)
+            except OSError:
+                pass
+
+
+def load_session(path):
+    """Read a recorded session: returns (meta dict, wake pcm bytes, speech pcm bytes or None)"""
+    with zipfile.ZipFile(path) as archive:
+        meta = json.loads(archive.read("session.json"))
+        wake_pcm = _read_wav(archive.read("wake.wav"))
+        speech_pcm = _read_wav(archive.read("speech.wav")) if "speech.wav" in archive.namelist() else None
+    return meta, wake_pcm, speech_pcm
+
+
+def stage_latencies(events):
+    """Seconds from the wake word to each stage in an event list [(name, t)]"""
+    latencies = {}
+    for name, t in events:
+        latencies.setdefault(name, t)
+    return latencies
+
+
+def replay(path, profile=None, detector=None):
+    """Replay a recorded session on the simulation clock and compare stage timings"""
+    from gerty_sim import Simulation
+
+    meta, wake_pcm, speech_pcm = load_session(path)
+    answer = meta["ai"][-1] if meta["ai"] else {}
+    speech_seconds = len(speech_pcm) / 2 / meta["sample_rate"] if speech_pcm else None
+    recorded = stage_latencies((e["event"], e["t"]) for e in meta["events"])
+    wake_at = 10.0  # after the virtual boot sequence
+    interaction = {
+        "at": wake_at - meta["wake_offset"],
+        "wake": wake_pcm,
+        "say": meta["transcript"],
+        "ai": answer.get("answer") or "",
+        "ai_latency": answer.get("latency", 0.5),
+    }
+    if speech_seconds:
+        interaction["speech_duration"] = speech_seconds
+    simulation = Simulation({"interactions": [interaction], "end_after": 15.0}, detector=detector)
+
+    if profile:
+        import cProfile
+        import pstats
+        profiler = cProfile.Profile()
+        report = profiler.runcall(simulation.run)
+        profiler.dump_stats(profile)
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(15)
+    else:
+        report = simulation.run()
+
+    replayed = {}
+    base = None
+    for event, t, _data in simulation.gerty.timeline:
+        if base is None:
+            if event != "wake":
+                continue
+            base = t
+        replayed.setdefault(event, t - base)
+    print(f"<REPLAY> {os.path.basename(path)} (keyword={meta['keyword']}, transcript={meta['transcript']!r})")
+    print(f"   {'stage':<12} {'recorded':>10} {'replayed':>10}")
+    for stage in ("wake", "listening", "question", "ai_request", "answer", "idle"):
+        before, after = recorded.get(stage), replayed.get(stage)
+        print(f"   {stage:<12} {'-' if before is None else f'{before:.3f}s':>10} "
+              f"{'-' if after is None else f'{after:.3f}s':>10}")
+    if "wake" not in replayed:
+        print("   <WARNING> Wake word did not trigger on replay (detector differs from the recording?)")
+    return report
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="List and replay recorded GERTY sessions")
+    sub = parser.add_subparsers(dest="command", required=True)
+    list_parser = sub.add_parser("list", help="List recorded sessions")
+    list_parser.add_argument("--dir", default="recordings")
+    replay_parser = sub.add_parser("replay", help="Replay a session through the pipeline")
+    replay_parser.add_argument("session")
+    replay_parser.add_argument("--profile", help="Write cProfile stats of the replay to this file")
+    replay_parser.add_argument("--porcupine", action="store_true",
+                               help="Detect with real Porcupine (needs the access key) instead of the stub")
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        for path in sorted(glob.glob(os.path.join(args.dir, "session-*.zip"))):
+            meta, wake_pcm, _speech = load_session(path)
+            answer = meta["ai"][-1] if meta["ai"] else {}
+            print(f"{os.path.basename(path)}  {meta['started_at']}  {meta['transcript']!r}  "
+                  f"ai={answer.get('latency', '-')}s")
+        return 0
+
+    detector = None
+    if args.porcupine:
+        import pvporcupine
+        from gerty_config import load_config
+        from gerty_keywords import KeywordRegistry
+        config = load_config()
+        registry = KeywordRegistry()
+        registry.discover(config.wake.keyword_dir)
+        detector = pvporcupine.create(access_key=config.wake.access_key, keyword_paths=registry.resolve())
+    replay(args.session, profile=args.profile, detector=detector)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,489 @@
+#!/usr/bin/env python3
+"""
+GERTY deterministic simulation mode
+Runs the complete GERTYSimpleVoice.run() flow against a virtual clock,
+scripted microphone audio (WAV files or generated wake bursts), scripted
+transcripts, a local stub AI server and a headless display. A whole session
+finishes in milliseconds of wall time and produces a latency report that can
+be checked against budgets in CI.
+
+Script format (JSON):
+{
+  "interactions": [
+    {"at": 10.0, "wake": "clips/hey_gerty.wav", "say": "what is your name",
+     "ai": "I'm GERTY.", "ai_latency": 0.8, "speech_duration": 1.2}
+  ],
+  "end_after": 5.0,
+  "config": {"display": {"answer_duration": 4.0}}
+}
+"wake" may be true to use a generated tone burst instead of a WAV file
+(or raw PCM bytes when the script is built in code, e.g. by replay).
+Sessions use default settings (not gerty_config.json) plus the script's
+"config" overrides, so results don't depend on the machine they run on.
+"network": false points the assistant at a closed local port to exercise
+the offline fallback path.
+"partials": true makes the scripted recogniser stream partial transcripts,
+which exercises speculative AI requests. An interaction's own "partials"
+list replaces the word-by-word hypotheses, e.g. to script a revision, and
+"ai_failures": n makes the stub answer its first n requests with HTTP 500.
+"keywords": [{"at": 6.0, "action": "stop"}] dispatches keyword hits that
+don't come through the microphone (the energy stub only knows one keyword),
+and "api": [{"at": 2.0, "command": "emotion", "emotion": "happy"}] queues
+control API commands at those times.
+The stub advances the virtual clock by the whole AI latency when it
+answers, so an early request does not show up as overlapping the rest of
+the utterance; gerty_speculative.py --measure measures that in real time.
+"""
+
+import argparse
+import json
+import math
+import struct
+import sys
+import threading
+import time
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from gerty_clock import VirtualClock
+from gerty_config import GertyConfig, apply_dict
+from gerty_keywords import KeywordSpec
+from gerty_wakeword_bench import EnergyStubDetector
+
+SAMPLE_RATE = 16000
+FRAME_LENGTH = 512
+
+
+def tone_burst(seconds=0.6, frequency=440, amplitude=8000):
+    """Generated stand-in for a spoken wake word"""
+    samples = int(seconds * SAMPLE_RATE)
+    return struct.pack("<%dh" % samples, *(
+        int(amplitude * math.sin(2 * math.pi * frequency * i / SAMPLE_RATE)) for i in range(samples)
+    ))
+
+
+def load_wav(path):
+    """Read a 16 kHz mono 16-bit WAV as raw PCM bytes"""
+    with wave.open(str(path), "rb") as wav:
+        if wav.getnchannels() != 1 or wav.getsampwidth() != 2 or wav.getframerate() != SAMPLE_RATE:
+            raise ValueError(f"{path}: expected {SAMPLE_RATE} Hz mono 16-bit PCM")
+        return wav.readframes(wav.getnframes())
+
+
+class HeadlessDisplay:
+    """cv2-compatible window API that draws nothing and advances the virtual clock in waitKey()"""
+
+    WINDOW_NORMAL = 0
+
+    def __init__(self, clock, keys=None):
+        self.clock = clock
+        self.keys = sorted(keys or [], key=lambda k: k[0])  # [(time, keycode)]
+        self.frames_shown = 0
+        self.last_frame = None
+        self.closed = False
+        self.exit_at = None
+
+    def namedWindow(self, name, flags=0):
+        pass
+
+    def resizeWindow(self, name, width, height):
+        pass
+
+    def imshow(self, name, img):
+        self.frames_shown += 1
+        self.last_frame = img
+
+    def waitKey(self, delay=0):
+        self.clock.advance(max(delay, 1) / 1000.0)
+        now = self.clock.time()
+        if self.keys and self.keys[0][0] <= now:
+            return self.keys.pop(0)[1]
+        if self.exit_at is not None and now >= self.exit_at:
+            return 27  # ESC ends the session
+        return -1
+
+    def destroyAllWindows(self):
+        self.closed = True
+
+
+class ScriptedMicrophone:
+    """
+    Virtual-time microphone. Every clock advance pushes the frames that would
+    have been captured in that span into the assistant's detection path.
+    """
+
+    def __init__(self, clock, sink, frame_length=FRAME_LENGTH, sample_rate=SAMPLE_RATE):
+        self.sink = sink
+        self.frame_length = frame_length
+        self.frame_seconds = frame_length / sample_rate
+        self.sample_rate = sample_rate
+        self.clips = []  # (start_sample, pcm_bytes)
+        self.enabled = True
+        self._next_frame = 0
+        self._silence = b"\x00\x00" * frame_length
+        clock.add_listener(self._on_advance)
+
+    def add_clip(self, at, pcm):
+        self.clips.append((int(at * self.sample_rate), pcm))
+        self.clips.sort(key=lambda c: c[0])
+
+    def _frame_at(self, index):
+        start = index * self.frame_length
+        end = start + self.frame_length
+        frame = None
+        for clip_start, pcm in self.clips:
+            clip_end = clip_start + len(pcm) // 2
+            if clip_end <= start or clip_start >= end:
+                continue
+            frame = bytearray(frame or self._silence)
+            lo, hi = max(start, clip_start), min(end, clip_end)
+            frame[(lo - start) * 2:(hi - start) * 2] = pcm[(lo - clip_start) * 2:(hi - clip_start) * 2]
+        return bytes(frame) if frame else self._silence
+
+    def _on_advance(self, old, new):
+        last_frame = int(new / self.frame_seconds)
+        while self._next_frame < last_frame:
+            if self.enabled:
+                self.sink(self._frame_at(self._next_frame))
+            self._next_frame += 1
+
+
+class ScriptedSpeech:
+    """
+    Stands in for the microphone + speech recogniser: returns scripted transcripts in order.
+    With partials=True it also behaves like a streaming recogniser: growing hypotheses
+    (each utterance's own list, or the words of the transcript one at a time) go to
+    on_partial every interval seconds, followed by endpoint seconds of the last one.
+    """
+
+    def __init__(self, clock, utterances, partials=False, endpoint=0.7, interval=0.05):
+        self.clock = clock
+        self.utterances = [tuple(u) + (None,) * (3 - len(u)) for u in utterances]  # [(text or None, seconds, partials)]
+        self.supports_partials = partials
+        self.endpoint = endpoint
+        self.interval = interval
+
+    def listen(self, timeout=5, on_partial=None):
+        if not self.utterances:
+            self.clock.advance(timeout)
+            return None
+        text, seconds, hypotheses = self.utterances.pop(0)
+        if not text:
+            self.clock.advance(timeout)
+            return text
+        if on_partial is None:
+            self.clock.advance(seconds)
+            return text
+        words = text.split()
+        hypotheses = hypotheses or [" ".join(words[:n]) for n in range(1, len(words) + 1)]
+        endpoint = min(self.endpoint, seconds / 2)
+        word_time = (seconds - endpoint) / len(hypotheses)
+        for hypothesis, duration in [(h, word_time) for h in hypotheses] + [(hypotheses[-1], endpoint)]:
+            end = self.clock.time() + duration
+            while self.clock.time() < end:
+                on_partial(hypothesis)
+                self.clock.advance(min(self.interval, end - self.clock.time()))
+        return text
+
+
+class ScriptedEvents:
+    """
+    Virtual-time keyword hits and control API commands. Stands in for
+    ControlAPI (pending, next_command, publish, stop) and calls on_keyword
+    the way the detection path does once a keyword's time has passed.
+    """
+
+    def __init__(self, clock, keywords=(), commands=()):
+        self.clock = clock
+        self.keywords = sorted(keywords, key=lambda k: k["at"])
+        self.commands = sorted(commands, key=lambda c: c["at"])
+        self.on_keyword = None
+        clock.add_listener(self._on_advance)
+
+    def _on_advance(self, old, new):
+        while self.keywords and self.keywords[0]["at"] <= new and self.on_keyword:
+            hit = self.keywords.pop(0)
+            self.on_keyword(KeywordSpec(hit.get("name", hit["action"]), hit["action"]))
+
+    def pending(self):
+        return bool(self.commands) and self.commands[0]["at"] <= self.clock.time()
+
+    def next_command(self):
+        if not self.pending():
+            return None
+        command = dict(self.commands.pop(0))
+        del command["at"]
+        return command
+
+    def publish(self, event, t, data):
+        pass
+
+    def stop(self):
+        pass
+
+
+class StubAIServer:
+    """
+    Local OpenAI-style chat completions server with scripted answers.
+    Each request advances the virtual clock by its scripted latency (or
+    sleeps for it in real time when there is no clock).
+    Supports both plain JSON and "stream": true (server-sent events).
+    With token_latency, each generated token (~4 characters) adds that many
+    seconds, and max_tokens cuts the answer short (finish_reason "length").
+    """
+
+    def __init__(self, clock=None, answers=None, default_answer="I'm not sure, Sam.", default_latency=0.5,
+                 token_latency=0.0):
+        self.clock = clock
+        self.answers = dict(answers or {})  # question -> (answer, latency)
+        self.failures = {}  # question -> number of requests still to fail with HTTP 500
+        self.default_answer = default_answer
+        self.default_latency = default_latency
+        self.token_latency = token_latency
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                server._handle(self, payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/chat/completions"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _lookup(self, content):
+        for question, answer in self.answers.items():
+            if content.endswith(question):
+                return answer
+        return self.default_answer, self.default_latency
+
+    def _fail(self, content):
+        """Use up one scripted failure for this question, if any are left"""
+        for question, count in self.failures.items():
+            if count and content.endswith(question):
+                self.failures[question] = count - 1
+                return True
+        return False
+
+    def _handle(self, handler, payload):
+        content = payload.get("messages", [{}])[-1].get("content", "")
+        if self._fail(content):
+            self.requests.append({"content": content, "answer": None, "stream": bool(payload.get("stream")),
+                                  "max_tokens": payload.get("max_tokens")})
+            handler.send_response(500)
+            handler.send_header("Content-Length", "0")
+            handler.end_headers()
+            return
+        answer, latency = self._lookup(content)
+        tokens = max(1, round(len(answer) / 4))
+        finish_reason = "stop"
+        max_tokens = payload.get("max_tokens")
+        if max_tokens and tokens > max_tokens:
+            answer = answer[:max_tokens * 4].rsplit(" ", 1)[0]
+            tokens, finish_reason = max_tokens, "length"
+        latency += tokens * self.token_latency
+        self.requests.append({"content": content, "answer": answer, "stream": bool(payload.get("stream")),
+                              "max_tokens": max_tokens})
+        if self.clock:
+            self.clock.advance(latency)
+        else:
+            time.sleep(latency)  # real-time stub (e.g. gerty_speculative --measure)
+
+        if payload.get("stream"):
+            handler.send_response(200)
+            handler.send_header("Content-Type", "text/event-stream")
+            handler.end_headers()
+            for word in answer.split(" "):
+                chunk = {"choices": [{"delta": {"content": word + " "}}]}
+                handler.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            chunk = {"choices": [{"delta": {}, "finish_reason": finish_reason}],
+                     "usage": {"completion_tokens": tokens}}
+            handler.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            handler.wfile.write(b"data: [DONE]\n\n")
+            return
+
+        body = json.dumps({"choices": [{"message": {"content": answer}, "finish_reason": finish_reason}],
+                           "usage": {"completion_tokens": tokens}}).encode()
+        handler.send_response(200)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+
+def interaction_report(timeline):
+    """Turn the assistant's timeline marks into per-interaction latencies (seconds)"""
+    interactions = []
+    current = None
+    for event, t, data in timeline:
+        if event == "wake":
+            current = {"wake_at": t}
+            interactions.append(current)
+        elif current is None:
+            continue
+        elif event == "listening" and "wake_to_listening" not in current:
+            current["wake_to_listening"] = t - current["wake_at"]
+        elif event == "question":
+            current["question"] = data.get("text")
+            current["wake_to_question"] = t - current["wake_at"]
+        elif event == "answer":
+            current["answer"] = data.get("text")
+            current["source"] = data.get("source", "ai")
+            current["wake_to_answer"] = t - current["wake_at"]
+        elif event == "barge_in":
+            current["barge_ins"] = current.get("barge_ins", 0) + 1
+        elif event == "idle":
+            current["wake_to_idle"] = t - current["wake_at"]
+            current = None
+    return interactions
+
+
+class Simulation:
+    """Wires virtual hardware around a GERTYSimpleVoice instance and runs a scripted session"""
+
+    def __init__(self, script, tts=False, detector=None):
+        self.script = script
+        self.clock = VirtualClock()
+        self.display = HeadlessDisplay(self.clock)
+        interactions = script.get("interactions", [])
+        self.speech = ScriptedSpeech(self.clock, [
+            (i.get("say"), i.get("speech_duration", 0.5 + 0.35 * len((i.get("say") or "").split())),
+             i.get("partials"))
+            for i in interactions
+        ], partials=script.get("partials", False))
+        self.ai = StubAIServer(self.clock, {
+            i["say"]: (i.get("ai", "I'm not sure, Sam."), i.get("ai_latency", 0.5))
+            for i in interactions if i.get("say")
+        })
+        self.ai.failures = {i["say"]: i["ai_failures"] for i in interactions if i.get("say") and i.get("ai_failures")}
+        self.detector = detector or EnergyStubDetector(sensitivity=script.get("sensitivity", 0.5))
+        self.events = ScriptedEvents(self.clock, script.get("keywords", []), script.get("api", []))
+        self.tts = tts
+        self.gerty = None
+
+    def _build(self):
+        from gerty_simple_voice import GERTYSimpleVoice
+        config = apply_dict(GertyConfig(), self.script.get("config", {}), "script")
+        config.ai.url = self.ai.url if self.script.get("network", True) else "http://127.0.0.1:9/chat/completions"
+        config.tts.engine = "off"
+        config.offline.cache_path = ""  # keep the answer cache in memory
+        gerty = GERTYSimpleVoice(config=config, clock=self.clock, ui=self.display,
+                                 speech_input=self.speech, detector=self.detector)
+        if self.tts:
+            from gerty_tts import SilentEngine, SpeechPlayer
+            gerty.tts = SpeechPlayer(SilentEngine(), sink=lambda data, rate: None)
+        return gerty
+
+    def run(self):
+        """Run the scripted session and return the report dict"""
+        interactions = self.script.get("interactions", [])
+        wall_start = time.perf_counter()
+        with self.ai:
+            gerty = self.gerty = self._build()
+            mic = ScriptedMicrophone(self.clock, self._feed)
+            self.events.on_keyword = self._keyword
+            if self.script.get("api"):
+                gerty.api = self.events
+            for interaction in interactions:
+                wake = interaction.get("wake", True)
+                if wake is True:
+                    mic.add_clip(interaction["at"], tone_burst())
+                elif isinstance(wake, (bytes, bytearray)):
+                    mic.add_clip(interaction["at"], bytes(wake))
+                elif wake:
+                    mic.add_clip(interaction["at"], load_wav(wake))
+            last = max([i["at"] for i in interactions + self.script.get("keywords", []) + self.script.get("api", [])],
+                       default=0.0)
+            self.display.exit_at = last + self.script.get("end_after", 10.0)
+            gerty.run()
+        wall_seconds = time.perf_counter() - wall_start
+
+        return {
+            "virtual_seconds": self.clock.time(),
+            "wall_seconds": wall_seconds,
+            "frames_shown": self.display.frames_shown,
+            "ai_requests": len(self.ai.requests),
+            "interactions": interaction_report(gerty.timeline),
+            "intents": gerty.get_intent_stats(),
+            "speculation": gerty.speculator.stats(),
+        }
+
+    def _feed(self, frame):
+        gerty = self.gerty
+        if gerty and gerty.porcupine and gerty.listening_for_wake_word:
+            gerty.feed_audio(frame)
+
+    def _keyword(self, spec):
+        gerty = self.gerty
+        if gerty and gerty.porcupine and gerty.listening_for_wake_word:
+            gerty._on_keyword(spec)
+
+
+def check_budgets(report, budgets):
+    """Return a list of budget violations, budgets being {metric: max_seconds}"""
+    violations = []
+    for index, interaction in enumerate(report["interactions"]):
+        for metric, limit in budgets.items():
+            value = interaction.get(metric)
+            if value is not None and value > limit:
+                violations.append(f"interaction {index}: {metric}={value:.3f}s > {limit:.3f}s")
+    return violations
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Run a scripted GERTY session on a virtual clock")
+    parser.add_argument("script", help="JSON session script")
+    parser.add_argument("--budget", action="append", default=[], metavar="METRIC=SECONDS",
+                        help="Fail if any interaction exceeds this latency, e.g. wake_to_answer=4.5")
+    parser.add_argument("--tts", action="store_true", help="Include the (silent) speech output stage")
+    parser.add_argument("--json", help="Write the report to this file")
+    args = parser.parse_args(argv)
+
+    with open(args.script) as f:
+        script = json.load(f)
+    budgets = {}
+    for item in args.budget:
+        metric, _, value = item.partition("=")
+        budgets[metric] = float(value)
+
+    report = Simulation(script, tts=args.tts).run()
+    print(f"<SIM> {report['virtual_seconds']:.1f} virtual s in {report['wall_seconds'] * 1000:.0f} ms wall, "
+          f"{report['frames_shown']} frames, {report['ai_requests']} AI requests, "
+          f"{report['intents']['local']}/{report['intents']['questions']} answered locally")
+    for index, interaction in enumerate(report["interactions"]):
+        print(f"   #{index} wake@{interaction['wake_at']:.2f}s "
+              f"question={interaction.get('wake_to_question', float('nan')):.2f}s "
+              f"answer={interaction.get('wake_to_answer', float('nan')):.2f}s "
+              f"idle={interaction.get('wake_to_idle', float('nan')):.2f}s")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    violations = check_budgets(report, budgets)
+    for violation in violations:
+        print(f"<BUDGET> {violation}")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,39 +4,73 @@ GERTY Simple Voice Assistant with Porcupine Wake Word Detection
 Uses custom "Hey GERTY" wake word model with always-on microphone
 """
 
-import cv2
 import os
 import time
-import glob
 import sys
-import requests
-import speech_recognition as sr
-import pvporcupine
-import pyaudio
-import struct
+import json
+import traceback
 import threading
 import signal
-from pathlib import Path
+from collections import deque
 from typing import Optional
 
+from gerty.startup import STARTUP, LazyModule
+from gerty_audio import AudioRingBuffer, unpack_frame
+from gerty_keywords import KeywordRegistry, WAKE, STOP, SHUTDOWN
+from gerty_tts import SpeechPlayer, create_engine, frame_rms
+from gerty_config import load_config, diff_config
+from gerty_recorder import SessionRecorder
+from gerty_profiler import StackSampler
+from gerty_supervisor import Supervisor, EXIT_RESTART
+from gerty_offline import AnswerCache, ConnectivityMonitor, OfflineResponder
+from gerty_intents import SLEEP, STOP as INTENT_STOP, default_registry
+from gerty_speculative import SpeculativeAsker
+from gerty_emotion import EmotionWorker
+from gerty_idle import ASLEEP, DIM, Backlight, IdleStateMachine
+from gerty_dsp import AudioFrontEnd, create_frontend, frontend_kwargs
+from gerty_api import ControlAPI
+from gerty_budget import ResponseBudget, display_capacity, trim_to_sentence
+from gerty import GertyScreen, play_images
 
-class GERTYSimpleVoice:
-    def __init__(self):
-        self.base_path = Path(__file__).parent / "gertycon"
-        self.window_name = "GERTY"
-        self.display_time = 2.0
+# Heavy modules load on first use, when their subsystem is set up
+requests = LazyModule("requests")
+sr = LazyModule("speech_recognition")
+pvporcupine = LazyModule("pvporcupine")
+pyaudio = LazyModule("pyaudio")
+STARTUP.mark("module_imports")
+
+IDLE_TEXT = "Listening for 'Hey GERTY'..."
+
+
+class GERTYSimpleVoice(GertyScreen):
+    def __init__(self, config=None, clock=None, ui=None, speech_input=None, detector=None):
+        """
+        config defaults to load_config() (gerty_config.json + GERTY_* environment).
+        The other optional arguments replace hardware for simulation:
+        clock (time/sleep), ui (cv2-style window API), speech_input (object with
+        listen(timeout) -> text) and detector (Porcupine-style, fed via feed_audio)
+        """
+        self.speech_input = speech_input
+        self.detector = detector
+        self.timeline = deque(maxlen=1000)
         
-        # Screen resolution for GERTY (1024x600)
-        self.target_width = 1024
-        self.target_height = 600
+        # Settings are read once here and re-read on SIGHUP (see reload_config)
+        self.config = config or load_config()
+        self.reload_requested = False
+        
+        # Window, assets and timed display loop (gerty.display)
+        super().__init__(self.config.display.width, self.config.display.height, ui=ui, clock=clock)
         
         # Voice components
-        self.recognizer = sr.Recognizer()
-        self.microphone = sr.Microphone()
+        self.recognizer = None  # created in setup_voice()
+        self.microphone = None
         
-        # AI API configuration
-        self.ai_api_url = "https://ai.hackclub.com/chat/completions"
+        # AI API configuration (pooled keep-alive session, see http)
         self.ai_headers = {"Content-Type": "application/json"}
+        self._http = None
+        self.ai_failures = 0  # consecutive, watched by the supervisor
+        self.budget = ResponseBudget(display_capacity(self, self.config.ai.response_pages),
+                                     self.config.ai.target_latency)
         
         # Porcupine wake word detection
         self.porcupine = None
@@ -46,31 +80,187 @@ class GERTYSimpleVoice:
         self.wake_word_thread = None
         self.listening_for_wake_word = False
         
+        # Capture callback -> ring buffer -> wake word worker
+        self.audio_buffer = AudioRingBuffer(capacity=self.config.wake.ring_buffer_frames)
+        self.audio_paused = False
+        self.audio_process = None  # set when capture + detection run in a child process
+        self.frontend = create_frontend(self.config.frontend)  # optional high-pass / AGC / noise suppression
+        
+        # Keyword models shipped next to this script (wake, stop, shutdown, ...)
+        self.keywords = KeywordRegistry()
+        self.keywords.discover(self.config.wake.keyword_dir)
+        for spec in self.keywords.specs.values():
+            spec.sensitivity = self.config.wake.sensitivity
+        self.stop_requested = False
+        self.shutdown_requested = False
+        
+        # Barge-in: wake word during an interaction cancels the current stage
+        self.barge_in = threading.Event()
+        self.barge_in_time = None
+        self.barge_in_latencies = deque(maxlen=100)
+        self._ambient_threshold = None  # last microphone calibration, reused on barge-in
+        self._ai_stream = None  # streaming AI response in flight, closed when abandoned
+        
+        # Spoken output (None when no offline TTS engine is available)
+        self.tts = None
+        
+        # Opt-in field recorder for latency debugging (see gerty_recorder.py)
+        self.recorder = None
+        recorder = self.config.recorder
+        if recorder.enabled:
+            self.recorder = SessionRecorder(recorder.directory, pre_roll=recorder.pre_roll,
+                                            post_roll=recorder.post_roll, max_sessions=recorder.max_sessions,
+                                            max_megabytes=recorder.max_megabytes)
+        
+        # On-demand sampling profiler (SIGUSR1 or P key)
+        self.profiler = StackSampler(self.config.profiler.interval, self.config.profiler.directory)
+        self.profile_toggle_requested = False
+        
+        # Connectivity monitor and local answers for network outages
+        self.connectivity = None
+        self.offline = None
+        offline = self.config.offline
+        if offline.enabled:
+            self.connectivity = ConnectivityMonitor(self.ai_api_url, offline.probe_interval,
+                                                    offline.offline_probe_interval, offline.probe_timeout)
+            self.connectivity.add_listener(self._on_connectivity)
+            self.offline = OfflineResponder(AnswerCache(offline.cache_path, offline.cache_size))
+        
+        # Local intents answered without the AI ("what time is it", "stop", "go to sleep")
+        self.intents = default_registry()
+        self.questions_heard = 0
+        self.local_answers = 0
+        
+        # Idle power mode: awake -> dim -> asleep (blank) between interactions
+        display = self.config.display
+        self.idle = IdleStateMachine(self.clock, display.dim_after, display.sleep_after)
+        self._idle_view = None  # (state, status badge) currently on screen
+        self.backlight = None
+        if display.backlight:
+            try:
+                self.backlight = Backlight(display.backlight)
+            except (OSError, ValueError) as e:
+                print(f"<WARNING> Backlight {display.backlight} unavailable: {e}")
+        
+        # Answer text -> face, classified off the UI thread with the frame prefetched
+        self.emotions = EmotionWorker(prefetch=lambda emotion: self.prefetch(self.assets.emotion_image(emotion)))
+        
+        # Early AI requests on stable partial transcripts (speech inputs with partial results)
+        self.speculator = SpeculativeAsker(self._ask_early, stable_for=self.config.speech.speculate_after,
+                                           clock=self.clock.time, should_ask=self._worth_speculating)
+        
+        # Optional watchdog restarting audio / UI window / HTTP pool in place
+        self.supervisor = None
+        self.window_reset_requested = False
+        self._audio_beat = None
+        self._audio_seen = (0, time.monotonic())
+        
+        # Optional local control API (HTTP + WebSocket event stream), started in run()
+        self.api = None
+        self.last_question = None
+        self.last_answer = None
+        
         # Current state
         self.is_processing = False
         
         # Setup signal handler for clean shutdown
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
+        if hasattr(signal, "SIGHUP"):
+            signal.signal(signal.SIGHUP, self._reload_signal_handler)
+        if hasattr(signal, "SIGUSR1"):
+            signal.signal(signal.SIGUSR1, self._profile_signal_handler)
         
+    @property
+    def display_time(self):
+        return self.config.display.display_time
+    
+    @property
+    def boot_duration(self):
+        return self.config.display.boot_duration
+    
+    @property
+    def poll_ms(self):
+        return self.config.display.poll_ms
+    
+    @property
+    def ai_api_url(self):
+        return self.config.ai.url
+    
+    @property
+    def barge_in_budget(self):
+        """Seconds allowed from a mid-interaction wake word until the new capture is listening"""
+        return self.config.wake.barge_in_budget
+    
+    def _reload_signal_handler(self, signum, frame):
+        """SIGHUP: ask the UI loop to re-read the config (applied between frames)"""
+        self.reload_requested = True
+    
+    def _profile_signal_handler(self, signum, frame):
+        """SIGUSR1: toggle the sampling profiler from the UI loop"""
+        self.profile_toggle_requested = True
+    
+    def toggle_profiler(self):
+        """Start or stop the sampling profiler (stopping writes the profile)"""
+        self.profile_toggle_requested = False
+        self.profiler.interval = self.config.profiler.interval
+        self.profiler.output_dir = self.config.profiler.directory
+        return self.profiler.toggle()
+    
+    def reload_config(self):
+        """Re-read settings and apply them live; the audio stream keeps running"""
+        self.reload_requested = False
+        new_config = load_config()
+        changes = diff_config(self.config, new_config)
+        if not changes:
+            print("<CONFIG> Reloaded, no changes")
+            return changes
+        for name, before, after, needs_restart in changes:
+            if needs_restart:
+                print(f"<CONFIG> {name}: {before!r} -> {after!r} (takes effect after restart)")
+            else:
+                print(f"<CONFIG> {name}: {before!r} -> {after!r}")
+        # Keep restart-only settings as they are, so what we report matches what runs
+        for name, before, _after, needs_restart in changes:
+            if needs_restart:
+                section, key = name.split(".")
+                setattr(getattr(new_config, section), key, before)
+        self.config = new_config
+        return changes
+    
     def _signal_handler(self, signum, frame):
         """Handle signals for clean shutdown"""
         print(f"\n[STOP] Received signal {signum}, cleaning up...")
+        if self.supervisor:
+            self.supervisor.stop()  # no restarts while shutting down
         self.cleanup_porcupine()
-        cv2.destroyAllWindows()
+        self.ui.destroyAllWindows()
         sys.exit(0)
         
-    def setup_display(self):
-        """Initialize the display window"""
-        cv2.namedWindow(self.window_name, cv2.WINDOW_NORMAL)
-        cv2.resizeWindow(self.window_name, self.target_width, self.target_height)
+    def _mark(self, event, **data):
+        """Record a timestamped pipeline event (used for latency reports)"""
+        t = self.clock.time()
+        self.timeline.append((event, t, data))
+        if self.recorder:
+            self.recorder.event(event, t, data)
+        if self.api:
+            self.api.publish(event, t, data)
+        if event == "question":
+            self.last_question = data.get("text")
+        elif event == "answer":
+            self.last_answer = data.get("text")
         
     def setup_voice(self):
         """Initialize voice components"""
         print("<MIC> Setting up voice recognition...")
+        if self.speech_input is not None:
+            print("   <OK> Using injected speech input")
+            return
         
         # Adjust for ambient noise
         try:
+            self.recognizer = sr.Recognizer()
+            self.microphone = sr.Microphone()
             with self.microphone as source:
                 print("   Calibrating microphone for ambient noise...")
                 self.recognizer.adjust_for_ambient_noise(source, duration=1)
@@ -87,13 +277,30 @@ class GERTYSimpleVoice:
             if self.porcupine:
                 self.cleanup_porcupine()
             
-            # Use your actual access key with custom "Hey GERTY" model
-            keyword_path = str(Path(__file__).parent / "Hey-Goodie_en_mac_v3_0_0.ppn")
-            print(f"   <FILE> Using custom keyword model: {keyword_path}")
+            # Injected detector: audio arrives through feed_audio(), no PyAudio stream
+            if self.detector is not None:
+                self.keywords.resolve()  # keyword index -> action mapping
+                self.porcupine = self.detector
+                print("   <OK> Using injected wake word detector")
+                return True
+            
+            # Load every keyword model for this platform into one Porcupine instance
+            keyword_paths = self.keywords.resolve()
+            if not keyword_paths:
+                print("   <ERROR> No keyword models (.ppn) found")
+                return False
+            print(f"   <INFO> Platform: {self.keywords.platform}")
+            for index, path in enumerate(keyword_paths):
+                spec = self.keywords.keyword_for(index)
+                print(f"   <FILE> Keyword '{spec.name}' -> {spec.action}: {path}")
+            
+            if self.config.wake.audio_process:
+                return self._setup_audio_process(keyword_paths)
             
             self.porcupine = pvporcupine.create(
-                access_key="fill in with your access key :)",
-                keyword_paths=[keyword_path]
+                access_key=self.config.wake.access_key,
+                keyword_paths=keyword_paths,
+                sensitivities=self.keywords.sensitivities()
             )
             
             # Initialize PyAudio with error handling
@@ -112,9 +319,11 @@ class GERTYSimpleVoice:
                     input=True,
                     frames_per_buffer=self.porcupine.frame_length,
                     input_device_index=None,  # Use default input device
-                    stream_callback=None,
+                    stream_callback=self._audio_callback,
                     start=False  # Don't start immediately
                 )
+                self.audio_buffer.clear()
+                self.audio_paused = False
                 # Start the stream after creation
                 self.audio_stream.start_stream()
             except Exception as e:
@@ -133,6 +342,23 @@ class GERTYSimpleVoice:
             print(f"   <ERROR> Porcupine setup failed: {e}")
             return False
     
+    def _setup_audio_process(self, keyword_paths):
+        """Run capture and Porcupine in a child process that hands frames back over shared memory"""
+        from gerty_audio_process import AudioProcess
+        
+        self.audio_process = AudioProcess(
+            ("porcupine", {"access_key": self.config.wake.access_key, "keyword_paths": keyword_paths,
+                           "sensitivities": self.keywords.sensitivities()}),
+            capacity=self.config.wake.ring_buffer_frames,
+            frontend=frontend_kwargs(self.config.frontend) if self.frontend else None)
+        if not self.audio_process.start():
+            print("   <ERROR> Audio process failed to start")
+            self.audio_process = None
+            return False
+        self.audio_paused = False
+        print("   <OK> Porcupine wake word detection ready (separate audio process)")
+        return True
+    
     def _try_porcupine_setup(self):
         """Try to setup Porcupine (will likely fail without access key)"""
         try:
@@ -161,15 +387,110 @@ class GERTYSimpleVoice:
             print(f"   ⚠️  Porcupine setup failed: {str(e)[:100]}...")
             return False
     
+    def _audio_callback(self, in_data, frame_count, time_info, status_flags):
+        """PyAudio capture callback - only queues the frame, inference runs in the worker"""
+        self.audio_buffer.put(in_data, input_overflow=bool(status_flags & pyaudio.paInputOverflow))
+        return (None, pyaudio.paContinue)
+    
+    def _process_frame(self, pcm):
+        """Run one unpacked PCM frame through Porcupine and dispatch keyword hits"""
+        return self._handle_detection(pcm, self.porcupine.process(pcm))
+    
+    def _echo_gate_active(self):
+        gate = self.tts.echo_gate if self.tts else None
+        return bool(gate and gate.active())
+    
+    def _handle_detection(self, pcm, keyword_index):
+        """Echo gate and keyword dispatch for a frame already run through the detector (pcm may be None)"""
+        # While GERTY is speaking, make sure it is the user and not our own echo
+        gate = self.tts.echo_gate if self.tts else None
+        if gate and pcm is not None and gate.active():
+            mic_rms = frame_rms(pcm)
+            self.tts.duck(gate.observe(mic_rms))
+            if keyword_index >= 0 and not gate.allow(mic_rms):
+                print("<ECHO> Ignoring keyword heard during playback")
+                return -1
+        
+        if keyword_index >= 0:
+            self._on_keyword(self.keywords.keyword_for(keyword_index))
+        return keyword_index
+    
+    def _on_keyword(self, spec):
+        """Act on a detected keyword according to its registered action"""
+        action = spec.action if spec else WAKE
+        if action == WAKE:
+            if not self.is_processing:
+                print("<WAKE> Wake word detected!")
+                self._mark("wake", keyword=spec.name if spec else None)
+                self.wake_word_detected = True
+            else:
+                print("<WAKE> Wake word detected mid-interaction, barging in")
+                self._request_barge_in()
+        elif action == STOP:
+            if self.is_processing:
+                print(f"<STOP> '{spec.name}' detected, stopping current interaction")
+                self.stop_requested = True
+        elif action == SHUTDOWN:
+            print(f"<STOP> '{spec.name}' detected, shutting down")
+            self.shutdown_requested = True
+    
+    def feed_audio(self, frame):
+        """Push one raw PCM frame through detection (capture worker, simulation and replay)"""
+        if self.recorder:
+            self.recorder.add_frame(frame)
+        pcm = unpack_frame(frame, self.porcupine.frame_length)
+        if self.frontend is not None:
+            # Detector hears the cleaned audio; the echo gate keeps comparing raw mic levels
+            return self._handle_detection(pcm, self.porcupine.process(self.frontend.process(frame).tolist()))
+        return self._process_frame(pcm)
+    
+    def get_audio_stats(self):
+        """Return capture/worker counters (overflows, empty waits, queue depth)"""
+        if self.audio_process:
+            return self.audio_process.stats()
+        stats = self.audio_buffer.stats.snapshot()
+        if self.frontend is not None:
+            stats["frontend"] = self.frontend.stats.snapshot()
+        return stats
+    
+    def audio_process_listener(self):
+        """Main-process side of the audio process: recorder, echo gate and keyword dispatch"""
+        print("<LISTEN> Wake word listener started (audio process)...")
+        me = threading.current_thread()
+        audio = self.audio_process
+        
+        while self.listening_for_wake_word and self.wake_word_thread in (None, me):
+            self._audio_beat = time.monotonic()
+            try:
+                for _seq, frame, keyword_index in audio.read():
+                    pcm = None
+                    if frame is not None:
+                        if self.recorder:
+                            self.recorder.add_frame(frame)
+                        if keyword_index >= 0 or self._echo_gate_active():
+                            pcm = unpack_frame(frame, audio.frame_length)
+                    if keyword_index >= 0 or pcm is not None:
+                        self._handle_detection(pcm, keyword_index)
+            except Exception as e:
+                if self.listening_for_wake_word:
+                    print(f"<WARNING> Audio process read error: {e}")
+            time.sleep(0.01)
+        
+        print("<LISTEN> Wake word listener stopped")
+        print(f"<STATS> Audio: {self.get_audio_stats()}")
+    
     def wake_word_listener(self):
-        """Background thread for wake word detection"""
+        """Background worker that drains the capture ring buffer into Porcupine"""
         print("<LISTEN> Wake word listener started...")
+        me = threading.current_thread()
         
-        while self.listening_for_wake_word:
+        # A listener replaced by a supervisor restart exits on its own if it ever unblocks
+        while self.listening_for_wake_word and self.wake_word_thread in (None, me):
+            self._audio_beat = time.monotonic()
             try:
                 if self.audio_stream:
-                    # Ensure stream is active before reading
-                    if not self.audio_stream.is_active():
+                    # Ensure stream is active unless it was paused on purpose
+                    if not self.audio_paused and not self.audio_stream.is_active():
                         try:
                             self.audio_stream.start_stream()
                             print("<STREAM> Audio stream restarted")
@@ -178,24 +499,16 @@ class GERTYSimpleVoice:
                             time.sleep(0.5)
                             continue
                     
-                    # Read audio frame with proper error handling
+                    # Wait for the capture callback to hand over a frame
+                    frame = self.audio_buffer.get(timeout=0.1)
+                    if frame is None:
+                        continue
+                    
                     try:
-                        pcm = self.audio_stream.read(
-                            self.porcupine.frame_length, 
-                            exception_on_overflow=False
-                        )
-                        pcm = struct.unpack_from("h" * self.porcupine.frame_length, pcm)
-                        
-                        # Process audio frame
-                        keyword_index = self.porcupine.process(pcm)
-                        
-                        if keyword_index >= 0 and not self.is_processing:
-                            print("<WAKE> Wake word detected!")
-                            self.wake_word_detected = True
-                    except Exception as stream_error:
+                        self.feed_audio(frame)
+                    except Exception as frame_error:
                         if self.listening_for_wake_word:
-                            print(f"<WARNING> Audio stream read error: {stream_error}")
-                        time.sleep(0.1)
+                            print(f"<WARNING> Audio frame processing error: {frame_error}")
                 else:
                     # Stream not available, wait a bit
                     time.sleep(0.1)
@@ -206,17 +519,22 @@ class GERTYSimpleVoice:
                 time.sleep(0.1)
                 
         print("<LISTEN> Wake word listener stopped")
+        print(f"<STATS> Audio: {self.get_audio_stats()}")
     
     def start_wake_word_detection(self):
         """Start the Porcupine wake word detection in a background thread"""
-        if self.porcupine and self.audio_stream:
+        if self.audio_process or (self.porcupine and (self.audio_stream or self.detector is not None)):
             # Don't start if already listening
             if self.listening_for_wake_word:
                 print("<INFO> Wake word detection already active")
                 return True
                 
             self.listening_for_wake_word = True
-            self.wake_word_thread = threading.Thread(target=self.wake_word_listener, daemon=True)
+            if self.detector is not None:
+                # Frames are pushed in by feed_audio(), no capture thread needed
+                return True
+            listener = self.audio_process_listener if self.audio_process else self.wake_word_listener
+            self.wake_word_thread = threading.Thread(target=listener, name="wake-word", daemon=True)
             self.wake_word_thread.start()
             return True
         return False
@@ -235,6 +553,11 @@ class GERTYSimpleVoice:
             # Stop wake word detection first
             self.stop_wake_word_detection()
             
+            if self.audio_process:
+                self.audio_process.stop()
+                self.audio_process = None
+                print("   <OK> Audio process stopped")
+            
             # Stop and close audio stream
             if hasattr(self, 'audio_stream') and self.audio_stream:
                 try:
@@ -258,8 +581,10 @@ class GERTYSimpleVoice:
                 finally:
                     self.pa = None
                 
-            # Delete Porcupine instance
-            if hasattr(self, 'porcupine') and self.porcupine:
+            # Delete Porcupine instance (an injected detector is owned by the caller)
+            if self.detector is not None:
+                self.porcupine = None
+            elif hasattr(self, 'porcupine') and self.porcupine:
                 try:
                     self.porcupine.delete()
                     print("   <OK> Porcupine instance deleted")
@@ -269,149 +594,263 @@ class GERTYSimpleVoice:
                     self.porcupine = None
                 
             # Small delay to ensure cleanup completes
-            time.sleep(0.1)
+            self.clock.sleep(0.1)
                 
         except Exception as e:
             print(f"<WARNING> Cleanup error: {e}")
             
-    def load_and_scale_image(self, image_path):
-        """Load image and scale it to fit the target resolution"""
-        img = cv2.imread(str(image_path))
-        if img is None:
-            print(f"Error loading image: {image_path}")
+    @property
+    def http(self):
+        """Keep-alive HTTP session for the AI API, reused across interactions"""
+        if self._http is None:
+            self._http = requests.Session()
+            self._http.headers.update(self.ai_headers)
+        return self._http
+    
+    def reset_http(self):
+        """Drop the pooled connections (supervisor restart of the network component)"""
+        session, self._http = self._http, None
+        self.ai_failures = 0
+        if session is not None:
+            session.close()
+    
+    def _note_ai(self, ok, error=None):
+        self.ai_failures = 0 if ok else self.ai_failures + 1
+        if self.connectivity is None:
+            return
+        if ok:
+            self.connectivity.report_success()
+        elif isinstance(error, (requests.ConnectionError, requests.Timeout)):
+            self.connectivity.report_failure()
+    
+    def is_offline(self):
+        """True while the connectivity monitor says the AI host is unreachable"""
+        return self.connectivity is not None and not self.connectivity.online
+    
+    def _on_connectivity(self, online):
+        self.status_text = None if online else "OFFLINE"
+        self._mark("online" if online else "offline")
+    
+    def answer_offline(self, question):
+        """Local answer (cached answer or apology), spoken if TTS is available"""
+        answer, source = self.offline.answer(question)
+        print(f"<OFFLINE> Answering from {source}: {answer}")
+        if self.tts:
+            self.tts.say(answer)
+        return answer
+    
+    def answer_intent(self, question):
+        """
+        Serve the question from the local intent registry. Returns None when it
+        needs the AI, otherwise the interaction result (like _interaction_pass)
+        """
+        if not self.config.intents.enabled:
             return None
-            
-        if img.shape[:2] != (self.target_height, self.target_width):
-            img_scaled = cv2.resize(img, (self.target_width, self.target_height), interpolation=cv2.INTER_LANCZOS4)
-        else:
-            img_scaled = img
-            
-        return img_scaled
+        start = time.perf_counter()
+        intent = self.intents.handle(question)
+        if intent is None:
+            return None
+        self.local_answers += 1
+        print(f"<INTENT> {intent.intent} matched in {(time.perf_counter() - start) * 1000:.2f} ms")
+        self._mark("answer", text=intent.reply, source="intent", intent=intent.intent)
+        if intent.action == INTENT_STOP:
+            return "stop"
+        if intent.action == SLEEP:
+            self.idle.sleep()
+        if intent.reply and self.tts:
+            self.tts.say(intent.reply)
         
+        durations = self.config.display
+        duration = durations.answer_duration if intent.reply else durations.display_time
+        result = self.display_emotion(intent.emotion, duration, intent.reply)
+        while result is True and self.tts and self.tts.is_speaking():
+            result = self.display_emotion(intent.emotion, durations.idle_refresh, intent.reply)
+        return result
+    
+    def _worth_speculating(self, text):
+        """Partial transcripts that would go to the AI if they were final"""
+        if self.is_offline():
+            return False
+        return not (self.config.intents.enabled and self.intents.match(text)[0] is not None)
+    
+    def get_intent_stats(self):
+        """Share of heard questions answered by local intents"""
+        return {
+            "questions": self.questions_heard,
+            "local": self.local_answers,
+            "local_share": self.local_answers / self.questions_heard if self.questions_heard else 0.0,
+            "by_intent": dict(self.intents.stats),
+        }
+    
+    def start_supervisor(self):
+        """Watch audio capture, the UI loop and AI networking, restarting each in place"""
+        settings = self.config.supervisor
+        self.supervisor = Supervisor(check_interval=settings.check_interval, max_restarts=settings.max_restarts,
+                                     restart_window=settings.restart_window, on_give_up=self._supervisor_gave_up)
+        if self.detector is None:
+            self.supervisor.add("audio", self.restart_audio, check=self._check_audio)
+        self.supervisor.add("ui", self._recover_ui, heartbeat_timeout=settings.ui_stall, critical=True)
+        self.supervisor.add("network", self.reset_http, check=self._check_network, limit=False)
+        self.supervisor.start()
+    
+    def _check_audio(self):
+        """Reason the capture path is unhealthy, or None"""
+        if not self.listening_for_wake_word or (self.audio_stream is None and self.audio_process is None):
+            return None  # stopped on purpose (or never started)
+        if self.wake_word_thread is not None and not self.wake_word_thread.is_alive():
+            return "wake word thread died"
+        if self.audio_process and not self.audio_process.alive:
+            return "audio process exited"
+        now = time.monotonic()
+        stall = self.config.supervisor.audio_stall
+        if self._audio_beat is not None and now - self._audio_beat > stall:
+            return f"wake word worker stuck for {now - self._audio_beat:.1f}s"
+        captured = self._frames_captured()
+        if captured != self._audio_seen[0] or self.audio_paused:
+            self._audio_seen = (captured, now)
+            return None
+        if now - self._audio_seen[1] > stall:
+            return f"no audio captured for {now - self._audio_seen[1]:.1f}s"
+        return None
+    
+    def restart_audio(self):
+        """Rebuild Porcupine, the PyAudio stream and the wake word worker; UI and network are untouched"""
+        self.cleanup_porcupine()
+        if self.setup_porcupine():
+            self.start_wake_word_detection()
+        self._audio_beat = None
+        self._audio_seen = (self._frames_captured(), time.monotonic())
+    
+    def _frames_captured(self):
+        if self.audio_process:
+            return self.audio_process.frames_captured
+        return self.audio_buffer.stats.frames_captured
+    
+    def _check_network(self):
+        limit = self.config.supervisor.ai_failures
+        if limit and self.ai_failures >= limit:
+            return f"{self.ai_failures} AI requests failed in a row"
+        return None
+    
+    def _recover_ui(self):
+        """UI heartbeat missed: show where the main thread is stuck and rebuild the window"""
+        frame = sys._current_frames().get(threading.main_thread().ident)
+        if frame is not None:
+            print("<SUPERVISOR> UI thread is at:")
+            traceback.print_stack(frame)
+        self.window_reset_requested = True
+    
+    def _supervisor_gave_up(self, component):
+        if component.critical:
+            print(f"<SUPERVISOR> {component.name} cannot be recovered in place, exiting for a cold restart")
+            self.cleanup_porcupine()
+            os._exit(EXIT_RESTART)
+        if component.name == "audio":
+            print("<SUPERVISOR> Wake word unavailable, SPACE still activates GERTY")
+    
     def display_image(self, image_path, duration=None, show_text=None, check_wake_word=False):
         """Display a single image for specified duration with optional text overlay"""
-        if duration is None:
-            duration = self.display_time
-            
-        img = self.load_and_scale_image(image_path)
-        if img is None:
+        return super().display_image(image_path, duration, show_text,
+                                     on_key=lambda key: self._poll_controls(key, check_wake_word))
+    
+    def _poll_controls(self, key, check_wake_word=False):
+        """Called every display poll; returns None to keep showing the image"""
+        if self.supervisor:
+            self.supervisor.beat("ui")
+            if self.window_reset_requested:
+                self.window_reset_requested = False
+                self.ui.destroyAllWindows()
+                self.setup_display()
+                self._idle_view = None
+        if self.reload_requested:
+            self.reload_config()
+        if self.profile_toggle_requested or key == ord('p'):
+            self.toggle_profiler()
+        if self.shutdown_requested:  # Shutdown keyword
             return False
+        elif self.stop_requested:
+            return "stop"
+        elif self.barge_in.is_set():
+            return "barge_in"
+        elif key == ord(' '):  # Space bar for manual activation (backup)
+            return "activate"
         
-        # Add text overlay if provided
-        if show_text:
-            # Create a copy to avoid modifying the original
-            img_with_text = img.copy()
-            
-            # Add semi-transparent black background for text
-            overlay = img_with_text.copy()
-            cv2.rectangle(overlay, (50, self.target_height - 150), 
-                         (self.target_width - 50, self.target_height - 50), 
-                         (0, 0, 0), -1)
-            cv2.addWeighted(overlay, 0.7, img_with_text, 0.3, 0, img_with_text)
-            
-            # Add text
-            font = cv2.FONT_HERSHEY_SIMPLEX
-            font_scale = 0.8
-            color = (255, 255, 255)  # White text
-            thickness = 2
-            
-            # Split long text into multiple lines
-            words = show_text.split(' ')
-            lines = []
-            current_line = ""
-            max_chars = 50  # Approximate characters per line
-            
-            for word in words:
-                if len(current_line + word) < max_chars:
-                    current_line += word + " "
-                else:
-                    if current_line:
-                        lines.append(current_line.strip())
-                    current_line = word + " "
-            if current_line:
-                lines.append(current_line.strip())
-            
-            # Draw each line
-            y_start = self.target_height - 120
-            line_height = 30
-            for i, line in enumerate(lines[:3]):  # Max 3 lines
-                y_pos = y_start + (i * line_height)
-                cv2.putText(img_with_text, line, (70, y_pos), font, font_scale, color, thickness)
-            
-            img = img_with_text
-        
-        cv2.imshow(self.window_name, img)
-        cv2.waitKey(1)
-        
-        start_time = time.time()
-        while time.time() - start_time < duration:
-            key = cv2.waitKey(50) & 0xFF
-            if key == 27 or key == ord('q'):  # ESC or Q
-                return False
-            elif key == ord(' '):  # Space bar for manual activation (backup)
-                return "activate"
-            
-            # Check for wake word detection
-            if check_wake_word and self.wake_word_detected:
-                self.wake_word_detected = False  # Reset flag
-                return "wake_word"
-                
-        return True
+        # Check for wake word detection
+        if check_wake_word and self.wake_word_detected:
+            self.wake_word_detected = False  # Reset flag
+            return "wake_word"
+        if check_wake_word and self.api and self.api.pending():
+            return "api"
+        return None
         
     def display_emotion(self, emotion_type="neutral", duration=2.0, text=None, check_wake_word=False):
         """Display a specific emotion"""
-        emotion_path = self.base_path / "emotion"
-        emotion_images = sorted(glob.glob(str(emotion_path / "*.jpg")))
-        
-        if emotion_images:
-            # Map emotions to different images
-            emotion_map = {
-                "neutral": 0,
-                "happy": min(1, len(emotion_images)-1),
-                "thinking": min(2, len(emotion_images)-1),
-                "listening": min(3, len(emotion_images)-1),
-                "sad": min(4, len(emotion_images)-1),
-                "confused": min(5, len(emotion_images)-1)
-            }
-            
-            image_index = emotion_map.get(emotion_type, 0)
-            image_path = emotion_images[image_index]
-            return self.display_image(image_path, duration, text, check_wake_word)
-        return True
+        image_path = self.assets.emotion_image(emotion_type)
+        if image_path is None:
+            return True
+        return self.display_image(image_path, duration, text, check_wake_word)
+        
+    def listen_for_speech(self, timeout=None, on_capture=None):
+        """Listen for speech and convert to text; on_capture() is called as the capture starts"""
+        speech = self.config.speech
+        if timeout is None:
+            timeout = speech.listen_timeout
+        if self.speech_input is not None:
+            print("<MIC> Listening for your question...")
+            if on_capture:
+                on_capture()
+            if speech.speculate and getattr(self.speech_input, "supports_partials", False):
+                self.speculator.stable_for = speech.speculate_after
+                self.speculator.begin()
+                text = self.speech_input.listen(timeout, on_partial=self.speculator.on_partial)
+            else:
+                text = self.speech_input.listen(timeout)
+            print(f"<TEXT> You said: '{text}'" if text else "<TIMEOUT> No speech detected within timeout")
+            return text
         
-    def listen_for_speech(self, timeout=5):
-        """Listen for speech and convert to text"""
         try:
             print("<MIC> Listening for your question...")
             
             # Temporarily pause Porcupine audio stream to avoid microphone conflicts on macOS
             audio_was_paused = False
-            if self.listening_for_wake_word and self.audio_stream:
+            if self.listening_for_wake_word and (self.audio_stream or self.audio_process):
                 print("<PAUSE> Temporarily pausing audio stream for speech recognition...")
                 if self.pause_audio_stream():
                     audio_was_paused = True
-                    time.sleep(0.3)  # Brief delay to ensure audio stream is fully released
+                    self.clock.sleep(0.3)  # Brief delay to ensure audio stream is fully released
             
             # Use a completely separate microphone instance for speech recognition
             temp_recognizer = sr.Recognizer()
             temp_microphone = sr.Microphone()
             
             with temp_microphone as source:
-                # Adjust for ambient noise quickly
-                temp_recognizer.adjust_for_ambient_noise(source, duration=0.5)
+                if on_capture and self._ambient_threshold is not None:
+                    # Barge-in: keep the last calibration rather than spend ambient_duration on a new one
+                    temp_recognizer.energy_threshold = self._ambient_threshold
+                else:
+                    # Adjust for ambient noise quickly
+                    temp_recognizer.adjust_for_ambient_noise(source, duration=speech.ambient_duration)
+                    self._ambient_threshold = temp_recognizer.energy_threshold
+                if on_capture:
+                    on_capture()
                 # Listen for audio with timeout
-                audio = temp_recognizer.listen(source, timeout=timeout, phrase_time_limit=10)
+                audio = temp_recognizer.listen(source, timeout=timeout, phrase_time_limit=speech.phrase_time_limit)
                 
             print("<PROCESS> Processing speech...")
             
-            # Use Google's speech recognition
-            text = temp_recognizer.recognize_google(audio)
+            if self.recorder:
+                self.recorder.add_speech(audio.get_raw_data(convert_rate=16000, convert_width=2))
+            if self.frontend is not None:
+                audio = self._clean_speech(audio)
+            
+            # Google's speech recognition, or a local engine during an outage
+            text = self._recognize(temp_recognizer, audio)
             print(f"<TEXT> You said: '{text}'")
             
             # Resume Porcupine audio stream if it was paused
             if audio_was_paused:
                 print("<RESUME> Resuming audio stream...")
-                time.sleep(0.2)  # Brief delay before resuming
+                self.clock.sleep(0.2)  # Brief delay before resuming
                 self.resume_audio_stream()
             
             return text
@@ -421,7 +860,7 @@ class GERTYSimpleVoice:
             # Resume audio stream if it was paused
             if audio_was_paused:
                 print("<RESUME> Resuming audio stream after timeout...")
-                time.sleep(0.2)
+                self.clock.sleep(0.2)
                 self.resume_audio_stream()
             return None
         except sr.UnknownValueError:
@@ -429,7 +868,7 @@ class GERTYSimpleVoice:
             # Resume audio stream if it was paused
             if audio_was_paused:
                 print("<RESUME> Resuming audio stream after unknown audio...")
-                time.sleep(0.2)
+                self.clock.sleep(0.2)
                 self.resume_audio_stream()
             return None
         except sr.RequestError as e:
@@ -437,53 +876,210 @@ class GERTYSimpleVoice:
             # Resume audio stream if it was paused
             if audio_was_paused:
                 print("<RESUME> Resuming audio stream after error...")
-                time.sleep(0.2)
+                self.clock.sleep(0.2)
                 self.resume_audio_stream()
             return None
             
-    def ask_ai(self, question: str) -> Optional[str]:
-        """Send question to AI and get response"""
+    def _clean_speech(self, audio):
+        """Run a captured utterance through a fresh front end (same settings as the wake word path)"""
+        frontend = AudioFrontEnd(16000, 512, **frontend_kwargs(self.config.frontend))
+        cleaned = frontend.process_buffer(audio.get_raw_data(convert_rate=16000, convert_width=2))
+        return sr.AudioData(cleaned, 16000, 2)
+    
+    def _recognize(self, recognizer, audio):
+        """Transcribe with Google while online, falling back to the local engine"""
+        if not self.is_offline():
+            try:
+                return recognizer.recognize_google(audio)
+            except sr.RequestError as e:
+                print(f"<WARNING> Online speech recognition failed: {e}")
+                if self.connectivity is None:
+                    raise
+                self.connectivity.report_failure()
+        engine = self.config.offline.stt_engine
+        if engine != "sphinx":
+            raise sr.RequestError("offline speech recognition is disabled")
+        print("<OFFLINE> Recognising speech locally...")
+        return recognizer.recognize_sphinx(audio)  # RequestError if pocketsphinx is not installed
+    
+    def setup_tts(self, engine_name=None):
+        """Initialize the offline text-to-speech stage (GERTY_TTS=off disables it)"""
+        if self.tts is not None:
+            return True
+        engine_name = engine_name or self.config.tts.engine
+        if engine_name in ("off", "none"):
+            return False
+        kwargs = {}
+        if engine_name == "piper":
+            kwargs["model"] = self.config.tts.piper_model
         try:
-            print(f"<AI> Asking AI: {question}")
-            
-            payload = {
-                "messages": [{"role": "user", "content": "you are in an embedded machine named GERTY from the movie moon. Please respond concisely, and act like how a human would speak. Imagine that you are talking to Sam Bell. " + question}]
-            }
-            
-            response = requests.post(
-                self.ai_api_url,
-                headers=self.ai_headers,
-                json=payload,
-                timeout=15
-            )
-            
-            if response.status_code == 200:
+            engine = create_engine(engine_name, **kwargs)
+        except Exception as e:
+            print(f"   <WARNING> TTS engine '{engine_name}' unavailable: {e}")
+            return False
+        if engine is None:
+            print("   <INFO> No offline TTS engine found, answers will be shown only")
+            return False
+        self.tts = SpeechPlayer(engine)
+        print(f"   <OK> Text-to-speech ready ({engine.name})")
+        return True
+    
+    def _build_payload(self, question, stream=False):
+        """Chat completion request body for a question (length-limited by the response budget)"""
+        ai = self.config.ai
+        prompt = ai.prompt
+        payload = {}
+        if ai.budget:
+            self.budget.update(display_capacity(self, ai.response_pages), ai.target_latency)
+            prompt += self.budget.instruction()
+            payload["max_tokens"] = self.budget.max_tokens
+        payload["messages"] = [{"role": "user", "content": prompt + question}]
+        if stream:
+            payload["stream"] = True
+        return payload
+    
+    def stream_ai(self, question: str, meta=None):
+        """
+        Yield the AI response in chunks as the server streams it back.
+        meta (a dict) receives finish_reason and completion_tokens when the server sends them
+        """
+        meta = {} if meta is None else meta
+        response = self.http.post(
+            self.ai_api_url,
+            json=self._build_payload(question, stream=True),
+            timeout=(self.config.ai.connect_timeout, self.config.ai.timeout),
+            stream=True
+        )
+        self._ai_stream = response  # closed by _run_cancellable if the request is abandoned
+        try:
+            if response.status_code != 200:
+                raise RuntimeError(f"AI API error: {response.status_code}")
+        
+            # Server ignored "stream" and sent a normal JSON body
+            if "text/event-stream" not in response.headers.get("Content-Type", ""):
                 data = response.json()
-                ai_response = data.get('choices', [{}])[0].get('message', {}).get('content', '')
-                print(f"<AI> AI response: {ai_response}")
+                choice = data.get('choices', [{}])[0]
+                meta["finish_reason"] = choice.get("finish_reason")
+                meta["completion_tokens"] = (data.get("usage") or {}).get("completion_tokens")
+                yield choice.get('message', {}).get('content', '')
+                return
+        
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                data = json.loads(data)
+                if data.get("usage"):
+                    meta["completion_tokens"] = data["usage"].get("completion_tokens")
+                choice = (data.get('choices') or [{}])[0]
+                if choice.get("finish_reason"):
+                    meta["finish_reason"] = choice["finish_reason"]
+                delta = choice.get('delta', {}).get('content')
+                if delta:
+                    yield delta
+        finally:
+            if self._ai_stream is response:
+                self._ai_stream = None
+            response.close()
+    
+    def ask_ai_spoken(self, question: str) -> Optional[str]:
+        """Ask the AI with a streamed response, speaking each sentence as soon as it is complete"""
+        print(f"<AI> Asking AI (streaming): {question}")
+        generation = self.tts.begin()
+        parts = []
+        meta = {}
+        start = time.perf_counter()
+        try:
+            for chunk in self.stream_ai(question, meta):
+                if not self.tts.is_current(generation):
+                    return None  # abandoned: a newer response owns the speaker now
+                if self._interrupted():
+                    self.tts.stop()
+                    return None
+                parts.append(chunk)
+                self.tts.feed(chunk, generation)
+                self.emotions.submit("".join(parts))
+        except Exception as e:
+            if not self.tts.is_current(generation):
+                return None  # stream closed because the request was abandoned
+            print(f"<ERROR> Error streaming from AI: {e}")
+            self._note_ai(False, e)
+            if not parts:
+                if self.is_offline():
+                    return None  # answered locally by the caller
+                # Fall back to a plain request and speak the whole answer
+                ai_response = self.ask_ai(question)
+                if ai_response:
+                    self.tts.feed(ai_response, generation)
+                    self.tts.finish(generation)
                 return ai_response
-            else:
-                print(f"<ERROR> AI API error: {response.status_code}")
-                print(f"Response: {response.text}")
-                return None
-                
+        else:
+            self._note_ai(True)
+        self.tts.finish(generation)
+        ai_response = "".join(parts).strip()
+        self.budget.record(ai_response, time.perf_counter() - start, meta.get("completion_tokens"),
+                           meta.get("finish_reason"))
+        if meta.get("finish_reason") == "length":
+            ai_response = trim_to_sentence(ai_response)  # already spoken up to the cut, shown to the last sentence
+        print(f"<AI> AI response: {ai_response}")
+        return ai_response or None
+    
+    def ask_ai(self, question: str) -> Optional[str]:
+        """Send question to AI and get response"""
+        print(f"<AI> Asking AI: {question}")
+        meta = {}
+        try:
+            ai_response = self.request_ai(question, meta)
         except Exception as e:
             print(f"<ERROR> Error communicating with AI: {e}")
+            self._note_ai(False, e)
+            return None
+        if ai_response is None:
+            self._note_ai(False)
+            return None
+        return self.accept_ai(ai_response, meta)
+    
+    def request_ai(self, question, meta=None):
+        """
+        One plain (not streamed) AI request that records nothing; None on an HTTP error.
+        meta (a dict) receives seconds, finish_reason and completion_tokens for accept_ai()
+        """
+        meta = {} if meta is None else meta
+        start = time.perf_counter()
+        response = self.http.post(
+            self.ai_api_url,
+            json=self._build_payload(question),
+            timeout=(self.config.ai.connect_timeout, self.config.ai.timeout)
+        )
+        if response.status_code != 200:
+            print(f"<ERROR> AI API error: {response.status_code}")
+            print(f"Response: {response.text}")
             return None
+        data = response.json()
+        choice = data.get('choices', [{}])[0]
+        meta["seconds"] = time.perf_counter() - start
+        meta["finish_reason"] = choice.get("finish_reason")
+        meta["completion_tokens"] = (data.get("usage") or {}).get("completion_tokens")
+        return choice.get('message', {}).get('content', '')
+    
+    def accept_ai(self, ai_response, meta):
+        """Record an answer that is going to be used (budget, connectivity, emotion); returns it trimmed"""
+        self.budget.record(ai_response, meta["seconds"], meta.get("completion_tokens"), meta.get("finish_reason"))
+        if meta.get("finish_reason") == "length":
+            ai_response = trim_to_sentence(ai_response)
+        print(f"<AI> AI response: {ai_response}")
+        self._note_ai(True)
+        self.emotions.submit(ai_response)
+        return ai_response
+    
+    def _ask_early(self, question):
+        """Speculative request: (answer, meta) for accept_ai() once the final transcript matches"""
+        meta = {}
+        ai_response = self.request_ai(question, meta)
+        return None if ai_response is None else (ai_response, meta)
             
-    def boot_sequence(self):
-        """Display boot sequence"""
-        print("<SYSTEM> GERTY boot sequence initiated...")
-        boot_path = self.base_path / "boot"
-        boot_images = sorted(glob.glob(str(boot_path / "*.jpg")))
-        
-        for image_path in boot_images:
-            filename = os.path.basename(image_path)
-            print(f"   -> {filename}")
-            if not self.display_image(image_path, 3.0):
-                return False
-        return True
-        
     def voice_interaction_loop(self):
         """Main voice interaction loop with wake word detection"""
         print("<MIC> Voice interaction ready with Porcupine wake word detection!")
@@ -497,47 +1093,321 @@ class GERTYSimpleVoice:
         
         while True:
             # Display idle state - always listening for wake word
-            result = self.display_emotion("neutral", 0.5, "Listening for 'Hey GERTY'...", check_wake_word=True)
+            result = self.wait_idle()
             
             if result == "wake_word" or result == "activate":
                 print("<WAKE> GERTY activated!")
+                self.wake_display()
+                if result == "activate":
+                    self._mark("wake", keyword="SPACE")
                 
                 # DON'T pause wake word detection - keep microphone always on
                 # Just set a flag to prevent multiple activations
                 self.is_processing = True
                 
-                # Voice interaction activated
-                self.display_emotion("listening", 1.0, "Listening...")
-                
-                # Listen for user's question
-                question = self.listen_for_speech()
-                
-                if question:
-                    # Show thinking state
-                    self.display_emotion("thinking", 2.0, "Let me think about that...")
-                    
-                    # Get AI response
-                    ai_response = self.ask_ai(question)
-                    
-                    if ai_response:
-                        # Display the response
-                        print(f"<SPEAK> GERTY says: {ai_response}")
-                        self.display_emotion("happy", 5.0, ai_response)
-                    else:
-                        self.display_emotion("sad", 3.0, "Sorry, I couldn't get a response")
-                else:
-                    self.display_emotion("confused", 3.0, "Sorry, I didn't hear anything")
+                if self.handle_interaction() is False:
+                    break
                 
                 # Reset processing flag - wake word detection continues automatically
                 self.is_processing = False
+                self.idle.touch()
                 print("<LISTEN> Ready for next wake word...")
                 
                 # Small delay to ensure speech recognition resources are properly released
-                time.sleep(0.3)
+                self.clock.sleep(0.3)
+                    
+            elif result == "api":
+                if self.handle_api_command(self.api.next_command()) is False:
+                    break
+                    
+            elif result in ("barge_in", "stop"):
+                # Stray request with no interaction running: drop it
+                self.stop_requested = False
+                self.barge_in.clear()
                     
             elif result == False:  # ESC or Q pressed
                 break
     
+    def handle_api_command(self, command):
+        """Run one queued control API command on the UI thread; returns like handle_interaction"""
+        if command is None:
+            return True
+        name = command["command"]
+        self._mark("api", command=name)
+        self.wake_display()
+        self.is_processing = True
+        try:
+            if name == "ask":
+                return self.handle_interaction(question=str(command["text"]).strip())
+            if name == "emotion":
+                return self.display_emotion(str(command["emotion"]), float(command.get("seconds", self.display_time)),
+                                            command.get("text"), check_wake_word=True)
+            if name == "sequence":
+                images = self.assets.images(str(command.get("folder", "boot")))
+                return play_images(self, images, float(command.get("seconds", self.boot_duration)))
+        except (TypeError, ValueError) as e:
+            print(f"<API> Bad {name} command: {e}")
+        finally:
+            # A wake word or STOP during the command has nothing left to interrupt
+            self.stop_requested = False
+            self.barge_in.clear()
+            self.is_processing = False
+            self.idle.touch()
+        return True
+    
+    def wait_idle(self):
+        """
+        One idle period between interactions. The face is drawn only when the
+        idle state (or status badge) changes, and keys are polled at
+        display.idle_poll_ms. Returns like display_image
+        """
+        display = self.config.display
+        if not display.power_save:
+            return self.display_emotion("neutral", display.idle_refresh, IDLE_TEXT, check_wake_word=True)
+        self.idle.dim_after, self.idle.sleep_after = display.dim_after, display.sleep_after
+        state = self.idle.state
+        if (state, self.status_text) != self._idle_view:
+            self._show_idle(state)
+            self._idle_view = (state, self.status_text)
+        return self.wait(display.idle_refresh, lambda key: self._idle_key(key, state), poll_ms=display.idle_poll_ms)
+    
+    def _idle_key(self, key, state):
+        result = self._poll_controls(key, check_wake_word=True)
+        if state == ASLEEP and result == "activate":
+            return None  # only the wake word wakes a sleeping GERTY
+        return result
+    
+    def _show_idle(self, state):
+        display = self.config.display
+        level = 1.0
+        if state == ASLEEP:
+            print("<IDLE> Display asleep until the wake word")
+            self.show_blank()
+            level = 0.0
+        else:
+            img = self.compose(self.assets.emotion_image("neutral"), IDLE_TEXT)
+            if img is None:
+                return
+            if state == DIM:
+                level = display.dim_level
+                img = self.dimmed(img, level)
+            self.show_frame(img)
+        self._set_backlight(level)
+    
+    def wake_display(self):
+        """Back to full brightness for an interaction"""
+        self.idle.wake()
+        self._idle_view = None
+        self._set_backlight(1.0)
+    
+    def _set_backlight(self, level):
+        """Dim the backlight, giving up on it (rather than the voice loop) if the write fails"""
+        if not self.backlight:
+            return
+        try:
+            self.backlight.set_level(level)
+        except OSError as e:
+            print(f"<WARNING> Backlight {self.backlight.path} disabled: {e}")
+            self.backlight = None
+    
+    def handle_interaction(self, question=None):
+        """
+        Run one listen -> think -> answer interaction.
+        A wake word during the interaction (barge-in) cancels the current stage
+        and starts a fresh capture straight away, without the "Listening..."
+        screen. question (from the control API) replaces listening on the
+        first pass.
+        Returns False to exit, "stop" if a stop keyword cut it short, True otherwise
+        """
+        self.stop_requested = False
+        self.barge_in.clear()
+        restart = False
+        try:
+            while True:
+                result = self._interaction_pass(question, restart)
+                question = None
+                if self.tts and (result is False or result in ("stop", "barge_in")):
+                    self.tts.stop()
+                if result != "barge_in":
+                    return result
+                restart = True
+                self.barge_in.clear()
+        finally:
+            self.stop_requested = False
+            self.barge_in.clear()
+            self._mark("idle")
+    
+    def _interaction_pass(self, question=None, barge_in=False):
+        """Single pass through the interaction stages, returning early when interrupted"""
+        durations = self.config.display
+        
+        if question is None:
+            # Voice interaction activated
+            self._mark("listening")
+            if not barge_in:
+                result = self.display_emotion("listening", durations.listening_duration, "Listening...")
+                if result is False or result in ("stop", "barge_in"):
+                    return result
+            
+            # Listen for user's question (after a barge-in, straight away)
+            question = self.listen_for_speech(on_capture=self._finish_barge_in if barge_in else None)
+        self._mark("question", text=question)
+        interrupted = self._interrupted()
+        if interrupted:
+            return interrupted
+        
+        if question:
+            self.questions_heard += 1
+            result = self.answer_intent(question)
+            if result is not None:
+                return result
+            
+            if self.is_offline():
+                # Known outage: answer locally straight away instead of waiting out a timeout
+                ai_response = self.answer_offline(question)
+                self._mark("answer", text=ai_response, source="offline")
+            else:
+                speculation = self.speculator.finish(question)
+                if speculation is not None:
+                    # Already asked while the question was being finished: no thinking pause.
+                    # That request was not streamed (it may be dropped before the user stops
+                    # talking), so the answer is fed to the speaker sentence by sentence now
+                    self._mark("ai_request", text=question, speculative=True)
+                    reply = self._run_cancellable(speculation.result)
+                    ai_response = self.accept_ai(*reply) if reply and not self._interrupted() else None
+                    if ai_response and self.tts:
+                        generation = self.tts.begin()
+                        self.tts.feed(ai_response, generation)
+                        self.tts.finish(generation)
+                    elif not ai_response and not self._interrupted() and not self.is_offline():
+                        print("<SPECULATE> Early request failed, asking again")
+                        speculation = None
+                if speculation is None:
+                    # Show thinking state
+                    result = self.display_emotion("thinking", durations.thinking_duration,
+                                                  "Let me think about that...")
+                    if result is False or result in ("stop", "barge_in"):
+                        return result
+                    
+                    # Get AI response (abandoned if interrupted while waiting)
+                    self._mark("ai_request", text=question)
+                    ask = self.ask_ai_spoken if self.tts else self.ask_ai
+                    ai_response = self._run_cancellable(ask, question)
+                interrupted = self._interrupted()
+                if interrupted:
+                    return interrupted
+                if ai_response and self.offline:
+                    self.offline.cache.put(question, ai_response)
+                elif not ai_response and self.is_offline():
+                    ai_response = self.answer_offline(question)  # this request ran into the outage
+                self._mark("answer", text=ai_response)
+            
+            if ai_response:
+                # Display the response with a matching face, keeping it up while it is being spoken
+                emotion = self.emotions.emotion_for(ai_response)
+                print(f"<SPEAK> GERTY says ({emotion}): {ai_response}")
+                return self.show_answer(emotion, ai_response)
+            return self.display_emotion("sad", durations.error_duration, "Sorry, I couldn't get a response")
+        return self.display_emotion("confused", durations.error_duration, "Sorry, I didn't hear anything")
+    
+    def show_answer(self, emotion, text):
+        """Show an answer page by page (answer_duration each), holding the last page while it is spoken"""
+        durations = self.config.display
+        result = True
+        for page in self.text_pages(text)[:max(self.config.ai.response_pages, 1)]:
+            result = self.display_emotion(emotion, durations.answer_duration, page)
+            if result is not True:
+                return result
+        while result is True and self.tts and self.tts.is_speaking():
+            result = self.display_emotion(emotion, durations.idle_refresh, page)
+        return result
+    
+    def _interrupted(self):
+        """Return "stop" or "barge_in" if the current stage should be abandoned"""
+        if self.stop_requested:
+            return "stop"
+        if self.barge_in.is_set():
+            return "barge_in"
+        return None
+    
+    def _run_cancellable(self, func, *args):
+        """Run a blocking call in a worker thread, giving up as soon as we are interrupted"""
+        outcome = {}
+        done = threading.Event()
+        
+        def worker():
+            try:
+                outcome["value"] = func(*args)
+            finally:
+                done.set()
+        
+        threading.Thread(target=worker, daemon=True).start()
+        while not done.wait(0.02):
+            if self.supervisor:
+                self.supervisor.beat("ui")
+            if self._interrupted():
+                print(f"<CANCEL> Abandoning {func.__name__}()")
+                if self.tts:
+                    self.tts.stop()  # anything the worker still feeds is now stale
+                stream, self._ai_stream = self._ai_stream, None
+                if stream is not None:
+                    stream.close()  # stop downloading an answer nobody will hear
+                return None
+        return outcome.get("value")
+    
+    def _request_barge_in(self):
+        """Called from the wake word thread when the wake word fires mid-interaction"""
+        if not self.barge_in.is_set():
+            self._mark("barge_in")
+            self.barge_in_time = time.perf_counter()
+            self.barge_in.set()
+    
+    def _finish_barge_in(self):
+        """Record how long it took from the barge-in wake word until the new capture started"""
+        latency_ms = (time.perf_counter() - self.barge_in_time) * 1000
+        self.barge_in_latencies.append(latency_ms)
+        budget_ms = self.barge_in_budget * 1000
+        if latency_ms > budget_ms:
+            print(f"<WARNING> Barge-in took {latency_ms:.0f} ms (budget {budget_ms:.0f} ms)")
+        else:
+            print(f"<WAKE> Barge-in: capturing again after {latency_ms:.0f} ms")
+    
+    def get_barge_in_stats(self):
+        """Summary of measured barge-in cancellation latencies (ms)"""
+        latencies = list(self.barge_in_latencies)
+        if not latencies:
+            return {"count": 0}
+        return {
+            "count": len(latencies),
+            "mean_ms": sum(latencies) / len(latencies),
+            "max_ms": max(latencies),
+            "over_budget": sum(1 for l in latencies if l > self.barge_in_budget * 1000),
+        }
+    
+    def get_state(self):
+        """What GERTY is doing right now (served by the control API)"""
+        return {
+            "processing": self.is_processing,
+            "idle": self.idle.state,
+            "offline": self.is_offline(),
+            "listening_for_wake_word": self.listening_for_wake_word,
+            "last_question": self.last_question,
+            "last_answer": self.last_answer,
+        }
+    
+    def get_stats(self):
+        """All runtime counters in one place"""
+        stats = {
+            "audio": self.get_audio_stats(),
+            "barge_in": self.get_barge_in_stats(),
+            "intents": self.get_intent_stats(),
+            "speculation": self.speculator.stats(),
+            "budget": self.budget.stats(),
+        }
+        if self.supervisor:
+            stats["supervisor"] = self.supervisor.status()
+        return stats
+    
     def keyboard_interaction_loop(self):
         """Fallback interaction loop using keyboard activation"""
         print("<MIC> Voice interaction ready (keyboard mode)!")
@@ -545,41 +1415,33 @@ class GERTYSimpleVoice:
         print("   Press ESC or Q to exit")
         
         while True:
-            # Display idle state with instructions
-            result = self.display_emotion("neutral", 0.5, "Press SPACE to talk to me!")
+            # Display idle state with instructions (no wake words here, but API commands still arrive)
+            result = self.display_emotion("neutral", self.config.display.idle_refresh, "Press SPACE to talk to me!",
+                                          check_wake_word=True)
             
             if result == "activate":
-                # Voice interaction activated
-                self.display_emotion("listening", 1.0, "Listening...")
-                
-                # Listen for user's question
-                question = self.listen_for_speech()
-                
-                if question:
-                    # Show thinking state
-                    self.display_emotion("thinking", 2.0, "Let me think about that...")
-                    
-                    # Get AI response
-                    ai_response = self.ask_ai(question)
+                if self.handle_interaction() is False:
+                    break
                     
-                    if ai_response:
-                        # Display the response
-                        print(f"<SPEAK> GERTY says: {ai_response}")
-                        self.display_emotion("happy", 5.0, ai_response)
-                    else:
-                        self.display_emotion("sad", 3.0, "Sorry, I couldn't get a response")
-                else:
-                    self.display_emotion("confused", 3.0, "Sorry, I didn't hear anything")
+            elif result == "api":
+                if self.handle_api_command(self.api.next_command()) is False:
+                    break
                     
             elif result == False:  # ESC or Q pressed
                 break
                 
     def pause_audio_stream(self):
         """Temporarily pause the audio stream without cleaning up Porcupine"""
+        if self.audio_process:
+            self.audio_process.set_paused(True)
+            self.audio_paused = True
+            return True
         try:
             if hasattr(self, 'audio_stream') and self.audio_stream:
                 if self.audio_stream.is_active():
+                    self.audio_paused = True
                     self.audio_stream.stop_stream()
+                    self.audio_buffer.clear()
                     print("   <PAUSE> Audio stream paused")
                     return True
         except Exception as e:
@@ -588,40 +1450,67 @@ class GERTYSimpleVoice:
     
     def resume_audio_stream(self):
         """Resume the paused audio stream"""
+        if self.audio_process:
+            self.audio_process.set_paused(False)
+            self.audio_paused = False
+            return True
         try:
             if hasattr(self, 'audio_stream') and self.audio_stream:
                 if not self.audio_stream.is_active():
                     self.audio_stream.start_stream()
+                    self.audio_paused = False
                     print("   <RESUME> Audio stream resumed")
                     return True
         except Exception as e:
             print(f"   <WARNING> Audio stream resume error: {e}")
         return False
 
-    def run(self):
-        """Main execution"""
+    def run(self, startup_profile=False):
+        """Main execution (startup_profile prints the import/init breakdown once ready)"""
         print("=" * 60)
         print("<SYSTEM> GERTY Simple Voice Assistant with Wake Word Detection")
         print("   Wake word activation + SPACE backup, ESC/Q to exit")
         print("=" * 60)
         
         try:
-            self.setup_display()
-            self.setup_voice()
+            if self.config.profiler.enabled:
+                self.profiler.start()
+            if self.connectivity:
+                self.connectivity.start()  # first probe runs alongside the setup below
+            # Window and first boot image before the slow audio/speech setup
+            with STARTUP.phase("display"):
+                self.setup_display()
+                self.show_splash()
+            with STARTUP.phase("voice"):
+                self.setup_voice()
             
             # Setup Porcupine wake word detection
-            porcupine_success = self.setup_porcupine()
+            with STARTUP.phase("wake word"):
+                porcupine_success = self.setup_porcupine()
+            with STARTUP.phase("tts"):
+                self.setup_tts()
+            if self.config.supervisor.enabled:
+                self.start_supervisor()
+            if self.config.api.enabled:
+                api = self.config.api
+                self.api = ControlAPI(self, api.host, api.port, api.token, api.max_clients)
+                if not self.api.start():
+                    self.api = None
+            STARTUP.mark("ready")
+            if startup_profile:
+                STARTUP.report()
             
             # Boot sequence
             if not self.boot_sequence():
                 return
                 
-            time.sleep(1)
+            self.clock.sleep(1)
             
             # Test AI connection
             print("<TEST> Testing AI connection...")
-            test_response = self.ask_ai("Hello! Just testing the connection.")
-            if test_response:
+            if self.is_offline():
+                print("<WARNING> Network unreachable - starting with offline answers")
+            elif self.ask_ai("Hello! Just testing the connection."):
                 print("<OK> AI connection successful!")
             else:
                 print("<WARNING> AI connection failed - continuing anyway")
@@ -637,8 +1526,31 @@ class GERTYSimpleVoice:
             traceback.print_exc()
         finally:
             # Clean up resources
+            if self.supervisor:
+                self.supervisor.stop()
+                print(f"<SUPERVISOR> {self.supervisor.status()}")
+            if self.connectivity:
+                self.connectivity.stop()
+            if self.api:
+                self.api.stop()
+            if self.questions_heard:
+                stats = self.get_intent_stats()
+                print(f"<INTENT> {stats['local']}/{stats['questions']} questions answered locally "
+                      f"({stats['local_share']:.0%}) {stats['by_intent']}")
+            if self.speculator.fired:
+                stats = self.speculator.stats()
+                print(f"<SPECULATE> {stats['hits']}/{stats['fired']} early requests used, "
+                      f"{stats['wasted']} wasted ({stats['wasted_rate']:.0%})")
+            if self.budget.requests:
+                stats = self.budget.stats()
+                print(f"<BUDGET> {stats['requests']} AI answers, {stats['mean_tokens']} tokens / "
+                      f"{stats['mean_seconds']:.2f}s mean, cap {stats['max_tokens']} tokens, "
+                      f"{stats['truncated']} cut short")
             self.cleanup_porcupine()
-            cv2.destroyAllWindows()
+            if self.tts:
+                self.tts.close()
+            self.profiler.stop()
+            self.ui.destroyAllWindows()
             print("<OFFLINE> GERTY Simple Voice Assistant Offline")
 
 
@@ -651,14 +1563,31 @@ def main():
         print("  Wake Word - Say 'Hey GERTY' to activate voice assistant")
         print("  SPACE - Manual activation (backup)")
         print("  ESC or Q - Exit")
+        print("  P - Start/stop the sampling profiler (or send SIGUSR1)")
+        print("Options:")
+        print("  --startup-profile - Print import and init times up to the first frame")
+        print("  --supervise - Watchdog that restarts audio, the window or the HTTP pool in place")
+        print("  --audio-process - Capture and detect the wake word in a separate process")
+        print("  --api - Local HTTP/WebSocket control API (see gerty_api.py)")
+        print("\nConfiguration:")
+        print("  gerty_config.json (or $GERTY_CONFIG) plus GERTY_<SECTION>_<FIELD> overrides")
+        print("  e.g. GERTY_TTS_ENGINE=auto|espeak|piper|off, GERTY_AI_TIMEOUT=10")
+        print("  Send SIGHUP to reload timings and AI settings without restarting")
         print("\nFeatures:")
         print("  - Always-on microphone listening for wake word")
         print("  - Continuous wake word detection (never pauses)")
         print("  - Clean Porcupine implementation")
         return
         
-    gerty = GERTYSimpleVoice()
-    gerty.run()
+    with STARTUP.phase("construct"):
+        gerty = GERTYSimpleVoice()
+    if "--supervise" in sys.argv[1:]:
+        gerty.config.supervisor.enabled = True
+    if "--audio-process" in sys.argv[1:]:
+        gerty.config.wake.audio_process = True
+    if "--api" in sys.argv[1:]:
+        gerty.config.api.enabled = True
+    gerty.run(startup_profile="--startup-profile" in sys.argv[1:])
 
 
 if __name__ == "__main__":
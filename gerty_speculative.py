@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+GERTY speculative AI requests
+A streaming recogniser knows the question well before it declares the
+utterance over (it still has to hear the end-of-speech pause). Once the
+partial transcript has stayed the same for a short window, SpeculativeAsker
+sends it to the AI in the background. If the final transcript matches, the
+answer is already on its way; if the partial changes or the final differs,
+the speculative request is abandoned and counted as wasted.
+
+Speech inputs opt in by setting ``supports_partials = True`` and accepting
+``listen(timeout, on_partial=callback)``. The SpeechRecognition microphone
+path has no partial results, so it keeps asking after the final transcript.
+
+    python gerty_speculative.py --measure   # latency saved / waste vs a local stub AI
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+
+from gerty_intents import normalize_question
+
+
+class Speculation:
+    """One background AI request for a partial transcript"""
+
+    def __init__(self, text, started):
+        self.text = text
+        self.key = normalize_question(text)
+        self.started = started
+        self.value = None
+        self.abandoned = False
+        self.done = threading.Event()
+
+    def result(self, timeout=None):
+        """What ask() returned (None on error), waiting up to timeout seconds"""
+        self.done.wait(timeout)
+        return self.value
+
+
+class SpeculativeAsker:
+    """
+    Fires ask(text) once a partial transcript has been unchanged for
+    stable_for seconds. Recognisers repeat the current hypothesis while they
+    wait for the end of speech, which is what drives the stability check.
+    """
+
+    def __init__(self, ask, stable_for=0.3, min_words=2, clock=time.monotonic, should_ask=None):
+        self.ask = ask
+        self.stable_for = stable_for
+        self.min_words = min_words
+        self.clock = clock
+        self.should_ask = should_ask  # should_ask(text) -> False to leave this partial alone
+        self.current = None
+        self._partial = None
+        self._since = 0.0
+        self.utterances = 0
+        self.fired = 0
+        self.hits = 0
+        self.wasted = 0
+
+    def begin(self):
+        """Start of a new utterance"""
+        self.cancel()
+        self._partial = None
+        self.utterances += 1
+
+    def on_partial(self, text):
+        """Partial transcript from the recogniser (may repeat the previous one)"""
+        key = normalize_question(text or "")
+        now = self.clock()
+        if key != self._partial:
+            self._partial, self._since = key, now
+            if self.current is not None and self.current.key != key:
+                self.cancel()  # the hypothesis moved on
+            return
+        if self.current is not None or len(key.split()) < self.min_words or now - self._since < self.stable_for:
+            return
+        if self.should_ask is not None and not self.should_ask(text):
+            return
+        self._fire(text, now)
+
+    def _fire(self, text, now):
+        speculation = self.current = Speculation(text, now)
+        self.fired += 1
+
+        def worker():
+            try:
+                speculation.value = self.ask(text)
+            except Exception as e:
+                print(f"<SPECULATE> Request failed: {e}")
+            finally:
+                speculation.done.set()
+
+        print(f"<SPECULATE> Asking early: {text}")
+        threading.Thread(target=worker, name="speculate", daemon=True).start()
+
+    def finish(self, final_text):
+        """The Speculation to use for the final transcript, or None to ask afresh"""
+        speculation = self.current
+        if speculation is None:
+            return None
+        if final_text and normalize_question(final_text) == speculation.key:
+            self.current = None
+            self.hits += 1
+            return speculation
+        self.cancel()
+        return None
+
+    def cancel(self):
+        """Abandon the request in flight (its answer is ignored)"""
+        if self.current is not None:
+            self.current.abandoned = True
+            self.wasted += 1
+            print(f"<SPECULATE> Dropping early request: {self.current.text}")
+            self.current = None
+
+    def stats(self):
+        return {
+            "utterances": self.utterances,
+            "fired": self.fired,
+            "hits": self.hits,
+            "wasted": self.wasted,
+            "wasted_rate": self.wasted / self.fired if self.fired else 0.0,
+            "hit_rate": self.hits / self.utterances if self.utterances else 0.0,
+        }
+
+
+# Recogniser hypotheses in order (one per word time) and the final transcript.
+# Includes mid-utterance revisions and finals that differ from the last partial.
+MEASURE_UTTERANCES = [
+    (["tell", "tell me", "tell me about", "tell me about the moon"], "tell me about the moon"),
+    (["what", "what is", "what is the whether", "what is the weather like", "what is the weather like today"],
+     "what is the weather like today"),
+    (["how far", "how far is", "how far is earth"], "how far is earth"),
+    (["who", "who are", "who are you"], "who are you"),
+    (["can you", "can you tell", "can you tell me a joke", "can you tell me a joke about rocks"],
+     "can you tell me a joke about rockets"),
+    (["why", "why is", "why is the sky", "why is the sky black"], "why is the sky black"),
+    (["open", "open the pod", "open the pod bay doors"], "open the pod bay doors"),
+    (["play", "play some", "play some music from", "play some music from earth"], "play some music from earth"),
+]
+
+
+def _speak(hypotheses, final, on_partial, word_time, endpoint, interval):
+    """Replay hypotheses in real time, then the end-of-speech wait; returns the final transcript"""
+    for text in hypotheses:
+        deadline = time.perf_counter() + word_time
+        while time.perf_counter() < deadline:
+            on_partial(text)
+            time.sleep(interval)
+    deadline = time.perf_counter() + endpoint
+    while time.perf_counter() < deadline:
+        on_partial(hypotheses[-1])
+        time.sleep(interval)
+    return final
+
+
+def measure(latency=0.6, word_time=0.25, endpoint=0.7, stable_for=0.3, interval=0.05):
+    """End-of-speech -> answer latency with and without speculation against the stub AI"""
+    import requests
+    from gerty_sim import StubAIServer
+
+    results = []
+    with StubAIServer(default_answer="Sure, Sam.", default_latency=latency) as server:
+        session = requests.Session()
+
+        def ask(text):
+            response = session.post(server.url, json={"messages": [{"role": "user", "content": text}]}, timeout=10)
+            return response.json()["choices"][0]["message"]["content"]
+
+        def timed(text, out):
+            ask(text)
+            out.append(time.perf_counter())
+
+        speculator = SpeculativeAsker(ask, stable_for=stable_for, clock=time.perf_counter)
+        for hypotheses, final in MEASURE_UTTERANCES:
+            speculator.begin()
+            final = _speak(hypotheses, final, speculator.on_partial, word_time, endpoint, interval)
+            final_at = time.perf_counter()
+            baseline_done = []
+            baseline = threading.Thread(target=timed, args=(final, baseline_done))
+            baseline.start()
+            speculation = speculator.finish(final)
+            if speculation is not None:
+                speculation.result(timeout=10)
+            else:
+                ask(final)
+            speculative_ms = (time.perf_counter() - final_at) * 1000
+            baseline.join()
+            baseline_ms = (baseline_done[0] - final_at) * 1000
+            results.append({"question": final, "hit": speculation is not None,
+                            "baseline_ms": round(baseline_ms, 1), "speculative_ms": round(speculative_ms, 1)})
+        requests_sent = len(server.requests)
+
+    stats = speculator.stats()
+    saved = [r["baseline_ms"] - r["speculative_ms"] for r in results]
+    stats.update({
+        "mean_saved_ms": round(statistics.mean(saved), 1),
+        "mean_baseline_ms": round(statistics.mean(r["baseline_ms"] for r in results), 1),
+        "mean_speculative_ms": round(statistics.mean(r["speculative_ms"] for r in results), 1),
+        "extra_requests_per_utterance": round(stats["wasted"] / len(results), 2),
+        "stub_requests": requests_sent,
+        "utterances_detail": results,
+    })
+    return stats
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="GERTY speculative AI request tools")
+    parser.add_argument("--measure", action="store_true", help="Measure latency saved and wasted requests")
+    parser.add_argument("--latency", type=float, default=0.6, help="Stub AI response time in seconds")
+    parser.add_argument("--endpoint", type=float, default=0.7,
+                        help="Silence the recogniser waits for before the final transcript")
+    parser.add_argument("--stable-for", type=float, default=0.3, help="Partial stability window in seconds")
+    parser.add_argument("--json", help="Write the results to this JSON file")
+    args = parser.parse_args(argv)
+    if not args.measure:
+        parser.print_help()
+        return 0
+
+    print(f"<SPECULATE> {len(MEASURE_UTTERANCES)} utterances, stub latency {args.latency * 1000:.0f} ms, "
+          f"end-of-speech wait {args.endpoint * 1000:.0f} ms, stable after {args.stable_for * 1000:.0f} ms")
+    results = measure(args.latency, endpoint=args.endpoint, stable_for=args.stable_for)
+    print(f"   {'question':<40} {'hit':>4} {'baseline':>9} {'speculative':>12}")
+    for r in results["utterances_detail"]:
+        print(f"   {r['question']:<40} {'yes' if r['hit'] else 'no':>4} {r['baseline_ms']:>7.0f}ms "
+              f"{r['speculative_ms']:>10.0f}ms")
+    print(f"   mean saved {results['mean_saved_ms']:.0f} ms per question "
+          f"({results['mean_baseline_ms']:.0f} -> {results['mean_speculative_ms']:.0f} ms after end of speech)")
+    print(f"   {results['fired']} speculative requests, {results['hits']} used, {results['wasted']} wasted "
+          f"({results['wasted_rate']:.0%}), {results['extra_requests_per_utterance']} extra requests per question")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+GERTY supervisor
+Watchdog for the assistant's long-running parts (audio capture, UI loop,
+AI networking). Each component sends heartbeats and/or exposes a health
+check; when one goes quiet or reports a fault only that component is
+restarted, so the process keeps its image cache, config and HTTP pool and
+never replays the boot sequence.
+
+A component that keeps failing (max_restarts within restart_window
+seconds) is given up on and handed to on_give_up.
+"""
+
+import threading
+import time
+from collections import deque
+
+EXIT_RESTART = 75  # exit status asking the service manager for a cold restart
+
+
+class Component:
+    """One supervised part: how to restart it and how to tell it is unhealthy"""
+
+    def __init__(self, name, restart, heartbeat_timeout=None, check=None, critical=False, limit=True):
+        self.name = name
+        self.restart = restart
+        self.heartbeat_timeout = heartbeat_timeout  # None = no heartbeat expected
+        self.check = check                          # callable -> reason string when unhealthy, else None
+        self.critical = critical                    # process cannot run without it
+        self.limit = limit                          # give up after max_restarts in restart_window
+        self.last_beat = None
+        self.restarts = deque()
+        self.total_restarts = 0
+        self.last_fault = None
+        self.failed = False
+
+
+class Supervisor:
+    """Background watchdog thread restarting components that miss heartbeats or fail checks"""
+
+    def __init__(self, clock=time.monotonic, check_interval=0.5, max_restarts=5, restart_window=300.0,
+                 on_give_up=None):
+        self.clock = clock
+        self.check_interval = check_interval
+        self.max_restarts = max_restarts
+        self.restart_window = restart_window
+        self.on_give_up = on_give_up
+        self.components = {}
+        self._running = threading.Event()
+        self._thread = None
+
+    def add(self, name, restart, heartbeat_timeout=None, check=None, critical=False, limit=True):
+        component = Component(name, restart, heartbeat_timeout, check, critical, limit)
+        component.last_beat = self.clock()
+        self.components[name] = component
+        return component
+
+    def beat(self, name):
+        """Heartbeat from a component (cheap enough to call every frame)"""
+        component = self.components.get(name)
+        if component is not None:
+            component.last_beat = self.clock()
+
+    def start(self):
+        if self._running.is_set():
+            return
+        now = self.clock()
+        for component in self.components.values():
+            component.last_beat = now
+        self._running.set()
+        self._thread = threading.Thread(target=self._run, name="supervisor", daemon=True)
+        self._thread.start()
+        print(f"<SUPERVISOR> Watching {', '.join(self.components)}")
+
+    def stop(self):
+        self._running.clear()
+        if self._thread:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def _run(self):
+        while self._running.is_set():
+            self.check_once()
+            time.sleep(self.check_interval)
+
+    def _fault(self, component, now):
+        if component.heartbeat_timeout is not None and now - component.last_beat > component.heartbeat_timeout:
+            return f"no heartbeat for {now - component.last_beat:.1f}s"
+        if component.check is not None:
+            try:
+                return component.check()
+            except Exception as e:
+                return f"health check raised {e!r}"
+        return None
+
+    def check_once(self):
+        """Check every component once; returns the names restarted"""
+        restarted = []
+        for component in list(self.components.values()):
+            if component.failed:
+                continue
+            now = self.clock()
+            reason = self._fault(component, now)
+            if reason is None:
+                continue
+            component.last_fault = reason
+            while component.restarts and now - component.restarts[0] > self.restart_window:
+                component.restarts.popleft()
+            if component.limit and len(component.restarts) >= self.max_restarts:
+                component.failed = True
+                print(f"<SUPERVISOR> Giving up on {component.name} after {len(component.restarts)} "
+                      f"restarts in {self.restart_window:.0f}s ({reason})")
+                if self.on_give_up:
+                    self.on_give_up(component)
+                continue
+            print(f"<SUPERVISOR> Restarting {component.name}: {reason}")
+            component.restarts.append(now)
+            component.total_restarts += 1
+            try:
+                component.restart()
+            except Exception as e:
+                print(f"<SUPERVISOR> Restart of {component.name} failed: {e}")
+            component.last_beat = self.clock()
+            restarted.append(component.name)
+        return restarted
+
+    def status(self):
+        """{component: {restarts, last_fault, failed, since_beat}} for diagnostics"""
+        now = self.clock()
+        return {
+            name: {
+                "restarts": component.total_restarts,
+                "last_fault": component.last_fault,
+                "failed": component.failed,
+                "since_beat": round(now - component.last_beat, 3),
+            }
+            for name, component in self.components.items()
+        }
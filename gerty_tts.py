@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+GERTY text-to-speech output stage
+Sentence-level streaming: text is split into sentences as tokens arrive,
+synthesised by an offline engine on one thread and played on another, so the
+first sentence is heard while the rest of the answer is still generating.
+Includes an echo gate so our own playback doesn't trigger (or deafen) the
+wake word detector.
+"""
+
+import io
+import queue
+import re
+import shutil
+import subprocess
+import threading
+import time
+import wave
+
+from gerty.startup import LazyModule
+
+np = LazyModule("numpy")
+
+SENTENCE_END = re.compile(r"(?<=[.!?;:])\s+|\n+")
+
+
+class SentenceSplitter:
+    """Accumulates streamed text and hands back complete sentences"""
+
+    def __init__(self, min_chars=12):
+        self.min_chars = min_chars  # avoid synthesising tiny fragments like "Hi."
+        self._buffer = ""
+
+    def feed(self, text):
+        """Add streamed text, returning any sentences that are now complete"""
+        self._buffer += text
+        parts = SENTENCE_END.split(self._buffer)
+        sentences = []
+        pending = ""
+        for part in parts[:-1]:
+            pending = f"{pending} {part}".strip() if pending else part.strip()
+            if len(pending) >= self.min_chars:
+                sentences.append(pending)
+                pending = ""
+        tail = parts[-1]
+        self._buffer = f"{pending} {tail}" if pending else tail
+        return sentences
+
+    def flush(self):
+        """Return whatever is left once the stream has ended"""
+        rest = self._buffer.strip()
+        self._buffer = ""
+        return [rest] if rest else []
+
+
+class TTSEngine:
+    """Base class for offline speech engines. synthesize() returns 16-bit mono PCM bytes"""
+
+    name = "base"
+    sample_rate = 16000
+
+    def synthesize(self, text):
+        raise NotImplementedError
+
+
+class EspeakEngine(TTSEngine):
+    """espeak-ng (or espeak) via subprocess - small, fast and available on Raspberry Pi OS"""
+
+    name = "espeak"
+
+    def __init__(self, voice="en", rate=165, binary=None):
+        self.voice = voice
+        self.rate = rate
+        self.binary = binary or shutil.which("espeak-ng") or shutil.which("espeak")
+        if not self.binary:
+            raise RuntimeError("espeak-ng/espeak not found on PATH")
+        self.sample_rate = 22050
+
+    def synthesize(self, text):
+        wav_bytes = subprocess.run(
+            [self.binary, "--stdout", "-v", self.voice, "-s", str(self.rate), text],
+            check=True, capture_output=True, timeout=30
+        ).stdout
+        with wave.open(io.BytesIO(wav_bytes), "rb") as wav:
+            self.sample_rate = wav.getframerate()
+            return wav.readframes(wav.getnframes())
+
+
+class PiperEngine(TTSEngine):
+    """Piper neural TTS via its CLI (raw output mode), for a more natural voice"""
+
+    name = "piper"
+
+    def __init__(self, model, sample_rate=22050, binary=None):
+        self.model = model
+        self.sample_rate = sample_rate
+        self.binary = binary or shutil.which("piper")
+        if not self.binary:
+            raise RuntimeError("piper not found on PATH")
+
+    def synthesize(self, text):
+        return subprocess.run(
+            [self.binary, "--model", self.model, "--output_raw"],
+            input=text.encode("utf-8"), check=True, capture_output=True, timeout=30
+        ).stdout
+
+
+class SilentEngine(TTSEngine):
+    """Produces silence of a plausible speaking length - for simulation and headless runs"""
+
+    name = "silent"
+
+    def __init__(self, seconds_per_char=0.06):
+        self.seconds_per_char = seconds_per_char
+
+    def synthesize(self, text):
+        return b"\x00\x00" * int(len(text) * self.seconds_per_char * self.sample_rate)
+
+
+def create_engine(name="auto", **kwargs):
+    """Create a TTS engine by name ("auto" picks the first offline engine available)"""
+    if name == "auto":
+        if shutil.which("espeak-ng") or shutil.which("espeak"):
+            return EspeakEngine(**kwargs)
+        return None
+    engines = {"espeak": EspeakEngine, "piper": PiperEngine, "silent": SilentEngine}
+    if name not in engines:
+        raise ValueError(f"Unknown TTS engine '{name}' (expected one of {sorted(engines)})")
+    return engines[name](**kwargs)
+
+
+def frame_rms(samples):
+    """RMS level of a block of int16 samples (sequence or ndarray)"""
+    block = np.asarray(samples, dtype=np.float32)
+    if block.size == 0:
+        return 0.0
+    return float(np.sqrt(np.mean(block * block)))
+
+
+class EchoGate:
+    """
+    Decides whether a keyword detected during playback is the user or our own voice.
+
+    While we are speaking it learns how much of the output leaks into the mic
+    (coupling = mic level / output level). A detection is only accepted if the
+    mic is clearly louder than that expected echo, i.e. someone is talking over us.
+    """
+
+    def __init__(self, margin=2.0, hangover=0.3, output_decay=0.3):
+        self.margin = margin
+        self.hangover = hangover          # seconds after playback still treated as echo
+        self.output_decay = output_decay  # seconds for the output level to fall off
+        self.coupling = 1.0
+        self._output_rms = 0.0
+        self._output_time = 0.0
+        self._playing = False
+        self._stopped_at = 0.0
+        self._lock = threading.Lock()
+
+    def set_playing(self, playing):
+        with self._lock:
+            if self._playing and not playing:
+                self._stopped_at = time.monotonic()
+            self._playing = playing
+
+    def note_output(self, rms):
+        """Called by the player for every chunk written to the speaker"""
+        with self._lock:
+            self._output_rms = max(rms, self._current_output())
+            self._output_time = time.monotonic()
+
+    def _current_output(self):
+        age = time.monotonic() - self._output_time
+        return self._output_rms * max(0.0, 1.0 - age / self.output_decay)
+
+    def active(self):
+        """True while playing or within the hangover after playback"""
+        with self._lock:
+            return self._playing or time.monotonic() - self._stopped_at < self.hangover
+
+    def observe(self, mic_rms):
+        """Learn echo coupling from mic frames heard during playback. Returns True if the user seems to be talking"""
+        with self._lock:
+            output = self._current_output()
+            if output < 1.0:
+                return False
+            ratio = mic_rms / output
+            if ratio < self.coupling * self.margin:
+                # Looks like plain echo - track the coupling slowly
+                self.coupling = 0.95 * self.coupling + 0.05 * ratio
+                return False
+            return True
+
+    def allow(self, mic_rms):
+        """Should a keyword detected on a frame with this mic level be accepted?"""
+        if not self.active():
+            return True
+        with self._lock:
+            expected_echo = self.coupling * self._current_output()
+        return mic_rms > self.margin * expected_echo
+
+
+class SpeechPlayer:
+    """
+    Two-stage streaming TTS pipeline: sentences -> synth thread -> playback thread.
+
+    stop() cancels everything queued or playing within one audio chunk
+    (~50 ms), which keeps barge-in responsive.
+    """
+
+    def __init__(self, engine, echo_gate=None, sink=None, chunk_seconds=0.05, duck_gain=0.35):
+        self.engine = engine
+        self.echo_gate = echo_gate or EchoGate()
+        self.sink = sink  # callable(pcm_bytes, sample_rate) used instead of PyAudio output
+        self.chunk_seconds = chunk_seconds
+        self.duck_gain = duck_gain
+        self.splitter = SentenceSplitter()
+        self.first_audio_latency = None  # seconds from begin() to first sound of the last response
+
+        self._sentences = queue.Queue()
+        self._audio = queue.Queue(maxsize=4)
+        self._generation = 0
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._ducked = False
+        self._running = True
+        self._text_started = None
+        self._awaiting_first_audio = False
+        self._pa = None
+        self._stream = None
+        self._stream_rate = None
+        self._threads = [
+            threading.Thread(target=self._synth_worker, name="tts-synth", daemon=True),
+            threading.Thread(target=self._playback_worker, name="tts-playback", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    # -- producer side -------------------------------------------------
+    def begin(self):
+        """
+        Mark the start of a new response (for first-audio latency).
+        Returns a token for feed()/finish(); once stop() is called, input carrying the old token is dropped
+        """
+        self._text_started = time.perf_counter()
+        self._awaiting_first_audio = True
+        self.first_audio_latency = None
+        return self._generation
+
+    def feed(self, text, generation=None):
+        """Feed streamed tokens; complete sentences are queued for synthesis"""
+        if generation is not None and generation != self._generation:
+            return
+        for sentence in self.splitter.feed(text):
+            self.say(sentence, generation)
+
+    def finish(self, generation=None):
+        """Flush the last partial sentence once the token stream is complete"""
+        if generation is not None and generation != self._generation:
+            return
+        for sentence in self.splitter.flush():
+            self.say(sentence, generation)
+
+    def say(self, sentence, generation=None):
+        """Queue one sentence for synthesis and playback"""
+        with self._pending_lock:
+            self._pending += 1
+            self._idle.clear()
+        self._sentences.put((self._generation if generation is None else generation, sentence))
+
+    def stop(self):
+        """Cancel all queued and playing speech"""
+        self._generation += 1
+        self.splitter.flush()
+        for q in (self._sentences, self._audio):
+            while True:
+                try:
+                    q.get_nowait()
+                    self._done_one()
+                except queue.Empty:
+                    break
+        self._awaiting_first_audio = False
+
+    def duck(self, ducked=True):
+        """Lower (or restore) playback volume, e.g. while someone talks over us"""
+        self._ducked = ducked
+
+    def is_current(self, generation):
+        """True until stop() has cancelled the response that begin() returned this token for"""
+        return generation == self._generation
+
+    def is_speaking(self):
+        return not self._idle.is_set()
+
+    def wait(self, timeout=None):
+        """Block until everything queued has been played (or cancelled)"""
+        return self._idle.wait(timeout)
+
+    def close(self):
+        self.stop()
+        self._running = False
+        self._sentences.put(None)
+        for thread in self._threads:
+            thread.join(timeout=1)
+        if self._stream:
+            try:
+                self._stream.stop_stream()
+                self._stream.close()
+            except Exception:
+                pass
+        if self._pa:
+            self._pa.terminate()
+
+    # -- workers ---------------------------------------------------------
+    def _done_one(self):
+        with self._pending_lock:
+            self._pending = max(0, self._pending - 1)
+            if self._pending == 0:
+                self._idle.set()
+                self.echo_gate.set_playing(False)
+
+    def _synth_worker(self):
+        while self._running:
+            item = self._sentences.get()
+            if item is None:
+                break
+            generation, sentence = item
+            if generation != self._generation:
+                self._done_one()
+                continue
+            try:
+                pcm = self.engine.synthesize(sentence)
+            except Exception as e:
+                print(f"<WARNING> TTS synthesis failed: {e}")
+                self._done_one()
+                continue
+            if generation != self._generation:
+                self._done_one()
+                continue
+            self._audio.put((generation, pcm, self.engine.sample_rate))
+
+    def _playback_worker(self):
+        while self._running:
+            try:
+                generation, pcm, sample_rate = self._audio.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            try:
+                self._play(generation, pcm, sample_rate)
+            except Exception as e:
+                print(f"<WARNING> TTS playback failed: {e}")
+            finally:
+                self._done_one()
+
+    def _play(self, generation, pcm, sample_rate):
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        chunk = max(1, int(sample_rate * self.chunk_seconds))
+        self.echo_gate.set_playing(True)
+        if self._awaiting_first_audio:
+            self._awaiting_first_audio = False
+            self.first_audio_latency = time.perf_counter() - self._text_started
+        for start in range(0, len(samples), chunk):
+            if generation != self._generation or not self._running:
+                return
+            block = samples[start:start + chunk]
+            if self._ducked:
+                block = (block * self.duck_gain).astype(np.int16)
+            self.echo_gate.note_output(frame_rms(block))
+            self._write(block.tobytes(), sample_rate)
+
+    def _write(self, data, sample_rate):
+        if self.sink:
+            self.sink(data, sample_rate)
+            return
+        if self._stream is None or self._stream_rate != sample_rate:
+            import pyaudio
+            if self._pa is None:
+                self._pa = pyaudio.PyAudio()
+            if self._stream:
+                self._stream.close()
+            self._stream = self._pa.open(rate=sample_rate, channels=1, format=pyaudio.paInt16, output=True)
+            self._stream_rate = sample_rate
+        self._stream.write(data)
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+GERTY wake word benchmark harness
+Feeds recorded WAV corpora through the same frame path as the wake word
+listener (raw 16-bit frames -> unpack_frame -> detector.process) as fast as
+the CPU allows, and reports detection rate, false accepts per hour,
+detection latency and CPU cost for one or more sensitivity settings.
+
+Positive clips should end where the keyword ends; a JSON labels file
+({"clip.wav": keyword_end_seconds}) can override that per clip.
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+import statistics
+import struct
+import sys
+import time
+import wave
+from pathlib import Path
+
+from gerty_audio import unpack_frame
+
+
+class EnergyStubDetector:
+    """
+    Stand-in detector with the Porcupine interface (sample_rate, frame_length,
+    process, delete). Fires when frame energy stays above a threshold for a few
+    frames; higher sensitivity means a lower threshold. Useful for exercising
+    the harness and CI without an access key.
+    """
+
+    def __init__(self, sensitivity=0.5, sample_rate=16000, frame_length=512,
+                 min_frames=3, refractory=1.0):
+        self.sample_rate = sample_rate
+        self.frame_length = frame_length
+        self.sensitivity = sensitivity
+        # sensitivity 0 -> ~-10 dBFS, 1 -> ~-50 dBFS
+        self.threshold = 32768 * 10 ** (-(10 + 40 * sensitivity) / 20)
+        self.min_frames = min_frames
+        self.refractory_frames = int(refractory * sample_rate / frame_length)
+        self._run = 0
+        self._cooldown = 0
+
+    def process(self, pcm):
+        if self._cooldown:
+            self._cooldown -= 1
+            return -1
+        rms = math.sqrt(sum(sample * sample for sample in pcm) / len(pcm))
+        self._run = self._run + 1 if rms >= self.threshold else 0
+        if self._run >= self.min_frames:
+            self._run = 0
+            self._cooldown = self.refractory_frames
+            return 0
+        return -1
+
+    def delete(self):
+        pass
+
+
+def make_stub_factory(**kwargs):
+    """Detector factory for the energy stub"""
+    def factory(sensitivity):
+        return EnergyStubDetector(sensitivity=sensitivity, **kwargs)
+    return factory
+
+
+def make_porcupine_factory(access_key, keyword_paths):
+    """Detector factory creating real Porcupine instances"""
+    import pvporcupine
+
+    def factory(sensitivity):
+        return pvporcupine.create(
+            access_key=access_key,
+            keyword_paths=keyword_paths,
+            sensitivities=[sensitivity] * len(keyword_paths)
+        )
+    return factory
+
+
+def read_wav(path, sample_rate):
+    """Read a mono 16-bit WAV file and return its raw PCM bytes"""
+    with wave.open(str(path), "rb") as wav:
+        if wav.getnchannels() != 1 or wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: expected mono 16-bit PCM")
+        if wav.getframerate() != sample_rate:
+            raise ValueError(f"{path}: expected {sample_rate} Hz, got {wav.getframerate()} Hz")
+        return wav.readframes(wav.getnframes())
+
+
+def collect_wavs(sources):
+    """Expand files and directories into a sorted list of WAV paths"""
+    paths = []
+    for source in sources or []:
+        if os.path.isdir(source):
+            paths.extend(glob.glob(os.path.join(source, "**", "*.wav"), recursive=True))
+        else:
+            paths.append(source)
+    return sorted(paths)
+
+
+class FrameFeeder:
+    """Pushes PCM through a detector frame by frame and keeps audio time and CPU time"""
+
+    def __init__(self, detector):
+        self.detector = detector
+        self.frame_bytes = detector.frame_length * 2
+        self.audio_seconds = 0.0
+        self.cpu_seconds = 0.0
+
+    def feed(self, pcm_bytes):
+        """Return the detection times (seconds from the start of pcm_bytes)"""
+        detector = self.detector
+        frame_length = detector.frame_length
+        frame_seconds = frame_length / detector.sample_rate
+        # Pad the tail so the last partial frame is still processed
+        remainder = len(pcm_bytes) % self.frame_bytes
+        if remainder:
+            pcm_bytes += b"\x00" * (self.frame_bytes - remainder)
+
+        detections = []
+        cpu_start = time.process_time()
+        for i, offset in enumerate(range(0, len(pcm_bytes), self.frame_bytes)):
+            pcm = unpack_frame(pcm_bytes[offset:offset + self.frame_bytes], frame_length)
+            if detector.process(pcm) >= 0:
+                detections.append((i + 1) * frame_seconds)
+        self.cpu_seconds += time.process_time() - cpu_start
+        self.audio_seconds += len(pcm_bytes) // 2 / detector.sample_rate
+        return detections
+
+    def silence(self, seconds):
+        """Feed digital silence (used between clips so detectors settle)"""
+        if seconds > 0:
+            samples = int(seconds * self.detector.sample_rate)
+            self.feed(struct.pack("<%dh" % samples, *([0] * samples)))
+
+
+def run_benchmark(factory, sensitivity, positives, negatives, labels=None, tail=1.0, gap=0.5):
+    """Benchmark one sensitivity setting and return a result dict"""
+    labels = labels or {}
+    detector = factory(sensitivity)
+    feeder = FrameFeeder(detector)
+    wall_start = time.perf_counter()
+    try:
+        hits = 0
+        latencies = []
+        for path in positives:
+            pcm = read_wav(path, detector.sample_rate)
+            clip_seconds = len(pcm) // 2 / detector.sample_rate
+            keyword_end = labels.get(os.path.basename(path), clip_seconds)
+            tail_pcm = b"\x00" * (int(tail * detector.sample_rate) * 2)
+            detections = feeder.feed(pcm + tail_pcm)
+            if detections:
+                hits += 1
+                latencies.append(detections[0] - keyword_end)
+            feeder.silence(gap)
+
+        negative_seconds = 0.0
+        false_accepts = 0
+        for path in negatives:
+            pcm = read_wav(path, detector.sample_rate)
+            negative_seconds += len(pcm) // 2 / detector.sample_rate
+            false_accepts += len(feeder.feed(pcm))
+            feeder.silence(gap)
+    finally:
+        detector.delete()
+    wall_seconds = time.perf_counter() - wall_start
+
+    audio_hours = feeder.audio_seconds / 3600
+    negative_hours = negative_seconds / 3600
+    return {
+        "sensitivity": sensitivity,
+        "positives": len(positives),
+        "detections": hits,
+        "detection_rate": hits / len(positives) if positives else None,
+        "negative_hours": negative_hours,
+        "false_accepts": false_accepts,
+        "false_accepts_per_hour": false_accepts / negative_hours if negative_hours else None,
+        "latency_mean_ms": statistics.mean(latencies) * 1000 if latencies else None,
+        "latency_median_ms": statistics.median(latencies) * 1000 if latencies else None,
+        "latency_max_ms": max(latencies) * 1000 if latencies else None,
+        "audio_seconds": feeder.audio_seconds,
+        "cpu_seconds": feeder.cpu_seconds,
+        "cpu_seconds_per_audio_hour": feeder.cpu_seconds / audio_hours if audio_hours else None,
+        "realtime_factor": feeder.audio_seconds / wall_seconds if wall_seconds else None,
+    }
+
+
+def _fmt(value, spec):
+    return "-" if value is None else format(value, spec)
+
+
+def print_report(results):
+    """Print a comparison table of benchmark results"""
+    print(f"{'sens':>5} {'det.rate':>9} {'FA/hour':>9} {'lat.mean':>9} {'lat.max':>9} "
+          f"{'CPU s/h':>9} {'x realtime':>11}")
+    for r in results:
+        print(f"{r['sensitivity']:>5.2f} {_fmt(r['detection_rate'], '9.1%')} "
+              f"{_fmt(r['false_accepts_per_hour'], '9.2f')} {_fmt(r['latency_mean_ms'], '7.0f') + 'ms':>9} "
+              f"{_fmt(r['latency_max_ms'], '7.0f') + 'ms':>9} {_fmt(r['cpu_seconds_per_audio_hour'], '9.1f')} "
+              f"{_fmt(r['realtime_factor'], '10.0f')}x")
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Offline wake word benchmark for GERTY")
+    parser.add_argument("--positive", nargs="*", default=[], help="WAV files/dirs containing the keyword")
+    parser.add_argument("--negative", nargs="*", default=[], help="WAV files/dirs of background audio")
+    parser.add_argument("--labels", help="JSON file mapping positive clip names to keyword end (seconds)")
+    parser.add_argument("--sensitivity", nargs="+", type=float, default=[0.5],
+                        help="Sensitivity values to compare (0.0-1.0)")
+    parser.add_argument("--detector", choices=["porcupine", "stub"], default="porcupine")
+    parser.add_argument("--access-key", default=os.environ.get("PICOVOICE_ACCESS_KEY"),
+                        help="Picovoice access key (default: $PICOVOICE_ACCESS_KEY)")
+    parser.add_argument("--keyword", nargs="*", help="Keyword .ppn paths (default: platform models in repo)")
+    parser.add_argument("--tail", type=float, default=1.0, help="Silence after each positive clip (s)")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    positives = collect_wavs(args.positive)
+    negatives = collect_wavs(args.negative)
+    if not positives and not negatives:
+        parser.error("no WAV files given (use --positive and/or --negative)")
+
+    labels = {}
+    if args.labels:
+        with open(args.labels) as f:
+            labels = json.load(f)
+
+    if args.detector == "stub":
+        factory = make_stub_factory()
+    else:
+        if not args.access_key:
+            parser.error("Porcupine needs --access-key or $PICOVOICE_ACCESS_KEY (or use --detector stub)")
+        keyword_paths = args.keyword
+        if not keyword_paths:
+            from gerty_keywords import KeywordRegistry
+            registry = KeywordRegistry()
+            registry.discover(Path(__file__).parent)
+            keyword_paths = registry.resolve()
+        factory = make_porcupine_factory(args.access_key, keyword_paths)
+
+    print(f"<BENCH> {len(positives)} positive clips, {len(negatives)} negative files, "
+          f"detector={args.detector}")
+    results = []
+    for sensitivity in args.sensitivity:
+        try:
+            results.append(run_benchmark(factory, sensitivity, positives, negatives, labels, tail=args.tail))
+        except ValueError as e:
+            print(f"<ERROR> {e}")
+            return 1
+    print_report(results)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"<FILE> Results written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
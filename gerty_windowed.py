@@ -3,123 +3,60 @@
 GERTY Display - Windowed version for better macOS compatibility
 """
 
-import cv2
-import os
 import time
-import glob
 import sys
-from pathlib import Path
 
+from gerty import GertyScreen, TimelineError, TimelinePlayer, compile_timeline, load_timeline, sorted_images
+from gerty.timeline import DriftReport
+from gerty.startup import STARTUP
+
+
+# Default show: boot, two emotion cycles, shutdown, with pauses in between
+DEFAULT_TIMELINE = {
+    "name": "boot-emotions-shutdown",
+    "steps": [
+        {"folder": "boot", "duration": 3.0},
+        {"hold": 1.0},
+        {"repeat": 2, "steps": [{"folder": "emotion", "duration": 1.5}]},  # Slightly faster emotions
+        {"hold": 1.0},
+        {"folder": "shutdown", "duration": 4.0},  # Longer display for shutdown
+        {"hold": 2.0},  # Show final image a bit longer
+    ],
+}
+
+
+class GertyDisplay(GertyScreen):
+    display_time = 2.0   # seconds per image
+    boot_duration = 3.0  # longer display for boot
 
-class GertyDisplay:
-    def __init__(self):
-        self.base_path = Path(__file__).parent / "gertycon"
-        self.window_name = "GERTY"
-        self.display_time = 2.0  # seconds per image
-        
-        # Screen resolution for GERTY (1024x600)
-        self.target_width = 1024
-        self.target_height = 600
-        
-    def setup_display(self):
-        """Initialize the display window"""
-        cv2.namedWindow(self.window_name, cv2.WINDOW_NORMAL)
-        # Set window size to match GERTY screen
-        cv2.resizeWindow(self.window_name, self.target_width, self.target_height)
-        
-    def load_and_scale_image(self, image_path):
-        """Load image and scale it to fit the target resolution"""
-        img = cv2.imread(str(image_path))
-        if img is None:
-            print(f"Error loading image: {image_path}")
-            return None
-            
-        # The images are already 1024x600, but let's ensure they're exactly right
-        if img.shape[:2] != (self.target_height, self.target_width):
-            img_scaled = cv2.resize(img, (self.target_width, self.target_height), interpolation=cv2.INTER_LANCZOS4)
-        else:
-            img_scaled = img
-            
-        return img_scaled
-        
-    def display_image(self, image_path, duration=None):
-        """Display a single image for specified duration"""
-        if duration is None:
-            duration = self.display_time
-            
-        img = self.load_and_scale_image(image_path)
-        if img is None:
-            return False
-        
-        # Display the image
-        cv2.imshow(self.window_name, img)
-        cv2.waitKey(1)  # Force window refresh
-        
-        # Wait for duration with periodic checks for key presses
-        start_time = time.time()
-        while time.time() - start_time < duration:
-            key = cv2.waitKey(50) & 0xFF  # Check every 50ms
-            if key == 27:  # ESC key
-                return False
-            elif key == ord('q'):  # Q key
-                return False
-        return True
-        
     def get_sorted_images(self, folder_path):
         """Get sorted list of images from a folder"""
-        image_extensions = ['*.jpg', '*.jpeg', '*.png', '*.bmp']
-        images = []
-        
-        for ext in image_extensions:
-            images.extend(glob.glob(str(folder_path / ext)))
-            
-        return sorted(images)
-        
-    def boot_sequence(self):
-        """Display boot sequence"""
-        print("🤖 GERTY boot sequence initiated...")
-        boot_path = self.base_path / "boot"
-        boot_images = self.get_sorted_images(boot_path)
-        
-        for image_path in boot_images:
-            filename = os.path.basename(image_path)
-            print(f"   → {filename}")
-            if not self.display_image(image_path, 3.0):  # Longer display for boot
-                return False
-        return True
-        
-    def emotion_cycle(self):
-        """Cycle through emotion images"""
-        print("😊 GERTY emotional display cycle...")
-        emotion_path = self.base_path / "emotion"
-        emotion_images = self.get_sorted_images(emotion_path)
-        
-        # Cycle through emotions
-        cycles = 2
-        for cycle in range(cycles):
-            print(f"   Cycle {cycle + 1}/{cycles}")
-            for image_path in emotion_images:
-                filename = os.path.basename(image_path)
-                print(f"   → {filename}")
-                if not self.display_image(image_path, 1.5):  # Slightly faster emotions
-                    return False
-        return True
-        
-    def shutdown_sequence(self):
-        """Display shutdown sequence"""
-        print("🔌 GERTY shutdown sequence...")
-        shutdown_path = self.base_path / "shutdown"
-        shutdown_images = self.get_sorted_images(shutdown_path)
-        
-        for image_path in shutdown_images:
-            filename = os.path.basename(image_path)
-            print(f"   → {filename}")
-            if not self.display_image(image_path, 4.0):  # Longer display for shutdown
-                return False
-        return True
-        
-    def run(self):
-        """Main execution loop"""
+        return sorted_images(folder_path)
+        
+    def play_timeline(self, spec, loop=False):
+        """
+        Compile a timeline spec, preload its frames and play it (False if aborted).
+        loop repeats it until ESC/Q even if the spec itself doesn't loop
+        """
+        schedule = compile_timeline(spec, self.assets)
+        if loop and not schedule.loop:
+            if schedule.length <= 0:
+                raise TimelineError(f"{schedule.name} loops but has no duration")
+            schedule.loop = True
+        player = TimelinePlayer(self)
+        print(f"🎬 {schedule.name}: {len(schedule.cues)} cues, {len(schedule.frames)} frames, "
+              f"{schedule.length:.1f}s per cycle")
+        try:
+            return player.play(schedule) is True
+        finally:
+            print(f"   Timing: {player.report.summary()}")
+        
+    def run(self, startup_profile=False, timeline=None, loop=False):
+        """
+        Main execution loop (startup_profile prints the import/init breakdown).
+        timeline is a spec as in gerty.timeline (default: the boot/emotion/shutdown
+        show); loop repeats it until ESC/Q
+        """
         print("=" * 50)
         print("🤖 GERTY Display System v1.0")
         print("   Initializing emotional display interface...")
@@ -127,36 +64,87 @@ class GertyDisplay:
         print("=" * 50)
         
         try:
-            self.setup_display()
+            with STARTUP.phase("display"):
+                self.setup_display()
+                self.show_splash()
+            if startup_profile:
+                STARTUP.report()
             
-            # Boot sequence
-            if not self.boot_sequence():
-                return
-                
-            time.sleep(1)  # Brief pause between sequences
-                
-            # Emotion cycle
-            if not self.emotion_cycle():
-                return
-                
-            time.sleep(1)  # Brief pause before shutdown
-                
-            # Shutdown sequence
-            if not self.shutdown_sequence():
+            if not self.play_timeline(timeline or DEFAULT_TIMELINE, loop=loop):
                 return
                 
             print("✅ Sequence complete. GERTY going offline...")
-            time.sleep(2)  # Show final image a bit longer
             
         except KeyboardInterrupt:
             print("\n⚠️  Interrupted by user - Emergency shutdown")
+        except TimelineError as e:
+            print(f"❌ Timeline error: {e}")
         except Exception as e:
             print(f"❌ Error: {e}")
         finally:
-            cv2.destroyAllWindows()
+            self.ui.destroyAllWindows()
             print("🔌 GERTY Display System Offline")
 
 
+# Exhibition-style loop used by --measure-drift: every emotion frame, 0.5 s each
+MEASURE_TIMELINE = {"name": "emotion-loop", "loop": True, "steps": [{"folder": "emotion", "duration": 0.5}]}
+
+
+class _PacedWindow:
+    """cv2-style window that copies each frame (stand-in for the blit), records when, and sleeps in waitKey"""
+
+    WINDOW_NORMAL = 0
+
+    def __init__(self):
+        self.shown = []
+
+    def namedWindow(self, name, flags=0):
+        pass
+
+    def resizeWindow(self, name, width, height):
+        pass
+
+    def imshow(self, name, img):
+        img.copy()
+        self.shown.append(time.time())
+
+    def waitKey(self, delay=0):
+        time.sleep(max(delay, 1) / 1000.0)
+        return -1
+
+    def destroyAllWindows(self):
+        pass
+
+
+def measure_drift(seconds=60.0, spec=None):
+    """Frame lateness over a looping timeline: display_image + durations vs absolute deadlines"""
+    results = {}
+    for mode in ("display_image", "timeline"):
+        ui = _PacedWindow()
+        gerty = GertyDisplay(ui=ui)
+        schedule = compile_timeline(spec or MEASURE_TIMELINE, gerty.assets)
+        cycles = max(2, int(seconds / schedule.length))
+        if mode == "timeline":
+            TimelinePlayer(gerty, report_every=0).play(schedule, loops=cycles)
+        else:
+            # The old way: each image shown for its duration once the previous one is done
+            for _ in range(cycles):
+                for i, cue in enumerate(schedule.cues):
+                    following = schedule.cues[i + 1].at if i + 1 < len(schedule.cues) else schedule.length
+                    gerty.display_image(cue.frame[0], following - cue.at, cue.frame[1])
+        # Same yardstick for both: when each frame reached the window vs when it was due,
+        # counting from the first frame (the timeline preloads before that, display_image as it goes)
+        report = DriftReport()
+        start = ui.shown[0]
+        due = [start + cycle * schedule.length + cue.at for cycle in range(cycles) for cue in schedule.cues]
+        for i, (shown, deadline) in enumerate(zip(ui.shown, due)):
+            report.frame(shown - deadline)
+            if i % len(schedule.cues) == 0:
+                report.cycle(shown - deadline)
+        results[mode] = report.snapshot()
+    return results
+
+
 def main():
     """Main entry point"""
     if len(sys.argv) > 1 and sys.argv[1] in ['-h', '--help']:
@@ -165,10 +153,32 @@ def main():
         print("Controls:")
         print("  ESC or Q - Exit early")
         print("  Window can be resized/moved as needed")
+        print("Options:")
+        print("  --startup-profile - Print import and init times up to the first frame")
+        print("  --timeline FILE - Play a JSON timeline instead of the default show (see gerty/timeline.py)")
+        print("  --loop - Repeat the timeline until ESC/Q (exhibition mode, prints a drift report)")
+        print("  --measure-drift [SECONDS] - Frame lateness of display_image vs the timeline player")
         return
-        
+    args = sys.argv[1:]
+    
+    if "--measure-drift" in args:
+        i = args.index("--measure-drift")
+        seconds = float(args[i + 1]) if i + 1 < len(args) and not args[i + 1].startswith("-") else 60.0
+        print(f"⏱️  {seconds:.0f}s per mode, emotion frames looped at 0.5 s each")
+        for mode, stats in measure_drift(seconds).items():
+            print(f"   {mode:<14} mean {stats['mean_late_ms']:>8} ms  p99 {stats['p99_late_ms']:>8} ms  "
+                  f"max {stats['max_late_ms']:>8} ms  drift {stats['drift_ms']:>+9.2f} ms over {stats['cycles']} cycles")
+        return
+    
+    timeline = None
+    if "--timeline" in args:
+        try:
+            timeline = load_timeline(args[args.index("--timeline") + 1])
+        except (IndexError, OSError, TimelineError) as e:
+            print(f"❌ Cannot load timeline: {e}")
+            return
     gerty = GertyDisplay()
-    gerty.run()
+    gerty.run(startup_profile="--startup-profile" in args, timeline=timeline, loop="--loop" in args)
 
 
 if __name__ == "__main__":
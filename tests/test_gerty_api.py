@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Tests for the local control API (gerty_api.py)
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import socket
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from gerty_api import COMMAND_QUEUE, MAX_BODY, WS_GUID, ApiError, ControlAPI, ws_frame, ws_read
+
+
+class FakeGerty:
+    def get_state(self):
+        return {"processing": False}
+
+    def get_stats(self):
+        return {"audio": {}}
+
+
+@pytest.fixture
+def api():
+    return ControlAPI(FakeGerty())
+
+
+def post(api, name, body):
+    return api._route("POST", f"/{name}", json.dumps(body).encode())
+
+
+def read_frame(data):
+    async def read():
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        return await ws_read(reader)
+    return asyncio.run(read())
+
+
+def masked(payload, opcode=0x1):
+    """Client-to-server frame, as a browser sends it"""
+    mask = os.urandom(4)
+    frame = ws_frame(bytes(b ^ mask[i % 4] for i, b in enumerate(payload)), opcode)
+    header_length = len(frame) - len(payload)
+    return bytes((frame[0], frame[1] | 0x80)) + frame[2:header_length] + mask + frame[header_length:]
+
+
+class TestRouting:
+    """Endpoints, methods and the command queue"""
+
+    def test_state_and_stats(self, api):
+        assert api._route("GET", "/state", b"") == (200, {"processing": False})
+        status, stats = api._route("GET", "/stats", b"")
+        assert status == 200 and stats["api"]["queued_commands"] == 0
+
+    def test_commands_queue_in_order(self, api):
+        assert post(api, "ask", {"text": "what is your name"}) == (202, {"queued": "ask", "position": 1})
+        assert post(api, "sequence", {"folder": "boot"})[1]["position"] == 2
+        assert api.pending()
+        assert api.next_command() == {"text": "what is your name", "command": "ask"}
+        assert api.next_command()["command"] == "sequence"
+        assert api.next_command() is None and not api.pending()
+
+    @pytest.mark.parametrize("method, path, status", [
+        ("GET", "/nothing", 404), ("POST", "/state", 404), ("GET", "/ask", 405),
+    ])
+    def test_unknown_routes(self, api, method, path, status):
+        with pytest.raises(ApiError) as error:
+            api._route(method, path, b"")
+        assert error.value.status == status
+
+    @pytest.mark.parametrize("body, message", [(b"{text", "body must be JSON"),
+                                               (b"[1, 2]", "body must be a JSON object")])
+    def test_body_must_be_a_json_object(self, api, body, message):
+        with pytest.raises(ApiError, match=message):
+            api._route("POST", "/ask", body)
+
+    def test_full_queue_is_refused(self, api):
+        for _ in range(COMMAND_QUEUE):
+            post(api, "emotion", {"emotion": "happy"})
+        with pytest.raises(ApiError) as error:
+            post(api, "emotion", {"emotion": "happy"})
+        assert error.value.status == 503
+
+
+class TestFraming:
+    """WebSocket frames in both directions"""
+
+    @pytest.mark.parametrize("length, header", [(5, 2), (125, 2), (126, 4), (70000, 10)])
+    def test_server_frame_lengths(self, length, header):
+        frame = ws_frame(b"x" * length)
+        assert len(frame) == header + length
+        assert frame[0] == 0x81 and not frame[1] & 0x80  # final text frame, unmasked
+
+    @pytest.mark.parametrize("length", [0, 5, 300])
+    def test_masked_client_frame(self, length):
+        payload = os.urandom(length)
+        assert read_frame(masked(payload, opcode=0x9)) == (0x9, payload)
+
+    def test_oversized_frame_is_refused(self):
+        with pytest.raises(ValueError, match="larger than"):
+            read_frame(ws_frame(b"x" * (MAX_BODY + 1)))
+
+
+class TestValidation:
+    """Bad commands are refused with 400 before they reach the UI thread"""
+
+    @pytest.mark.parametrize("name, body, message", [
+        ("ask", {}, "ask needs text"),
+        ("ask", {"text": "   "}, "ask needs text"),
+        ("ask", {"text": ["what"]}, "text must be a string"),
+        ("emotion", {"emotion": "happy", "text": 5}, "text must be a string"),
+        ("emotion", {}, "emotion needs emotion"),
+        ("sequence", {"folder": "../secrets"}, "folder must be an asset folder name"),
+        ("sequence", {"folder": ".hidden"}, "folder must be an asset folder name"),
+    ])
+    def test_rejected(self, api, name, body, message):
+        with pytest.raises(ApiError, match=message) as error:
+            post(api, name, body)
+        assert error.value.status == 400
+        assert not api.pending()
+
+    def test_text_is_optional_for_emotion(self, api):
+        assert post(api, "emotion", {"emotion": "happy", "text": None})[0] == 202
+        assert post(api, "emotion", {"emotion": "happy"})[0] == 202
+
+
+class TestServer:
+    """HTTP and the /events WebSocket against a running server"""
+
+    @pytest.fixture
+    def server(self, api):
+        api.port = 0
+        assert api.start()
+        yield api
+        api.stop()
+
+    def test_http_request(self, server):
+        request = urllib.request.Request(f"http://127.0.0.1:{server.port}/emotion", method="POST",
+                                         data=json.dumps({"emotion": "happy", "text": 5}).encode())
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(request, timeout=5)
+        assert error.value.code == 400
+        assert json.loads(error.value.read()) == {"error": "text must be a string"}
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/state", timeout=5) as response:
+            assert json.loads(response.read()) == {"processing": False}
+
+    def test_events_and_ping(self, server):
+        key = base64.b64encode(os.urandom(16)).decode()
+        with socket.create_connection(("127.0.0.1", server.port), timeout=5) as sock:
+            sock.sendall((f"GET /events HTTP/1.1\r\nHost: gerty\r\nUpgrade: websocket\r\n"
+                          f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\n\r\n").encode())
+            reply = b""
+            while not reply.endswith(b"\r\n\r\n"):
+                reply += sock.recv(1)
+            accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+            assert reply.startswith(b"HTTP/1.1 101") and accept.encode() in reply
+
+            while not server.stats()["subscribers"]:
+                time.sleep(0.01)
+            server.publish("answer", 1.5, {"text": "I'm GERTY."})
+            assert self.receive(sock) == (0x1, b'{"event": "answer", "t": 1.5, "text": "I\'m GERTY."}')
+            sock.sendall(masked(b"are you there", opcode=0x9))
+            assert self.receive(sock) == (0xA, b"are you there")
+            sock.sendall(masked(b"", opcode=0x8))
+            assert self.receive(sock)[0] == 0x8
+
+    @staticmethod
+    def receive(sock):
+        data = b""
+        while True:
+            chunk = sock.recv(4096)
+            assert chunk, "connection closed"
+            data += chunk
+            if len(data) >= 2 and len(data) >= 2 + (data[1] & 0x7F):
+                return read_frame(data)
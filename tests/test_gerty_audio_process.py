@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared memory rings between the audio process and GERTY
+(gerty_audio_process.py). Most drive the child's writer side directly;
+one starts a real child on the synthetic microphone
+"""
+
+import struct
+import time
+from multiprocessing import shared_memory
+
+import pytest
+
+from gerty_audio_process import HEADER, AudioProcess, SharedAudioRing
+
+CAPACITY, FRAME_LENGTH = 8, 4
+
+
+def frame(n):
+    return struct.pack(f"<{FRAME_LENGTH}h", *([n] * FRAME_LENGTH))
+
+
+@pytest.fixture
+def audio():
+    audio = AudioProcess(("stub", {}), source="synthetic", capacity=CAPACITY, frame_length=FRAME_LENGTH)
+    audio.shm = shared_memory.SharedMemory(create=True, size=SharedAudioRing.size(CAPACITY, FRAME_LENGTH))
+    audio.shm.buf[:HEADER.size] = bytes(HEADER.size)
+    audio.ring = SharedAudioRing(audio.shm, CAPACITY, FRAME_LENGTH)
+    yield audio
+    audio.stop()
+
+
+class TestFrameRing:
+    """A frame is readable until the writer starts refilling its slot"""
+
+    def test_frames_read_back(self, audio):
+        for seq in range(3):
+            audio.ring.write_frame(seq, frame(seq))
+        assert [audio.ring.read_frame(seq) for seq in range(3)] == [frame(0), frame(1), frame(2)]
+
+    def test_lapped_frame_is_dropped(self, audio):
+        ring = audio.ring
+        for seq in range(CAPACITY):
+            ring.write_frame(seq, frame(seq))
+        assert ring.read_frame(0) is None  # the next write goes into frame 0's slot
+        assert ring.read_frame(1) == frame(1)
+
+    def test_reader_skips_what_it_cannot_copy(self, audio):
+        for seq in range(CAPACITY + 3):
+            audio.ring.write_frame(seq, frame(seq))
+        frames = audio.read()
+        assert [seq for seq, _frame, _keyword in frames] == list(range(4, CAPACITY + 3))
+        assert all(data == frame(seq) for seq, data, _keyword in frames)
+        assert audio.consumer_overflows == 4
+
+
+class TestEvents:
+    """Keyword events reach the parent with their frame, even if the frame was lost"""
+
+    def test_keyword_arrives_with_its_frame(self, audio):
+        ring = audio.ring
+        ring.write_frame(0, frame(0))
+        ring.write_event(0, 1, 0)  # the child writes the event before the frame
+        ring.write_frame(1, frame(1))
+        assert audio.read() == [(0, frame(0), -1), (1, frame(1), 0)]
+        assert audio.read() == []
+
+    def test_event_before_its_frame_is_kept_for_the_next_read(self, audio):
+        ring = audio.ring
+        ring.write_event(0, 0, 2)
+        assert audio.read() == []
+        ring.write_frame(0, frame(0))
+        assert audio.read() == [(0, frame(0), 2)]
+
+    def test_keyword_survives_a_lapped_frame(self, audio):
+        ring = audio.ring
+        for seq in range(CAPACITY + 3):
+            if seq == 2:
+                ring.write_event(0, seq, 1)
+            ring.write_frame(seq, frame(seq))
+        frames = audio.read()
+        assert frames[0] == (2, None, 1)
+        assert [seq for seq, _frame, _keyword in frames[1:]] == list(range(4, CAPACITY + 3))
+        assert audio.stats()["keyword_events"] == 1
+
+
+def test_child_process_frames_reach_the_parent():
+    audio = AudioProcess(("stub", {}), source="synthetic")
+    try:
+        assert audio.start()
+        frames = []
+        deadline = time.monotonic() + 5
+        while len(frames) < 10 and time.monotonic() < deadline:
+            frames += audio.read()
+            time.sleep(0.02)
+        assert [seq for seq, _frame, _keyword in frames[:10]] == list(range(10))
+        assert all(len(data) == 1024 for _seq, data, _keyword in frames)
+    finally:
+        audio.stop()
+    assert audio.shm is None
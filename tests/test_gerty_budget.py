@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for the AI answer length budget (gerty_budget.py)
+"""
+
+import pytest
+
+from gerty_budget import HEADROOM, ResponseBudget, trim_to_sentence
+
+
+def feed(budget, overhead, per_token, sizes=(20, 40, 60, 30, 50)):
+    """Record one answer per size, each taking overhead + tokens * per_token seconds"""
+    for tokens in sizes:
+        budget.record("x" * int(tokens * budget.chars_per_token), overhead + tokens * per_token, tokens, "stop")
+
+
+class TestMaxTokens:
+    """The request cap follows the display capacity and the measured latency"""
+
+    def test_display_capacity_before_any_answers(self):
+        budget = ResponseBudget(150, target_latency=2.5)
+        assert budget.max_tokens == 49  # ceil(150 / 4 * 1.3)
+        assert budget.instruction() == f"Answer in at most {int(49 / HEADROOM * 4 / 6)} words. "
+
+    def test_fast_server_keeps_the_display_cap(self):
+        budget = ResponseBudget(150, target_latency=2.5)
+        feed(budget, overhead=0.4, per_token=0.01)
+        assert budget.overhead == pytest.approx(0.4, abs=0.05)
+        assert budget.max_tokens == 49
+
+    def test_slow_server_lowers_the_cap(self):
+        budget = ResponseBudget(150, target_latency=2.5)
+        feed(budget, overhead=0.4, per_token=0.08)
+        assert budget.per_token == pytest.approx(0.08, rel=0.1)
+        assert budget.max_tokens == pytest.approx((2.5 - 0.4) / 0.08, abs=2)
+
+    def test_cap_recovers_when_the_server_speeds_up(self):
+        budget = ResponseBudget(150, target_latency=2.5)
+        feed(budget, overhead=0.4, per_token=0.08)
+        slow = budget.max_tokens
+        feed(budget, overhead=0.4, per_token=0.01, sizes=(20, 25, 20, 25, 20, 25))
+        assert slow < 40 and budget.max_tokens == 49
+
+    def test_never_below_min_tokens(self):
+        budget = ResponseBudget(150, target_latency=0.5, min_tokens=16)
+        feed(budget, overhead=0.4, per_token=0.2)
+        assert budget.max_tokens == 16
+
+    def test_zero_target_latency_uses_the_display_only(self):
+        budget = ResponseBudget(300, target_latency=0)
+        feed(budget, overhead=0.4, per_token=0.5)
+        assert budget.max_tokens == 98  # ceil(300 / 4 * 1.3)
+
+    def test_update_follows_the_config(self):
+        budget = ResponseBudget(150, target_latency=2.5)
+        budget.update(300, 2.5)
+        assert budget.max_tokens == 98
+
+
+class TestRecord:
+    """What the budget learns from each finished answer"""
+
+    def test_chars_per_token_follows_the_server_counts(self):
+        budget = ResponseBudget(150)
+        for _ in range(20):
+            budget.record("x" * 60, 1.0, completion_tokens=20)
+        assert budget.chars_per_token == pytest.approx(3.0, abs=0.05)
+
+    def test_truncated_answers_are_counted(self):
+        budget = ResponseBudget(150)
+        budget.record("Long answer", 1.0, 49, "length")
+        budget.record("Short.", 0.5, 2, "stop")
+        stats = budget.stats()
+        assert (stats["requests"], stats["truncated"]) == (2, 1)
+
+    def test_no_fit_without_spread_in_answer_length(self):
+        budget = ResponseBudget(150, target_latency=2.5)
+        feed(budget, overhead=0.4, per_token=0.08, sizes=(30, 30, 30, 30))
+        assert budget.per_token is None and budget.max_tokens == 49
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("The Moon is far. It takes three days to", "The Moon is far."),
+    ("Wow! Really? Yes it", "Wow! Really?"),
+    ("It is 384.4 thousand km away. The orbit", "It is 384.4 thousand km away."),
+    ("No sentence end here", "No sentence end here"),
+    ("Complete answer.", "Complete answer."),
+    ("", ""),
+])
+def test_trim_to_sentence(text, expected):
+    assert trim_to_sentence(text) == expected
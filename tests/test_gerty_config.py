@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Tests for typed settings (gerty_config.py): JSON file, environment
+overrides, and what a SIGHUP reload applies
+"""
+
+import json
+import signal
+
+import pytest
+
+from gerty_config import GertyConfig, apply_dict, diff_config, load_config
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    path = tmp_path / "gerty_config.json"
+    path.write_text(json.dumps({"display": {"answer_duration": 6.0, "width": 800}, "ai": {"timeout": 10}}))
+    return path
+
+
+class TestLoadConfig:
+    """Defaults, then the JSON file, then the environment"""
+
+    def test_defaults_without_file(self, tmp_path):
+        config = load_config(tmp_path / "missing.json", environ={})
+        assert config.to_dict() == GertyConfig().to_dict()
+
+    def test_file_values(self, config_file):
+        config = load_config(config_file, environ={})
+        assert config.display.answer_duration == 6.0
+        assert config.display.width == 800
+        assert config.ai.timeout == 10.0 and isinstance(config.ai.timeout, float)
+
+    def test_environment_overrides_file(self, config_file):
+        config = load_config(config_file, environ={"GERTY_DISPLAY_ANSWER_DURATION": "3.5", "GERTY_AI_TIMEOUT": "7"})
+        assert config.display.answer_duration == 3.5
+        assert config.ai.timeout == 7.0
+        assert config.display.width == 800
+
+    def test_config_path_from_environment(self, config_file):
+        config = load_config(environ={"GERTY_CONFIG": str(config_file)})
+        assert config.display.answer_duration == 6.0
+
+    @pytest.mark.parametrize("value, expected", [("1", True), ("yes", True), ("On", True), ("0", False),
+                                                 ("false", False), ("", False)])
+    def test_boolean_environment_values(self, tmp_path, value, expected):
+        config = load_config(tmp_path / "missing.json", environ={"GERTY_INTENTS_ENABLED": value})
+        assert config.intents.enabled is expected
+
+    def test_older_variable_names(self, tmp_path):
+        config = load_config(tmp_path / "missing.json", environ={"GERTY_TTS": "piper", "PICOVOICE_ACCESS_KEY": "k"})
+        assert (config.tts.engine, config.wake.access_key) == ("piper", "k")
+
+    def test_new_name_wins_over_alias(self, tmp_path):
+        config = load_config(tmp_path / "missing.json", environ={"GERTY_TTS": "piper", "GERTY_TTS_ENGINE": "off"})
+        assert config.tts.engine == "off"
+
+    def test_bad_values_keep_the_default(self, tmp_path, capsys):
+        config = load_config(tmp_path / "missing.json", environ={"GERTY_AI_TIMEOUT": "soon"})
+        assert config.ai.timeout == GertyConfig().ai.timeout
+        assert "Bad value for ai.timeout" in capsys.readouterr().out
+
+    def test_unknown_settings_are_reported(self, capsys):
+        config = apply_dict(GertyConfig(), {"display": {"colour": "red"}, "laser": {"power": 1}})
+        out = capsys.readouterr().out
+        assert "Unknown setting 'display.colour'" in out and "Unknown section 'laser'" in out
+        assert config.to_dict() == GertyConfig().to_dict()
+
+    def test_unreadable_file_falls_back_to_defaults(self, tmp_path, capsys):
+        path = tmp_path / "gerty_config.json"
+        path.write_text("{not json")
+        config = load_config(path, environ={"GERTY_AI_TIMEOUT": "9"})
+        assert "Could not read" in capsys.readouterr().out
+        assert config.ai.timeout == 9.0  # the environment still applies
+
+
+class TestReload:
+    """diff_config and GERTYSimpleVoice.reload_config"""
+
+    def test_diff_marks_restart_settings(self, config_file):
+        changes = diff_config(GertyConfig(), load_config(config_file, environ={}))
+        assert sorted(changes) == [("ai.timeout", 15.0, 10.0, False),
+                                   ("display.answer_duration", 5.0, 6.0, False),
+                                   ("display.width", 1024, 800, True)]
+
+    def test_no_changes(self):
+        assert diff_config(GertyConfig(), GertyConfig()) == []
+
+    def test_reload_applies_live_settings_only(self, config_file, monkeypatch):
+        pytest.importorskip("pyaudio")
+        pytest.importorskip("pvporcupine")
+        from gerty_sim import Simulation
+
+        monkeypatch.setattr(signal, "signal", lambda *args: None)
+        monkeypatch.setenv("GERTY_CONFIG", str(config_file))
+        monkeypatch.setenv("GERTY_SPEECH_LISTEN_TIMEOUT", "8")
+        simulation = Simulation({"interactions": []})
+        with simulation.ai:
+            gerty = simulation._build()
+            changes = gerty.reload_config()
+        changed = {name: needs_restart for name, _before, _after, needs_restart in changes}
+        assert changed["display.answer_duration"] is False and changed["display.width"] is True
+        assert gerty.config.display.answer_duration == 6.0
+        assert gerty.config.speech.listen_timeout == 8.0
+        assert gerty.config.display.width == 1024  # restart-only: kept until the next start
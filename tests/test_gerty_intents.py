@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Tests for local intents (gerty_intents.py)
+Commands must match with or without polite filler, and anything longer
+must stay on the AI path
+"""
+
+import time
+
+import pytest
+
+from gerty_intents import EMOTION, REPLY, SLEEP, STOP, default_registry, normalize_question
+
+NOW = time.struct_time((2026, 3, 14, 15, 9, 26, 5, 73, 0))  # Saturday 14 March 2026, 3:09 PM
+
+
+@pytest.fixture
+def registry():
+    return default_registry()
+
+
+def intent_name(registry, text):
+    intent, _ = registry.match(text)
+    return intent.name if intent else None
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("What time is it?", "time"),
+    ("Hey GERTY, what's the time please", "time"),
+    ("Tell me the time.", "time"),
+    ("What's the date today?", "date"),
+    ("What day is it", "day"),
+    ("Stop!", "stop"),
+    ("never mind", "stop"),
+    ("Could you be quiet now", "stop"),
+    ("Go to sleep, GERTY", "sleep"),
+    ("Good night", "sleep"),
+    ("Show me your happy face", "emotion"),
+    ("Look surprised", "emotion"),
+])
+def test_commands_match(registry, text, expected):
+    assert intent_name(registry, text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "What time is it in Tokyo",
+    "What time is it on the moon?",
+    "What's the date of the next eclipse",
+    "What day is Christmas this year",
+    "Don't stop talking",
+    "Why did you stop",
+    "How much sleep does a person need",
+    "Show me your happy face when I get home",
+    "Tell me about time travel",
+    "",
+])
+def test_longer_questions_stay_on_the_ai_path(registry, text):
+    assert registry.handle(text, NOW) is None
+
+
+def test_time_and_date_replies(registry):
+    assert registry.handle("what time is it", NOW).reply == "It's 3:09 PM, Sam."
+    assert registry.handle("what's the date", NOW).reply == "Today is Saturday, March 14, 2026."
+    assert registry.handle("what day is today", NOW).reply == "It's Saturday, Sam."
+
+
+def test_actions(registry):
+    assert registry.handle("stop", NOW).action == STOP
+    assert registry.handle("go to sleep", NOW).action == SLEEP
+    assert registry.handle("what time is it", NOW).action == REPLY
+    face = registry.handle("make a puzzled face", NOW)
+    assert (face.action, face.emotion) == (EMOTION, "confused")
+
+
+def test_stats_count_handled_intents(registry):
+    registry.handle("stop", NOW)
+    registry.handle("cancel", NOW)
+    registry.handle("what time is it in Tokyo", NOW)
+    assert registry.stats == {"stop": 2}
+
+
+def test_normalize_question():
+    assert normalize_question("  What's   the TIME, GERTY?! ") == "what's the time gerty"
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Tests for the laser-cut toolpath optimiser (gerty_lasercut.py)
+Uses small hand-written R12 DXFs, so no design files are needed
+"""
+
+import math
+
+import pytest
+
+from gerty_lasercut import (Toolpath, containers, estimate, inside_out_violations, join_paths,
+                            optimise, order_paths, read_dxf, write_dxf)
+
+STYLE = ("0", None, None)
+
+
+def write_entities(path, records):
+    """Minimal DXF with just an ENTITIES section; records are (type, [(code, value), ...])"""
+    pairs = [(0, "SECTION"), (2, "ENTITIES")]
+    for kind, group in records:
+        pairs.append((0, kind))
+        pairs.extend(group)
+    pairs += [(0, "ENDSEC"), (0, "EOF")]
+    path.write_text("".join(f"{code}\n{value}\n" for code, value in pairs), encoding="cp1252")
+    return path
+
+
+def line(a, b, layer="0"):
+    return "LINE", [(8, layer), (10, a[0]), (20, a[1]), (11, b[0]), (21, b[1])]
+
+
+def polyline(points, bulges=(), closed=False):
+    records = [("POLYLINE", [(8, "0"), (66, 1), (70, 1 if closed else 0)])]
+    for i, (x, y) in enumerate(points):
+        group = [(8, "0"), (10, x), (20, y)]
+        if i < len(bulges) and bulges[i]:
+            group.append((42, bulges[i]))
+        records.append(("VERTEX", group))
+    records.append(("SEQEND", [(8, "0")]))
+    return records
+
+
+def square(x0, y0, size):
+    corners = [(x0, y0), (x0 + size, y0), (x0 + size, y0 + size), (x0, y0 + size)]
+    return Toolpath(corners + [corners[0]], [0.0] * 4, STYLE)
+
+
+def on_circle(point, centre, radius, tolerance=0.15):
+    return abs(math.hypot(point[0] - centre[0], point[1] - centre[1]) - radius) <= tolerance
+
+
+class TestReadDxf:
+    """Parsing POLYLINE and ARC entities into Toolpaths"""
+
+    def test_closed_polyline_repeats_first_point(self, tmp_path):
+        path = write_entities(tmp_path / "closed.dxf",
+                              polyline([(0, 0), (10, 0), (10, 10), (0, 10)], bulges=(0, 0.5, 0, 0), closed=True))
+        (entity,) = read_dxf(path).entities
+        assert entity.closed
+        assert entity.points == [(0, 0), (10, 0), (10, 10), (0, 10), (0, 0)]
+        assert entity.bulges == [0.0, 0.5, 0.0, 0.0]  # the closing segment keeps the last vertex's bulge
+
+    def test_open_polyline_drops_last_bulge(self, tmp_path):
+        path = write_entities(tmp_path / "open.dxf",
+                              polyline([(0, 0), (10, 0), (10, 10)], bulges=(1.0, 0, 0.7)))
+        (entity,) = read_dxf(path).entities
+        assert not entity.closed
+        assert entity.points == [(0, 0), (10, 0), (10, 10)]
+        assert entity.bulges == [1.0, 0.0]
+
+    def test_bulged_segment_is_an_arc(self, tmp_path):
+        path = write_entities(tmp_path / "half.dxf", polyline([(0, 0), (10, 0)], bulges=(1.0, 0)))
+        (entity,) = read_dxf(path).entities
+        assert entity.length == pytest.approx(5 * math.pi)
+        assert all(on_circle(p, (5, 0), 5) for p in entity.polygon())
+
+    def test_arc_becomes_counter_clockwise_bulge(self, tmp_path):
+        path = write_entities(tmp_path / "arc.dxf",
+                              [("ARC", [(8, "0"), (10, 0), (20, 0), (40, 10), (50, 0), (51, 90)])])
+        (entity,) = read_dxf(path).entities
+        assert entity.start == pytest.approx((10, 0))
+        assert entity.end == pytest.approx((0, 10), abs=1e-9)
+        assert entity.bulges == [pytest.approx(math.tan(math.radians(90) / 4))]
+        assert entity.bulges[0] > 0
+        # The flattened arc runs through the first quadrant, not the long way round
+        for x, y in entity.polygon():
+            assert on_circle((x, y), (0, 0), 10)
+            assert x >= -1e-9 and y >= -1e-9
+
+    def test_reversed_arc_stays_on_the_same_side(self, tmp_path):
+        path = write_entities(tmp_path / "arc.dxf",
+                              [("ARC", [(8, "0"), (10, 0), (20, 0), (40, 10), (50, 0), (51, 90)])])
+        (entity,) = read_dxf(path).entities
+        back = entity.reversed()
+        assert back.bulges[0] < 0
+        assert back.length == pytest.approx(entity.length)
+        assert all(x >= -1e-9 and y >= -1e-9 for x, y in back.polygon())
+
+
+class TestJoinPaths:
+    """Chaining LINE fragments into continuous paths"""
+
+    def test_fragments_close_into_one_square(self):
+        fragments = [
+            Toolpath([(10, 0), (10, 10)], [0.0], STYLE),
+            Toolpath([(0, 0), (10, 0)], [0.0], STYLE),
+            Toolpath([(0, 10), (10, 10)], [0.0], STYLE),  # drawn the other way round
+            Toolpath([(0, 10), (0, 0)], [0.0], STYLE),
+        ]
+        joined, sources = join_paths(fragments)
+        assert len(joined) == 1
+        assert joined[0].closed
+        assert joined[0].length == pytest.approx(40)
+        assert sorted(sources[0]) == [0, 1, 2, 3]
+
+    def test_ends_within_tolerance_are_joined(self):
+        fragments = [Toolpath([(0, 0), (10, 0)], [0.0], STYLE), Toolpath([(10.005, 0), (20, 0)], [0.0], STYLE)]
+        joined, _ = join_paths(fragments, tolerance=0.01)
+        assert len(joined) == 1
+        assert joined[0].points[0] == (0, 0) and joined[0].points[-1] == (20, 0)
+
+    def test_different_layers_stay_apart(self):
+        fragments = [Toolpath([(0, 0), (10, 0)], [0.0], ("cut", None, None)),
+                     Toolpath([(10, 0), (20, 0)], [0.0], ("engrave", None, None))]
+        joined, _ = join_paths(fragments)
+        assert len(joined) == 2
+
+
+class TestOrderPaths:
+    """Cutting order: nearest first, but never an outline before what is inside it"""
+
+    def test_inner_paths_cut_before_their_outline(self):
+        outer = square(0, 0, 100)
+        hole = Toolpath.full_circle((50, 50), 10, STYLE)
+        notch = square(80, 80, 10)
+        paths = [outer, hole, notch]
+        inside = containers(paths)
+        assert inside == [[], [0], [0]]
+        order, ordered = order_paths(paths, inside=inside)
+        assert order[-1] == 0  # the outline goes last even though its corner is nearest home
+        positions = {i: n for n, i in enumerate(order)}
+        assert inside_out_violations(positions, inside) == 0
+
+    def test_closed_paths_start_at_the_nearest_vertex(self):
+        _, ordered = order_paths([square(10, 10, 5)], home=(20, 20))
+        assert ordered[0].start == (15, 15)
+        assert ordered[0].closed
+
+    def test_ordering_reduces_travel(self):
+        far, near = Toolpath([(100, 0), (110, 0)], [0.0], STYLE), Toolpath([(1, 0), (5, 0)], [0.0], STYLE)
+        _, ordered = order_paths([far, near])
+        assert estimate(ordered, 15, 150, 0.3)["travel_mm"] < estimate([far, near], 15, 150, 0.3)["travel_mm"]
+
+
+class TestRoundTrip:
+    """Writing the optimised DXF and reading it back"""
+
+    def test_cut_length_survives_write_and_read(self, tmp_path):
+        records = [line((0, 0), (50, 0)), line((50, 0), (50, 30)), line((50, 30), (0, 30)), line((0, 30), (0, 0)),
+                   ("CIRCLE", [(8, "0"), (10, 25), (20, 15), (40, 5)]),
+                   ("ARC", [(8, "0"), (10, 80), (20, 15), (40, 10), (50, 270), (51, 90)])]
+        records += polyline([(60, 0), (70, 0), (70, 10)], bulges=(0.4, -0.3))
+        records.append(("POINT", [(8, "0"), (10, 1), (20, 2)]))
+        source = write_entities(tmp_path / "part.dxf", records)
+        drawing = read_dxf(source)
+        before = sum(p.length for p in drawing.entities)
+
+        report = optimise(source, tmp_path / "out.dxf")
+        result = read_dxf(tmp_path / "out.dxf")
+        assert sum(p.length for p in result.entities) == pytest.approx(before, abs=1e-3)
+        assert report["before"]["cut_mm"] == report["after"]["cut_mm"]
+        assert report["after"]["paths"] == len(result.entities) == 4  # the rectangle's lines are joined
+        assert report["after"]["inner_after_outer"] == 0
+        assert [kind for kind, _ in result.passthrough] == ["POINT"]
+
+    def test_write_dxf_keeps_bulges(self, tmp_path):
+        source = write_entities(tmp_path / "one.dxf", polyline([(0, 0), (10, 0), (10, 10)], bulges=(0.25, -1.0)))
+        drawing = read_dxf(source)
+        write_dxf(tmp_path / "copy.dxf", drawing, drawing.entities)
+        (copy,) = read_dxf(tmp_path / "copy.dxf").entities
+        assert copy.points == drawing.entities[0].points
+        assert copy.bulges == drawing.entities[0].bulges
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests for sheet nesting (gerty_nest.py)
+Checks the packing invariants on synthetic parts: every part inside the
+margin and at least the gap away from every other part on its sheet
+"""
+
+import math
+
+import pytest
+
+from gerty_lasercut import Toolpath, _arc_points
+from gerty_nest import Part, _near, nest
+
+STYLE = ("0", None, None)
+WIDTH, HEIGHT, GAP, MARGIN = 600.0, 400.0, 3.0, 5.0
+
+
+def rectangle(width, height):
+    corners = [(0, 0), (width, 0), (width, height), (0, height)]
+    return Toolpath(corners + [corners[0]], [0.0] * 4, STYLE)
+
+
+def rounded_l(size):
+    """L-shaped outline with a half-round end on each arm"""
+    arm = size / 3
+    points = [(0, 0), (size, 0), (size, arm), (arm, arm), (arm, size), (0, size), (0, 0)]
+    bulges = [0.0, 1.0, 0.0, 0.0, 1.0, 0.0]
+    return Toolpath(points, bulges, STYLE)
+
+
+def outline(path, tolerance=0.01):
+    """Path flattened much finer than the nesting hulls"""
+    points = [path.points[0]]
+    for a, b, bulge in zip(path.points, path.points[1:], path.bulges):
+        points.extend(_arc_points(a, b, bulge, tolerance))
+    return points
+
+
+@pytest.fixture
+def parts():
+    shapes = [rectangle(120, 80) for _ in range(5)] + [rectangle(40, 200) for _ in range(2)]
+    shapes += [Toolpath.full_circle((0, 0), 45, STYLE) for _ in range(5)]
+    shapes += [rounded_l(150) for _ in range(3)]
+    return [Part(f"part#{n + 1}", [shape]) for n, shape in enumerate(shapes)]
+
+
+def test_every_part_is_placed_once(parts):
+    sheets, unplaced = nest(parts, WIDTH, HEIGHT, GAP, MARGIN)
+    assert not unplaced
+    placed = [placement.part.name for sheet in sheets for placement in sheet.placements]
+    assert sorted(placed) == sorted(part.name for part in parts)
+
+
+def test_parts_keep_margin_and_gap(parts):
+    sheets, _ = nest(parts, WIDTH, HEIGHT, GAP, MARGIN)
+    for sheet in sheets:
+        outlines = [[outline(path) for path in placement.paths()] for placement in sheet.placements]
+        for polylines in outlines:
+            for x, y in (p for polyline in polylines for p in polyline):
+                assert MARGIN - 1e-6 <= x <= WIDTH - MARGIN + 1e-6
+                assert MARGIN - 1e-6 <= y <= HEIGHT - MARGIN + 1e-6
+        for i, a in enumerate(outlines):
+            for b in outlines[i + 1:]:
+                assert not any(_near(pa, pb, GAP - 0.01) for pa in a for pb in b)
+        # No part dropped inside another's outline without touching it
+        for i, placement in enumerate(sheet.placements):
+            for j, other in enumerate(sheet.placements):
+                if i != j:
+                    assert not other.paths()[0].contains(placement.paths()[0].start)
+
+
+def test_turns_allow_a_tall_part():
+    tall = Part("tall", [rectangle(30, 500)])
+    sheets, unplaced = nest([tall], WIDTH, HEIGHT, GAP, MARGIN)
+    assert not unplaced
+    assert sheets[0].placements[0].shape.angle in (90, 270)
+    assert nest([tall], WIDTH, HEIGHT, GAP, MARGIN, rotations=1)[1] == [tall]
+
+
+def test_oversized_part_is_reported(parts):
+    huge = Part("huge", [Toolpath.full_circle((0, 0), 300, STYLE)])
+    sheets, unplaced = nest(parts + [huge], WIDTH, HEIGHT, GAP, MARGIN)
+    assert unplaced == [huge]
+    assert sum(len(sheet.placements) for sheet in sheets) == len(parts)
+
+
+def test_larger_gap_is_respected():
+    circles = [Part(f"c{n}", [Toolpath.full_circle((0, 0), 30, STYLE)]) for n in range(12)]
+    gap = 12.0
+    (sheet,), _ = nest(circles, WIDTH, HEIGHT, gap, MARGIN)
+    centres = [placement.paths()[0].circle[0] for placement in sheet.placements]
+    closest = min(math.dist(a, b) for i, a in enumerate(centres) for b in centres[i + 1:])
+    assert closest >= 2 * 30 + gap - 1e-6
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Scripted sessions on the virtual clock (gerty_sim.py): wake words and
+STOP arriving while GERTY is busy, and control API commands between
+interactions
+"""
+
+import signal
+import threading
+import time
+
+import pytest
+
+QUESTION = {"say": "what is your name", "ai": "I'm GERTY."}
+
+
+@pytest.fixture
+def simulation_class(monkeypatch):
+    pytest.importorskip("pyaudio")
+    pytest.importorskip("pvporcupine")
+    from gerty_sim import Simulation
+
+    monkeypatch.setattr(signal, "signal", lambda *args: None)
+    return Simulation
+
+
+@pytest.fixture
+def simulate(simulation_class):
+    def run(script):
+        simulation = simulation_class(script)
+        report = simulation.run()
+        return report, simulation.gerty
+    return run
+
+
+@pytest.mark.parametrize("action", ["wake", "stop"])
+def test_keyword_during_api_command_is_dropped(simulate, action):
+    report, gerty = simulate({
+        "api": [{"at": 12.0, "command": "emotion", "emotion": "happy", "seconds": 3}],
+        "keywords": [{"at": 13.0, "action": action}],
+        "interactions": [{"at": 20.0, **QUESTION}],
+        "end_after": 8.0,
+    })
+    events = [event for event, _t, _data in gerty.timeline]
+    assert events[0] == "api"
+    (interaction,) = report["interactions"]
+    assert interaction["answer"] == "I'm GERTY."
+    assert not gerty.barge_in.is_set() and not gerty.stop_requested
+
+
+def marks(gerty):
+    return [(event, data.get("text")) for event, _t, data in gerty.timeline]
+
+
+def test_wake_during_answer_asks_again(simulate):
+    report, gerty = simulate({"interactions": [
+        {"at": 12.0, **QUESTION, "ai_latency": 2.0},
+        {"at": 20.5, "say": "what time is it in Tokyo", "ai": "It's late there."},  # while the answer is up
+    ]})
+    assert marks(gerty) == [
+        ("wake", None), ("listening", None), ("question", "what is your name"),
+        ("ai_request", "what is your name"), ("answer", "I'm GERTY."),
+        ("barge_in", None), ("listening", None), ("question", "what time is it in Tokyo"),
+        ("ai_request", "what time is it in Tokyo"), ("answer", "It's late there."), ("idle", None),
+    ]
+    (interaction,) = report["interactions"]
+    assert interaction["barge_ins"] == 1
+
+
+def test_stop_keyword_while_thinking(simulate):
+    report, gerty = simulate({
+        "keywords": [{"at": 15.5, "action": "stop"}],
+        "interactions": [{"at": 12.0, **QUESTION, "ai_latency": 3.0},
+                         {"at": 24.0, "say": "how are you", "ai": "Fine."}],
+    })
+    first, second = report["interactions"]
+    assert first["question"] == "what is your name" and "answer" not in first
+    assert second["answer"] == "Fine."
+    assert ("ai_request", "what is your name") not in marks(gerty)
+
+
+def test_api_question_between_interactions(simulate):
+    report, gerty = simulate({
+        "api": [{"at": 12.0, "command": "ask", "text": "what is your name"}],
+        "interactions": [{"at": 20.0, "say": "how are you", "ai": "Fine."}],
+    })
+    assert marks(gerty)[:5] == [("api", None), ("question", "what is your name"),
+                                ("ai_request", "what is your name"), ("answer", "I'm not sure, Sam."),
+                                ("idle", None)]
+    (interaction,) = report["interactions"]
+    assert interaction["answer"] == "Fine."
+
+
+class TestRunCancellable:
+    """A barge-in or STOP abandons the blocking call it is waiting on"""
+
+    class Recorder:
+        def __init__(self):
+            self.calls = []
+
+        def stop(self):
+            self.calls.append("tts.stop")
+
+        def close(self):
+            self.calls.append("stream.close")
+
+    @pytest.fixture
+    def gerty(self, simulation_class):
+        simulation = simulation_class({"interactions": []})
+        with simulation.ai:
+            yield simulation._build()
+
+    def test_result_when_not_interrupted(self, gerty):
+        assert gerty._run_cancellable(lambda x: x * 2, 21) == 42
+
+    @pytest.mark.parametrize("interrupt", ["barge_in", "stop"])
+    def test_interruption_abandons_the_call(self, gerty, interrupt):
+        recorder = self.Recorder()
+        gerty.tts, gerty._ai_stream = recorder, recorder
+        release = threading.Event()
+
+        def slow_answer():
+            release.wait(5)
+            return "too late"
+
+        def interrupt_soon():
+            time.sleep(0.05)
+            if interrupt == "stop":
+                gerty.stop_requested = True
+            else:
+                gerty._request_barge_in()
+
+        threading.Thread(target=interrupt_soon, daemon=True).start()
+        start = time.perf_counter()
+        try:
+            assert gerty._run_cancellable(slow_answer) is None
+        finally:
+            release.set()
+        assert time.perf_counter() - start < 1.0
+        assert recorder.calls == ["tts.stop", "stream.close"]
+        assert gerty._ai_stream is None
+
+
+def test_api_command_in_keyboard_mode(simulation_class):
+    simulation = simulation_class({"api": [{"at": 0.5, "command": "emotion", "emotion": "happy", "seconds": 1}]})
+    with simulation.ai:
+        gerty = simulation._build()
+        gerty.api = simulation.events
+        simulation.display.exit_at = 5.0
+        gerty.setup_display()
+        gerty.keyboard_interaction_loop()
+    assert marks(gerty) == [("api", None)]
+    assert not simulation.events.pending()
+
+
+def test_only_used_early_answers_are_recorded(simulate):
+    report, gerty = simulate({"partials": True, "interactions": [
+        {"at": 12.0, "say": "tell me about the moon", "speech_duration": 2.0, "ai": "It is very far away, Sam."},
+        {"at": 25.0, "say": "what is the weather like", "speech_duration": 2.2, "ai": "Dusty, Sam.",
+         "partials": ["what", "what is", "what is the whether", "what is the whether", "what is the whether like"]},
+    ]})
+    assert (report["speculation"]["hits"], report["speculation"]["wasted"]) == (1, 2)
+    assert [i["answer"] for i in report["interactions"]] == ["It is very far away, Sam.", "Dusty, Sam."]
+    assert gerty.budget.requests == 3  # connection test + the two answers shown, not the dropped guesses
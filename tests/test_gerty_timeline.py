@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Tests for timeline compilation and playback (gerty/timeline.py)
+Assets and the screen are stand-ins, so no images are decoded
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from gerty import GertyScreen, TimelineError, TimelinePlayer, compile_timeline, load_timeline
+from gerty_clock import VirtualClock
+from gerty_windowed import GertyDisplay
+
+
+class FakeAssets:
+    """Two images per folder, one per emotion"""
+
+    base_path = Path("/assets")
+
+    def images(self, folder):
+        return [] if folder == "empty" else [f"/assets/{folder}/a.jpg", f"/assets/{folder}/b.jpg"]
+
+    def emotion_image(self, emotion):
+        return None if emotion == "unknown" else f"/assets/emotion/{emotion}.jpg"
+
+
+class FakeUI:
+    """cv2 stand-in whose waitKey advances the virtual clock and returns scripted keys"""
+
+    WINDOW_NORMAL = 0
+
+    def __init__(self, clock, keys=()):
+        self.clock = clock
+        self.keys = list(keys)
+        self.polls = 0
+
+    def waitKey(self, delay=0):
+        self.polls += 1
+        self.clock.advance(max(delay, 1) / 1000.0)
+        return self.keys.pop(0) if self.keys else -1
+
+    def destroyAllWindows(self):
+        pass
+
+
+class RecordingScreen(GertyScreen):
+    """Screen that records (time, frame) instead of drawing"""
+
+    def __init__(self, keys=()):
+        clock = VirtualClock()
+        super().__init__(ui=FakeUI(clock, keys), clock=clock)
+        self.shown = []
+
+    def compose(self, image_path, show_text=None):
+        return (image_path, show_text)
+
+    def show_frame(self, img):
+        self.shown.append((round(self.clock.time(), 3), img))
+
+
+class RecordingDisplay(GertyDisplay):
+    """gerty_windowed's display with the same stand-ins, no window of its own"""
+
+    def __init__(self, keys=()):
+        clock = VirtualClock()
+        super().__init__(ui=FakeUI(clock, keys), clock=clock)
+        self.assets = FakeAssets()
+        self.shown = []
+
+    def setup_display(self):
+        pass
+
+    def show_splash(self):
+        pass
+
+    compose = RecordingScreen.compose
+    show_frame = RecordingScreen.show_frame
+
+
+def compile_steps(steps, **spec):
+    return compile_timeline({"steps": steps, **spec}, FakeAssets())
+
+
+class TestCompileErrors:
+    """Invalid timelines are rejected before anything is shown"""
+
+    @pytest.mark.parametrize("spec, message", [
+        ({"fps": 0, "steps": [{"emotion": "happy", "duration": 1}]}, "fps must be positive"),
+        ({"steps": {"emotion": "happy"}}, "steps must be a list"),
+        ({"steps": ["happy"]}, r"steps\[0\] must be an object"),
+        ({"steps": [{"wave": 1}]}, r"steps\[0\]: expected one of"),
+        ({"steps": [{"emotion": "happy"}]}, "duration must be a number"),
+        ({"steps": [{"emotion": "happy", "duration": -1}]}, "duration must not be negative"),
+        ({"steps": [{"emotion": "happy", "duration": "long"}]}, "duration must be a number"),
+        ({"steps": [{"emotion": "happy", "duration": 1, "fade": 2}]}, "fade is longer than duration"),
+        ({"steps": [{"folder": "empty", "duration": 1}]}, "no images"),
+        ({"steps": [{"emotion": "unknown", "duration": 1}]}, "no images"),
+        ({"steps": [{"hold": 2}]}, "shows no frames"),
+        ({"steps": [{"repeat": 2, "steps": [{"emotion": "happy", "duration": "x"}]}]},
+         r"steps\[0\]\.steps\[0\]: duration"),
+        ({"loop": True, "steps": [{"emotion": "happy", "duration": 0}]}, "loops but has no duration"),
+    ])
+    def test_invalid(self, spec, message):
+        with pytest.raises(TimelineError, match=message):
+            compile_timeline(spec, FakeAssets())
+
+    def test_bad_json_file(self, tmp_path):
+        path = tmp_path / "broken.json"
+        path.write_text("{\"steps\": [")
+        with pytest.raises(TimelineError, match="broken.json"):
+            load_timeline(path)
+
+    def test_error_is_a_value_error(self):
+        with pytest.raises(ValueError):
+            compile_steps([])
+
+
+class TestSchedule:
+    """Offsets, repeats, holds and fades in the compiled schedule"""
+
+    def test_offsets_are_absolute(self):
+        schedule = compile_steps([{"folder": "boot", "duration": 1.5}, {"hold": 1.0},
+                                  {"repeat": 2, "steps": [{"emotion": "happy", "duration": 0.5, "text": "Hi"}]}])
+        assert [cue.at for cue in schedule.cues] == [0.0, 1.5, 4.0, 4.5]
+        assert schedule.length == 5.0
+        assert schedule.cues[-1].frame == ("/assets/emotion/happy.jpg", "Hi")
+        assert not schedule.loop
+
+    def test_fade_cues_blend_from_the_previous_frame(self):
+        schedule = compile_steps([{"emotion": "happy", "duration": 1.0},
+                                  {"emotion": "sad", "duration": 2.0, "fade": 0.5}], fps=10)
+        happy, sad = ("/assets/emotion/happy.jpg", None), ("/assets/emotion/sad.jpg", None)
+        first, *fade, last = schedule.cues
+        assert (first.at, first.frame, first.fade_from) == (0.0, happy, None)
+        assert [cue.at for cue in fade] == pytest.approx([1.0, 1.1, 1.2, 1.3])
+        assert [cue.alpha for cue in fade] == pytest.approx([0.2, 0.4, 0.6, 0.8])
+        assert all(cue.frame == sad and cue.fade_from == happy for cue in fade)
+        assert (last.at, last.frame, last.fade_from, last.alpha) == (pytest.approx(1.4), sad, None, 1.0)
+        assert [cue.label for cue in schedule.cues if cue.label] == ["happy.jpg", "sad.jpg"]
+        assert schedule.length == 3.0
+        assert set(schedule.frames) == {happy, sad}
+
+    def test_no_fade_into_the_first_or_the_same_frame(self):
+        schedule = compile_steps([{"emotion": "happy", "duration": 1.0, "fade": 0.5},
+                                  {"emotion": "happy", "duration": 1.0, "fade": 0.5}])
+        assert len(schedule.cues) == 2
+        assert all(cue.fade_from is None for cue in schedule.cues)
+
+    def test_bare_list_of_steps(self):
+        schedule = compile_timeline([{"image": "shutdown/shut.jpg", "duration": 2}], FakeAssets())
+        assert schedule.cues[0].frame == ("/assets/shutdown/shut.jpg", None)
+
+    def test_json_file(self, tmp_path):
+        path = tmp_path / "show.json"
+        path.write_text(json.dumps({"loop": True, "steps": [{"folder": "boot", "duration": 1}]}))
+        schedule = compile_timeline(load_timeline(path), FakeAssets())
+        assert schedule.loop and schedule.length == 2.0
+
+
+class TestPlayback:
+    """The player shows cues at start + offset and stops on ESC"""
+
+    def test_frames_go_up_on_their_deadlines(self):
+        screen = RecordingScreen()
+        schedule = compile_steps([{"folder": "boot", "duration": 1.0}, {"emotion": "happy", "duration": 0.5}])
+        assert TimelinePlayer(screen).play(schedule, loops=2) is True
+        assert [t for t, _ in screen.shown] == pytest.approx([0.0, 1.0, 2.0, 2.5, 3.5, 4.5], abs=0.002)
+        assert screen.clock.time() == pytest.approx(5.0, abs=0.002)
+
+    def test_escape_stops_a_looping_timeline(self):
+        screen = RecordingScreen(keys=[-1] * 30 + [27])
+        schedule = compile_steps([{"emotion": "happy", "duration": 0.5}], loop=True)
+        assert TimelinePlayer(screen).play(schedule) is False
+
+    def test_keys_are_polled_when_running_late(self):
+        screen = RecordingScreen(keys=[ord("q")])
+        screen.clock.advance(10.0)
+        assert screen.wait_until(1.0) is False
+        assert screen.ui.polls == 1
+
+    def test_wait_until_returns_once_the_deadline_passes(self):
+        screen = RecordingScreen()
+        assert screen.wait_until(0.3, poll_ms=50) is True
+        assert screen.clock.time() == pytest.approx(0.3)
+
+
+class TestWindowedRun:
+    """GertyDisplay.run plays the timeline once, or until ESC with loop=True"""
+
+    SPEC = {"steps": [{"emotion": "happy", "duration": 0.5}, {"emotion": "sad", "duration": 0.5}]}
+
+    def test_plays_once_by_default(self):
+        display = RecordingDisplay()
+        display.run(timeline=self.SPEC)
+        assert [t for t, _ in display.shown] == pytest.approx([0.0, 0.5], abs=0.002)
+
+    def test_loop_repeats_until_escape(self):
+        display = RecordingDisplay(keys=[-1] * 400 + [27])
+        display.run(timeline=self.SPEC, loop=True)
+        assert len(display.shown) > 4
+        assert display.clock.time() > 2.0
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming speech player (gerty_tts.py): generation tokens
+and stop() dropping sentences from a cancelled answer
+"""
+
+import threading
+
+import pytest
+
+from gerty_tts import SpeechPlayer, TTSEngine
+
+
+class GatedEngine(TTSEngine):
+    """Records what it synthesises; blocks on the gate, so a test can stop() mid-sentence"""
+
+    name = "gated"
+
+    def __init__(self, open_gate=True):
+        self.sentences = []
+        self.started = threading.Event()
+        self.gate = threading.Event()
+        if open_gate:
+            self.gate.set()
+
+    def synthesize(self, text):
+        self.sentences.append(text)
+        self.started.set()
+        self.gate.wait(5)
+        return b"\x00\x00" * 1600
+
+
+@pytest.fixture
+def played():
+    return []
+
+
+@pytest.fixture
+def make_player(played):
+    players = []
+
+    def make(engine):
+        player = SpeechPlayer(engine, sink=lambda data, rate: played.append(data), chunk_seconds=0.01)
+        players.append(player)
+        return player
+    yield make
+    for player in players:
+        player.close()
+
+
+def test_answer_is_spoken_sentence_by_sentence(make_player, played):
+    engine = GatedEngine()
+    player = make_player(engine)
+    generation = player.begin()
+    player.feed("Hello there, Sam. The harvester ", generation)
+    player.feed("is running smoothly today.", generation)
+    player.finish(generation)
+    assert player.wait(5)
+    assert engine.sentences == ["Hello there, Sam.", "The harvester is running smoothly today."]
+    assert len(played) == 20  # 0.1 s per sentence in 0.01 s chunks
+    assert player.first_audio_latency is not None
+
+
+def test_input_with_a_stale_token_is_dropped(make_player):
+    engine = GatedEngine()
+    player = make_player(engine)
+    old = player.begin()
+    player.stop()
+    assert not player.is_current(old)
+    player.feed("This answer was cancelled. ", old)
+    player.finish(old)
+    player.say("So was this.", old)
+    assert player.wait(5) and not player.is_speaking()
+    assert engine.sentences == []
+
+    new = player.begin()
+    assert player.is_current(new)
+    player.feed("The new answer is spoken.", new)
+    player.finish(new)
+    assert player.wait(5)
+    assert engine.sentences == ["The new answer is spoken."]
+
+
+def test_stop_drops_queued_and_synthesising_sentences(make_player, played):
+    engine = GatedEngine(open_gate=False)
+    player = make_player(engine)
+    generation = player.begin()
+    player.feed("First sentence of it. Second sentence of it. Third sentence.", generation)
+    player.finish(generation)
+    assert engine.started.wait(5)
+    assert player.is_speaking()
+    player.stop()
+    engine.gate.set()
+    assert player.wait(5) and not player.is_speaking()
+    assert engine.sentences == ["First sentence of it."]
+    assert played == []  # synthesised after stop(), never played